@@ -1,4 +1,5 @@
 import bpy
+import numpy as np
 from math import radians, sin, cos
 from mathutils import Vector
 import random
@@ -12,7 +13,6 @@ def move_camera(camera: bpy.types.Object, new_location: Vector) -> None:
         new_location (Vector): The new location for the camera.
     """
     camera.location = new_location
-    print(f"✅ Camera moved to {new_location}")
 
 def rotate_camera(camera: bpy.types.Object, new_rotation: Vector) -> None:
     """Rotates the camera to a new rotation.
@@ -22,7 +22,6 @@ def rotate_camera(camera: bpy.types.Object, new_rotation: Vector) -> None:
         new_rotation (Vector): The new rotation for the camera in radians.
     """
     camera.rotation_euler = new_rotation
-    print(f"✅ Camera rotated to {new_rotation}")
 
 def look_at(camera: bpy.types.Object, target: Vector) -> None:
     """Orients the camera to look at a specific target point.
@@ -34,23 +33,23 @@ def look_at(camera: bpy.types.Object, target: Vector) -> None:
     direction = target - camera.location
     rot_quat = direction.to_track_quat('-Z', 'Y')
     camera.rotation_euler = rot_quat.to_euler()
-    print(f"✅ Camera oriented to look at {target}")
     
 
-def rotate_camera_around_object(camera: bpy.types.Object, center: Vector, radius: float, angle_step: float = 5.0, noise: float = 2.5) -> int:
-    """Rotate the camera around the object and return the current angle.
+def rotate_camera_around_object(camera: bpy.types.Object, center: Vector, radius: float, angle_step: float = 5.0, noise: float = 2.5):
+    """Rotate the camera around the object and yield the current angle.
 
     Args:
         camera (bpy.types.Object): The camera object.
         center (Vector): The center of the object to rotate around.
         radius (float): The distance from the camera to the object.
-        angle_step (float): The angle step in degrees.
+        angle_step (float): The angle step in degrees, integer or not.
         noise (float): The noise to add to the angle in degrees.
 
-    Returns:
-        int: The current angle of the camera.
+    Yields:
+        float: The current angle of the camera.
     """
-    for angle in range(0, 360, angle_step):
+    for step in range(int(round(360 / angle_step))):
+        angle = step * angle_step
         # Add noise to the angle
         noisy_angle = angle + random.uniform(-noise, noise)
         rad_angle = radians(noisy_angle)
@@ -65,4 +64,35 @@ def rotate_camera_around_object(camera: bpy.types.Object, center: Vector, radius
         look_at(camera, center)
 
         # Return the current angle for rendering and annotations
-        yield angle
\ No newline at end of file
+        yield angle
+
+
+def keyframe_camera_poses(camera: bpy.types.Object, positions: np.ndarray, rotations: np.ndarray, start_frame: int = 0) -> None:
+    """Write precomputed poses as camera keyframes, one pose per frame.
+
+    Keyframes are filled with foreach_set on six F-curves instead of one
+    keyframe_insert call per channel and frame. The previous pose action of
+    the camera is removed.
+
+    Args:
+        camera (bpy.types.Object): The camera object.
+        positions (np.ndarray): (n, 3) camera locations.
+        rotations (np.ndarray): (n, 3) XYZ Euler rotations in radians.
+        start_frame (int): Scene frame of the first pose.
+    """
+    if camera.animation_data is None:
+        camera.animation_data_create()
+    previous_action = camera.animation_data.action
+    action = bpy.data.actions.new(name=f"{camera.name}Poses")
+    camera.animation_data.action = action
+    if previous_action and previous_action.users == 0:
+        bpy.data.actions.remove(previous_action)
+
+    frames = np.arange(start_frame, start_frame + len(positions), dtype=np.float32)
+    for data_path, values in (("location", positions), ("rotation_euler", rotations)):
+        for axis in range(3):
+            fcurve = action.fcurves.new(data_path, index=axis)
+            fcurve.keyframe_points.add(len(frames))
+            coordinates = np.column_stack((frames, values[:, axis])).astype(np.float32)
+            fcurve.keyframe_points.foreach_set("co", coordinates.ravel())
+            fcurve.update()
@@ -0,0 +1,177 @@
+import os
+import csv
+import numpy as np
+
+# Point the camera aims at, slightly above the ground
+DEFAULT_TARGET = (0.0, 0.0, 0.15)
+
+
+def orbit_poses(num_frames: int, radius: float, height: float, jitter: tuple[float, float] = (-0.3, 0.1),
+                rng: np.random.Generator = None, draws: np.ndarray = None) -> np.ndarray:
+    """Positions on a horizontal circle, starting in front of the vehicle (+Y).
+
+    Args:
+        num_frames (int): Number of poses, evenly spaced over 360 degrees.
+        radius (float): Distance from the vertical axis.
+        height (float): Nominal camera height.
+        jitter (tuple[float, float]): Range of the random offset added to the height of each pose.
+        rng (np.random.Generator): Random generator for the height jitter.
+        draws (np.ndarray): Uniform [0, 1) draws of each pose used instead of rng, e.g. from a randomization plan.
+
+    Returns:
+        np.ndarray: (num_frames, 3) camera positions.
+    """
+    if draws is None:
+        draws = (rng or np.random.default_rng()).random(num_frames)
+    angles = np.radians(np.arange(num_frames) * (360 / num_frames) + 90)
+    heights = height + jitter[0] + (jitter[1] - jitter[0]) * np.asarray(draws)[:num_frames]
+    return np.column_stack((radius * np.cos(angles), radius * np.sin(angles), heights))
+
+
+def spiral_poses(num_frames: int, radius: float, height_range: tuple[float, float], turns: float = 2.0) -> np.ndarray:
+    """Positions on a helix climbing from the lowest to the highest height.
+
+    Args:
+        num_frames (int): Number of poses.
+        radius (float): Distance from the vertical axis.
+        height_range (tuple[float, float]): Heights of the first and last poses.
+        turns (float): Number of revolutions around the vehicle.
+
+    Returns:
+        np.ndarray: (num_frames, 3) camera positions.
+    """
+    t = np.linspace(0.0, 1.0, num_frames, endpoint=False)
+    angles = 2 * np.pi * turns * t + np.pi / 2
+    heights = height_range[0] + (height_range[1] - height_range[0]) * t
+    return np.column_stack((radius * np.cos(angles), radius * np.sin(angles), heights))
+
+
+def fibonacci_hemisphere_poses(num_frames: int, radius: float, min_elevation: float = 5.0) -> np.ndarray:
+    """Nearly uniform positions on the upper hemisphere, using a Fibonacci lattice.
+
+    Args:
+        num_frames (int): Number of poses.
+        radius (float): Distance from the origin.
+        min_elevation (float): Lowest elevation in degrees, to keep the camera above the ground.
+
+    Returns:
+        np.ndarray: (num_frames, 3) camera positions.
+    """
+    golden_angle = np.pi * (3 - np.sqrt(5))
+    index = np.arange(num_frames) + 0.5
+    # Keep the top pole out of the lattice: looking straight down has no defined up vector
+    z_min, z_max = np.sin(np.radians(min_elevation)), np.sin(np.radians(89.0))
+    z = z_min + (z_max - z_min) * index / num_frames
+    ring = np.sqrt(1 - z ** 2)
+    azimuth = golden_angle * index
+    return radius * np.column_stack((ring * np.cos(azimuth), ring * np.sin(azimuth), z))
+
+
+def jittered_ring_poses(num_rings: int, per_ring: int, radius: float, heights: tuple[float, float],
+                        angle_jitter: float = 2.5, rng: np.random.Generator = None,
+                        draws: np.ndarray = None) -> np.ndarray:
+    """Several horizontal rings at evenly spaced heights, with random azimuth noise.
+
+    Args:
+        num_rings (int): Number of rings.
+        per_ring (int): Poses per ring.
+        radius (float): Distance from the vertical axis.
+        heights (tuple[float, float]): Heights of the lowest and highest rings.
+        angle_jitter (float): Maximum azimuth noise in degrees.
+        rng (np.random.Generator): Random generator for the azimuth noise.
+        draws (np.ndarray): Uniform [0, 1) draws of each pose used instead of rng, ring after ring.
+
+    Returns:
+        np.ndarray: (num_rings * per_ring, 3) camera positions, ring after ring.
+    """
+    if draws is None:
+        draws = (rng or np.random.default_rng()).random(num_rings * per_ring)
+    noise = angle_jitter * (2 * np.asarray(draws)[:num_rings * per_ring].reshape(num_rings, per_ring) - 1)
+    ring_heights = np.linspace(heights[0], heights[1], num_rings)
+    angles = np.arange(per_ring) * (360 / per_ring) + 90
+    angles = np.radians(angles[None, :] + noise)
+    x = radius * np.cos(angles)
+    y = radius * np.sin(angles)
+    z = np.broadcast_to(ring_heights[:, None], angles.shape)
+    return np.column_stack((x.ravel(), y.ravel(), z.ravel()))
+
+
+def look_at_rotations(positions: np.ndarray, target=DEFAULT_TARGET) -> np.ndarray:
+    """Euler angles making each camera look at the target, for all poses at once.
+
+    Same convention as actions.camera_actions.look_at: the camera -Z axis
+    points at the target and its Y axis stays as close to world Z as possible.
+
+    Args:
+        positions (np.ndarray): (n, 3) camera positions.
+        target: Point looked at.
+
+    Returns:
+        np.ndarray: (n, 3) XYZ Euler angles in radians.
+    """
+    z_axis = positions - np.asarray(target, dtype=float)
+    z_axis /= np.linalg.norm(z_axis, axis=1, keepdims=True)
+    x_axis = np.cross(np.array([0.0, 0.0, 1.0]), z_axis)
+    x_axis /= np.linalg.norm(x_axis, axis=1, keepdims=True)
+    y_axis = np.cross(z_axis, x_axis)
+
+    # Rotation matrix columns are the camera axes; decompose as Rz @ Ry @ Rx
+    rx = np.arctan2(y_axis[:, 2], z_axis[:, 2])
+    ry = np.arcsin(np.clip(-x_axis[:, 2], -1.0, 1.0))
+    rz = np.arctan2(x_axis[:, 1], x_axis[:, 0])
+    return np.column_stack((rx, ry, rz))
+
+
+def plan_poses(pattern: str, num_frames: int, radius: float, height: float, jitter: tuple[float, float] = (-0.3, 0.1),
+               rng: np.random.Generator = None, target=DEFAULT_TARGET,
+               randomization: dict = None) -> tuple[np.ndarray, np.ndarray]:
+    """Compute every camera pose of a model up front.
+
+    Args:
+        pattern (str): One of "orbit", "spiral", "hemisphere" or "rings".
+        num_frames (int): Number of poses.
+        radius (float): Camera distance.
+        height (float): Nominal camera height.
+        jitter (tuple[float, float]): Height jitter range of the orbit, also used as the
+            height span of the spiral and rings.
+        rng (np.random.Generator): Random generator for the jittered patterns.
+        target: Point looked at.
+        randomization (dict): Plan rows of the model (see pipeline.randomization); their camera
+            draws replace rng, so the poses do not depend on which worker renders them.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: (n, 3) positions and (n, 3) Euler rotations.
+    """
+    height_draws = randomization['camera_height_u'] if randomization else None
+    azimuth_draws = randomization['camera_azimuth_u'] if randomization else None
+    if pattern == "orbit":
+        positions = orbit_poses(num_frames, radius, height, jitter, rng, draws=height_draws)
+    elif pattern == "spiral":
+        positions = spiral_poses(num_frames, radius, (height + jitter[0], height + jitter[1]))
+    elif pattern == "hemisphere":
+        positions = fibonacci_hemisphere_poses(num_frames, radius)
+    elif pattern == "rings":
+        num_rings = 4 if num_frames % 4 == 0 else 1
+        positions = jittered_ring_poses(num_rings, num_frames // num_rings, radius,
+                                        (height + jitter[0], height + jitter[1]), rng=rng, draws=azimuth_draws)
+    else:
+        raise ValueError(f"Unknown pose pattern '{pattern}'.")
+    return positions, look_at_rotations(positions, target)
+
+
+def export_pose_table(filepath: str, frames, positions: np.ndarray, rotations: np.ndarray) -> None:
+    """Write the planned poses as CSV, one row per frame, rotations in degrees.
+
+    Args:
+        filepath (str): Destination CSV file.
+        frames: Frame index of each pose.
+        positions (np.ndarray): (n, 3) camera positions.
+        rotations (np.ndarray): (n, 3) Euler rotations in radians.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(filepath)), exist_ok=True)
+    degrees = np.degrees(rotations)
+    with open(filepath, "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(['frame', 'x', 'y', 'z', 'x_angle', 'y_angle', 'z_angle'])
+        for frame, position, rotation in zip(frames, positions, degrees):
+            writer.writerow([frame, *position.tolist(), *rotation.tolist()])
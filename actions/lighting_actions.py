@@ -1,4 +1,5 @@
 import bpy
+import numpy as np
 from mathutils import Vector
 
 def update_light_intensity(light: bpy.types.Object, new_intensity: float) -> None:
@@ -9,7 +10,6 @@ def update_light_intensity(light: bpy.types.Object, new_intensity: float) -> Non
         new_intensity (float): The new intensity value.
     """
     light.data.energy = new_intensity
-    print(f"✅ Light intensity updated to {new_intensity}")
 
 def move_light(light: bpy.types.Object, new_location: Vector) -> None:
     """Moves the light to a new location.
@@ -19,4 +19,45 @@ def move_light(light: bpy.types.Object, new_location: Vector) -> None:
         new_location (Vector): The new location for the light.
     """
     light.location = new_location
-    print(f"✅ Light moved to {new_location}")
\ No newline at end of file
+
+
+def _new_action(id_block, name: str) -> bpy.types.Action:
+    """Give a data block a fresh action, removing its previous one if nothing else uses it."""
+    if id_block.animation_data is None:
+        id_block.animation_data_create()
+    previous_action = id_block.animation_data.action
+    action = bpy.data.actions.new(name=name)
+    id_block.animation_data.action = action
+    if previous_action and previous_action.users == 0:
+        bpy.data.actions.remove(previous_action)
+    return action
+
+
+def keyframe_light_plan(light: bpy.types.Object, energies: np.ndarray, locations: np.ndarray,
+                        start_frame: int = 0) -> None:
+    """Write planned light energies and positions as keyframes, one value per frame.
+
+    Like keyframe_camera_poses, F-curves are filled with foreach_set. The
+    light is first set to the values of the first frame with
+    update_light_intensity and move_light, so it is also right outside the
+    keyframed range.
+
+    Args:
+        light (bpy.types.Object): The light object.
+        energies (np.ndarray): (n,) light energies.
+        locations (np.ndarray): (n, 3) light locations.
+        start_frame (int): Scene frame of the first value.
+    """
+    update_light_intensity(light, float(energies[0]))
+    move_light(light, Vector(locations[0]))
+
+    frames = np.arange(start_frame, start_frame + len(energies), dtype=np.float32)
+    light_action = _new_action(light, f"{light.name}Plan")
+    channels = [(light_action, "location", axis, locations[:, axis]) for axis in range(3)]
+    channels.append((_new_action(light.data, f"{light.data.name}Plan"), "energy", 0, energies))
+    for action, data_path, index, values in channels:
+        fcurve = action.fcurves.new(data_path, index=index)
+        fcurve.keyframe_points.add(len(frames))
+        coordinates = np.column_stack((frames, values)).astype(np.float32)
+        fcurve.keyframe_points.foreach_set("co", coordinates.ravel())
+        fcurve.update()
\ No newline at end of file
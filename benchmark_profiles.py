@@ -0,0 +1,138 @@
+import site
+import sys
+
+user_site_packages = site.getusersitepackages()
+sys.path.append(user_site_packages)
+
+import os
+import json
+import time
+import argparse
+import bpy
+import numpy as np
+
+project_path = os.path.dirname(os.path.abspath(__file__))
+if project_path not in sys.path:
+    sys.path.append(project_path)
+
+from blender_utils.object_utils import normalize_collection, get_collection_bounds
+from blender_utils.scene_template import SceneTemplate
+from blender_utils.render_profiles import load_render_profiles, apply_render_profile
+from blender_utils.render_utils import render_keyframed_frames
+from models.model_loader import load_model
+from actions.camera_actions import keyframe_camera_poses
+from actions.camera_poses import plan_poses
+from pipeline.image_metrics import psnr
+from blender_utils.model_pipeline import clear_scene
+
+
+def build_placeholder_vehicle(collection_name: str = "Vehicle") -> bpy.types.Collection:
+    """Builds a box-and-wheels stand-in when no model is given, so the benchmark needs no assets."""
+    collection = bpy.data.collections.new(collection_name)
+    bpy.context.scene.collection.children.link(collection)
+
+    paint = bpy.data.materials.new(name="carpaint_benchmark")
+    paint.use_nodes = True
+    parts = []
+    bpy.ops.mesh.primitive_cube_add(size=1, location=(0, 0, 0.5))
+    parts.append(bpy.context.object)
+    parts[-1].scale = (2.0, 4.2, 1.0)
+    for x in (-1.0, 1.0):
+        for y in (-1.4, 1.4):
+            bpy.ops.mesh.primitive_cylinder_add(radius=0.4, depth=0.3, location=(x, y, 0.4), rotation=(0, 1.5708, 0))
+            parts.append(bpy.context.object)
+    for obj in parts:
+        obj.data.materials.append(paint)
+        for col in obj.users_collection:
+            col.objects.unlink(obj)
+        collection.objects.link(obj)
+    return collection
+
+
+def read_pixels(filepath: str) -> np.ndarray:
+    """Loads a rendered image as a float array and frees the Blender image."""
+    image = bpy.data.images.load(filepath)
+    pixels = np.empty(len(image.pixels), dtype=np.float32)
+    image.pixels.foreach_get(pixels)
+    bpy.data.images.remove(image)
+    return pixels
+
+
+def benchmark_profiles(output_folder: str, profile_names: list[str], reference_name: str = "hero",
+                       num_frames: int = 4, model: str = None) -> list[dict]:
+    """Renders the same poses with each profile and compares them to the reference profile.
+
+    Returns:
+        list[dict]: Seconds per frame and mean PSNR against the reference for each profile.
+    """
+    config = load_render_profiles()
+    clear_scene()
+    template = SceneTemplate(light_intensity=400, shadow_soft_size=7,
+                             ground_settings=dict(roughness=0.1, specular=0.9, clearcoat=0.9, clearcoat_roughness=0.1))
+    vehicle_collection = load_model(model) if model else build_placeholder_vehicle()
+    normalize_collection(vehicle_collection, 1.0, 0.01)
+    min_corner, max_corner, collection_height = get_collection_bounds(vehicle_collection)
+    vehicle_center = (min_corner + max_corner) / 2
+    vehicle_center.z += collection_height
+    template.place(vehicle_center, max_corner)
+
+    # Poses fixes pour que tous les profils rendent exactement les mêmes images
+    positions, rotations = plan_poses("orbit", num_frames, np.sqrt(3), vehicle_center.z, rng=np.random.default_rng(0))
+    keyframe_camera_poses(template.camera, positions, rotations)
+
+    ordered = [reference_name] + [name for name in profile_names if name != reference_name]
+    results = []
+    reference_folder = os.path.join(output_folder, reference_name)
+    for name in ordered:
+        apply_render_profile(config["profiles"][name])
+        profile_folder = os.path.join(output_folder, name)
+        bpy.context.scene.render.filepath = os.path.join(profile_folder, "####")
+        start = time.perf_counter()
+        render_keyframed_frames(num_frames)
+        seconds_per_frame = (time.perf_counter() - start) / num_frames
+
+        scores = [psnr(read_pixels(os.path.join(reference_folder, f"{frame:04d}.png")),
+                       read_pixels(os.path.join(profile_folder, f"{frame:04d}.png")))
+                  for frame in range(num_frames)]
+        mean_psnr = float(np.mean(scores)) if name != reference_name else None
+        results.append({'profile': name, 'seconds_per_frame': seconds_per_frame, 'psnr_db': mean_psnr})
+        psnr_text = "reference" if mean_psnr is None else f"{mean_psnr:.2f} dB"
+        print(f"✅ {name}: {seconds_per_frame:.2f} s/frame, PSNR {psnr_text}")
+
+    with open(os.path.join(output_folder, "benchmark_profiles.json"), "w") as file:
+        json.dump({'model': model, 'frames': num_frames, 'reference': reference_name,
+                   'resolution': [bpy.context.scene.render.resolution_x, bpy.context.scene.render.resolution_y],
+                   'results': results}, file, indent=2)
+    return results
+
+
+def parse_args(argv=None):
+    """Parse the script arguments passed after '--' on the Blender command line."""
+    if argv is None:
+        argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    # Le profil mask ne rend que l'index des objets, il n'a pas sa place dans la comparaison
+    profiles = sorted(name for name in load_render_profiles()["profiles"] if name != "mask")
+    parser = argparse.ArgumentParser(description="Measure seconds per frame and PSNR of each render profile on CPU.")
+    parser.add_argument("--output", required=True, help="Folder receiving the renders and benchmark_profiles.json.")
+    parser.add_argument("--model", default=None, help="OBJ to render (default: a placeholder vehicle).")
+    parser.add_argument("--profiles", nargs="+", choices=profiles, default=profiles)
+    parser.add_argument("--reference", choices=profiles, default="hero")
+    parser.add_argument("--num-frames", type=int, default=4)
+    parser.add_argument("--resolution", type=int, nargs=2, default=(640, 360))
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+
+    bpy.context.scene.render.engine = "CYCLES"
+    bpy.context.scene.cycles.device = "CPU"
+    bpy.context.scene.render.film_transparent = True
+    bpy.context.scene.render.resolution_x, bpy.context.scene.render.resolution_y = args.resolution
+    bpy.context.scene.render.resolution_percentage = 100
+
+    benchmark_profiles(args.output, args.profiles, args.reference, args.num_frames, args.model)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+import site
+import sys
+
+user_site_packages = site.getusersitepackages()
+sys.path.append(user_site_packages)
+
+import os
+import json
+import math
+import time
+import statistics
+import subprocess
+import argparse
+import bpy
+import numpy as np
+import yaml
+
+project_path = os.path.dirname(os.path.abspath(__file__))
+if project_path not in sys.path:
+    sys.path.append(project_path)
+
+from blender_utils.scene_template import SceneTemplate
+from blender_utils.segmentation import MaskCompositor, MaskPass
+from blender_utils.render_profiles import load_render_profiles, apply_render_profile
+from models.model_loader import load_model
+from pipeline.class_registry import DEFAULT_GRAY_LEVELS, ClassRegistry
+from pipeline.label_encoding import LABEL_EXTENSIONS
+from pipeline.metadata import MetadataWriter
+from pipeline.postprocess import PostProcessor
+from blender_utils.model_pipeline import clear_scene, prepare_model
+from car_part_generation import GROUND_SETTINGS, car_part_segmentation_mask_assign, render_360
+
+# Pipeline stages timed for every synthetic vehicle, in execution order
+STAGES = ("load_model", "prepare_model", "mask_assign", "render_360", "output_writes")
+
+
+def write_synthetic_vehicle(filepath: str, part_names: list[str], triangles: int) -> int:
+    """Writes an OBJ "vehicle" made of flat grid parts, so the benchmark needs no proprietary assets.
+
+    Parts are laid out side by side on a car-sized footprint and share one
+    carpaint material, so they go through the same code paths as a real model.
+
+    Args:
+        filepath (str): Destination .obj file; a .mtl file is written next to it.
+        part_names (list[str]): Object name of each part.
+        triangles (int): Approximate total triangle count, split evenly between parts.
+
+    Returns:
+        int: Exact number of triangles written.
+    """
+    cells = max(1, math.ceil(math.sqrt(triangles / len(part_names) / 2)))
+    grid = np.stack(np.meshgrid(np.linspace(0, 1, cells + 1), np.linspace(0, 1, cells + 1)), axis=-1).reshape(-1, 2)
+    corners = (np.arange(cells)[:, None] * (cells + 1) + np.arange(cells)[None, :]).ravel()
+    # Deux triangles par cellule de la grille, indices OBJ à partir de 1
+    quads = np.stack([corners, corners + 1, corners + cells + 2, corners + cells + 1], axis=1) + 1
+    faces = np.concatenate([quads[:, [0, 1, 2]], quads[:, [0, 2, 3]]])
+
+    columns = math.ceil(math.sqrt(len(part_names)))
+    mtl_name = os.path.splitext(os.path.basename(filepath))[0] + ".mtl"
+    with open(os.path.join(os.path.dirname(filepath), mtl_name), "w") as file:
+        file.write("newmtl carpaint_synthetic\nKd 0.8 0.8 0.8\n")
+    with open(filepath, "w") as file:
+        file.write(f"mtllib {mtl_name}\n")
+        for index, name in enumerate(part_names):
+            row, column = divmod(index, columns)
+            vertices = np.column_stack([(column + grid[:, 0] * 0.9) * 2.0 / columns,
+                                        (row + grid[:, 1] * 0.9) * 4.2 / columns,
+                                        np.full(len(grid), 0.5 + 0.1 * (index % 3))])
+            file.write(f"o {name}\nusemtl carpaint_synthetic\n")
+            np.savetxt(file, vertices, fmt="v %.5f %.5f %.5f")
+            np.savetxt(file, faces + index * len(grid), fmt="f %d %d %d")
+    return len(faces) * len(part_names)
+
+
+def synthetic_part_names(count: int, gray_levels_path: str = DEFAULT_GRAY_LEVELS) -> list[str]:
+    """Part names drawn in turn from the class table; repeated names become Blender ".001" duplicates."""
+    with open(gray_levels_path, 'r') as file:
+        classes = sorted(yaml.safe_load(file))
+    return [classes[index % len(classes)] for index in range(count)]
+
+
+def git_revision() -> str:
+    """Commit the benchmark runs on, or None outside a git checkout."""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=project_path, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def benchmark_stages(output_folder: str, part_counts: list[int], triangle_counts: list[int], repeats: int = 3,
+                     num_frames: int = 2, postprocess_workers: int = 2) -> list[dict]:
+    """Times each pipeline stage on synthetic vehicles of every size.
+
+    Every (parts, triangles) combination is rendered `repeats` times and the
+    seconds of each stage are recorded per run. output_writes is the time
+    left to wait for the post-processing queue once rendering is over, i.e.
+    the file work the render did not hide.
+
+    Returns:
+        list[dict]: One entry per size with the samples and median of each stage.
+    """
+    clear_scene()
+    template = SceneTemplate(light_intensity=400, shadow_soft_size=7, ground_settings=GROUND_SETTINGS)
+    registry = ClassRegistry.from_yaml()
+    compositor = MaskCompositor()
+    mask_pass = MaskPass(load_render_profiles()["profiles"]["mask"], compositor)
+    postprocessor = PostProcessor(workers=postprocess_workers)
+    models_folder = os.path.join(output_folder, "models")
+    os.makedirs(models_folder, exist_ok=True)
+
+    results = []
+    for parts in part_counts:
+        for triangles in triangle_counts:
+            key = f"synthetic_p{parts}_t{triangles}"
+            obj_path = os.path.join(models_folder, key + ".obj")
+            written = write_synthetic_vehicle(obj_path, synthetic_part_names(parts), triangles)
+            samples = {stage: [] for stage in STAGES}
+            for repeat in range(repeats):
+                render_folder = os.path.join(output_folder, "renders", f"{key}_{repeat}")
+                metadata = MetadataWriter(os.path.join(render_folder, "metadata.csv"))
+
+                template.remove_vehicle("Vehicle")
+                start = time.perf_counter()
+                load_model(obj_path, "Vehicle")
+                samples["load_model"].append(time.perf_counter() - start)
+                template.remove_vehicle("Vehicle")
+
+                start = time.perf_counter()
+                vehicle_collection, light, camera, ground_plane, chosen_color, vehicle_center = prepare_model(
+                    obj_path, target_size=1.0, collection_name="Vehicle", offset=0.01, template=template)
+                samples["prepare_model"].append(time.perf_counter() - start)
+
+                start = time.perf_counter()
+                output_node = car_part_segmentation_mask_assign(registry=registry, compositor=compositor, model_id=key)
+                samples["mask_assign"].append(time.perf_counter() - start)
+
+                start = time.perf_counter()
+                render_360(render_folder, key, output_node, radius=math.sqrt(3), height=vehicle_center.z,
+                           num_frames=num_frames, metadata=metadata, light=light, color=chosen_color,
+                           model_id=key, mask_pass=mask_pass, postprocessor=postprocessor)
+                samples["render_360"].append(time.perf_counter() - start)
+
+                start = time.perf_counter()
+                postprocessor.flush()
+                metadata.close()
+                samples["output_writes"].append(time.perf_counter() - start)
+
+                # Les valeurs du masque doivent être exactement les indices de parties assignés
+                indices = {obj.pass_index for obj in vehicle_collection.objects}
+                mask_path = os.path.join(render_folder, "mask", f"{key}_000" + LABEL_EXTENSIONS[compositor.encoding])
+                unexpected = compositor.check_labels(mask_path, indices)
+                if unexpected:
+                    raise RuntimeError(f"{mask_path} holds values {unexpected} that are not part indices "
+                                       f"{sorted(indices)}; the labels did not survive the write.")
+
+            medians = {stage: statistics.median(values) for stage, values in samples.items()}
+            results.append({'parts': parts, 'triangles': written, 'samples': samples, 'median': medians})
+            print(f"✅ {parts} parts, {written} triangles: "
+                  + ", ".join(f"{stage} {seconds:.3f}s" for stage, seconds in medians.items()))
+    postprocessor.close()
+    mask_pass.close()
+    return results
+
+
+def compare_results(baseline: dict, current: dict) -> list[dict]:
+    """Ratio of the current median to the baseline median of every stage and size present in both runs.
+
+    A ratio below 1 means the stage got faster.
+    """
+    baseline_sizes = {(entry['parts'], entry['triangles']): entry['median'] for entry in baseline['results']}
+    comparison = []
+    for entry in current['results']:
+        reference = baseline_sizes.get((entry['parts'], entry['triangles']))
+        if reference is None:
+            continue
+        for stage, seconds in entry['median'].items():
+            if reference.get(stage):
+                comparison.append({'parts': entry['parts'], 'triangles': entry['triangles'], 'stage': stage,
+                                   'baseline': reference[stage], 'current': seconds,
+                                   'ratio': seconds / reference[stage]})
+    return comparison
+
+
+def parse_args(argv=None):
+    """Parse the script arguments passed after '--' on the Blender command line."""
+    if argv is None:
+        argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    parser = argparse.ArgumentParser(description="Time each pipeline stage on synthetic vehicles of growing size.")
+    parser.add_argument("--output", required=True, help="Folder receiving the models, renders and benchmark_stages.json.")
+    parser.add_argument("--parts", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--triangles", type=int, nargs="+", default=[20_000, 200_000, 2_000_000])
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--num-frames", type=int, default=2)
+    parser.add_argument("--profile", choices=sorted(load_render_profiles()["profiles"]), default="draft")
+    parser.add_argument("--resolution", type=int, nargs=2, default=(320, 180))
+    parser.add_argument("--postprocess-workers", type=int, default=2)
+    parser.add_argument("--baseline", default=None, help="benchmark_stages.json of another commit to compare with.")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+
+    bpy.context.scene.render.engine = "CYCLES"
+    bpy.context.scene.cycles.device = "CPU"
+    bpy.context.scene.render.film_transparent = True
+    bpy.context.scene.render.resolution_x, bpy.context.scene.render.resolution_y = args.resolution
+    bpy.context.scene.render.resolution_percentage = 100
+    apply_render_profile(load_render_profiles()["profiles"][args.profile])
+
+    results = benchmark_stages(args.output, args.parts, args.triangles, args.repeats, args.num_frames,
+                               args.postprocess_workers)
+    report = {'commit': git_revision(), 'blender': bpy.app.version_string, 'profile': args.profile,
+              'resolution': list(args.resolution), 'frames': args.num_frames, 'repeats': args.repeats,
+              'stages': list(STAGES), 'results': results}
+    with open(os.path.join(args.output, "benchmark_stages.json"), "w") as file:
+        json.dump(report, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        for row in compare_results(baseline, report):
+            status = "✅" if row['ratio'] <= 1.05 else "⚠️"
+            print(f"{status} {row['stage']} ({row['parts']} parts, {row['triangles']} triangles): "
+                  f"{row['baseline']:.3f}s -> {row['current']:.3f}s (x{row['ratio']:.2f})")
+
+
+if __name__ == "__main__":
+    main()
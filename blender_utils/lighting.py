@@ -54,4 +54,102 @@ def setup_shadows_and_reflections(plane: bpy.types.Object, roughness: float = 0.
 
     plane.data.materials.append(new_material)
     print(f"✅ Shadows and reflections set up on the ground plane.")
-    return bsdf_node
\ No newline at end of file
+    return bsdf_node
+
+# Ground-plane looks rendered from the same scene. BSDF inputs are indexed for Blender 4.3.
+GROUND_VARIANTS = {
+    "shadow": {
+        "bsdf_inputs": {2: 1.0, 13: 0.9, 21: 0.9, 20: 0.1},
+        "shadow_catcher": True,
+        "use_shadow": True,
+    },
+    "reflection": {
+        "bsdf_inputs": {2: 0.0, 13: 0.9, 19: 0.9, 21: 12, 20: 0.1},
+        "shadow_catcher": True,
+        "use_shadow": True,
+    },
+    "plain": {
+        "bsdf_inputs": {2: 1.0, 13: 0.5, 21: 0.0, 20: 0.1},
+        "shadow_catcher": False,
+        "use_shadow": True,
+    },
+}
+
+
+def create_ground_variant_materials(variants: list[str]) -> dict[str, bpy.types.Material]:
+    """Creates one ground material per requested variant.
+
+    Args:
+        variants (list[str]): Names of entries in GROUND_VARIANTS.
+
+    Returns:
+        dict[str, bpy.types.Material]: The ground material of each variant.
+    """
+    materials = {}
+    for variant in variants:
+        material = bpy.data.materials.new(name=f"GroundMaterial_{variant}")
+        # Seule la variante en cours est assignée au sol : les autres ne doivent pas être purgées
+        material.use_fake_user = True
+        material.use_nodes = True
+        bsdf_node = material.node_tree.nodes.get("Principled BSDF")
+        if bsdf_node:
+            for index, value in GROUND_VARIANTS[variant]["bsdf_inputs"].items():
+                bsdf_node.inputs[index].default_value = value
+        materials[variant] = material
+    return materials
+
+
+def apply_ground_variant(plane: bpy.types.Object, light: bpy.types.Object, variant: str,
+                         materials: dict[str, bpy.types.Material]) -> None:
+    """Swaps the ground material and shadow settings in place for one variant.
+
+    Args:
+        plane (bpy.types.Object): The ground plane object.
+        light (bpy.types.Object): The key light.
+        variant (str): Name of an entry in GROUND_VARIANTS.
+        materials (dict[str, bpy.types.Material]): Materials from create_ground_variant_materials.
+    """
+    settings = GROUND_VARIANTS[variant]
+    if plane.data.materials:
+        plane.data.materials[0] = materials[variant]
+    else:
+        plane.data.materials.append(materials[variant])
+    plane.is_shadow_catcher = settings["shadow_catcher"]
+    light.data.use_shadow = settings["use_shadow"]
+
+
+def capture_ground_state(plane: bpy.types.Object, light: bpy.types.Object) -> dict:
+    """Reads the current ground material and shadow settings, to put them back with restore_ground_state.
+
+    The material is given a fake user so that it survives orphan purges while a variant replaces it.
+
+    Args:
+        plane (bpy.types.Object): The ground plane object.
+        light (bpy.types.Object): The key light.
+
+    Returns:
+        dict: The ground material (or None), shadow catcher flag and light shadow flag.
+    """
+    material = plane.data.materials[0] if plane.data.materials else None
+    if material:
+        material.use_fake_user = True
+    return {"material": material, "shadow_catcher": plane.is_shadow_catcher, "use_shadow": light.data.use_shadow}
+
+
+def restore_ground_state(plane: bpy.types.Object, light: bpy.types.Object, state: dict) -> None:
+    """Puts back a ground captured by capture_ground_state, undoing any apply_ground_variant since.
+
+    Args:
+        plane (bpy.types.Object): The ground plane object.
+        light (bpy.types.Object): The key light.
+        state (dict): Result of capture_ground_state.
+    """
+    if state["material"]:
+        if plane.data.materials:
+            plane.data.materials[0] = state["material"]
+        else:
+            plane.data.materials.append(state["material"])
+    else:
+        plane.data.materials.clear()
+    plane.is_shadow_catcher = state["shadow_catcher"]
+    light.data.use_shadow = state["use_shadow"]
@@ -0,0 +1,468 @@
+import os
+import random
+import bpy
+from mathutils import Vector
+
+from blender_utils.object_utils import normalize_collection, add_ground_plane, get_collection_bounds, invalidate_bounds
+from blender_utils.lighting import add_light_source, setup_shadows_and_reflections
+from blender_utils.camera_utils import add_camera
+from blender_utils.scene_template import SceneTemplate
+from blender_utils.segmentation import MaskCompositor, MaskPass
+from blender_utils.render_profiles import load_render_profiles
+from blender_utils.resources import ResourceWatchdog, free_image_buffers, purge_orphans, record_resource_gauges
+from models.model_loader import load_model
+from models.asset_cache import cached_blend_path, load_cached_model
+from actions.camera_actions import look_at
+from pipeline.catalog import list_models
+from pipeline.scheduler import WorkQueue
+from pipeline.sharding import parse_shard, select_shard, shard_metadata_name
+from pipeline.metadata import METADATA_COLUMNS, MetadataWriter, consolidate_metadata
+from pipeline.ledger import JobLedger
+from pipeline.label_encoding import LABEL_EXTENSIONS
+from pipeline.postprocess import PostProcessor
+from pipeline.sample_sink import OUTPUT_LAYOUTS, TarShardWriter, tar_shard_prefix
+from pipeline.telemetry import configure_telemetry, get_telemetry
+from pipeline.randomization import CAR_COLORS, RandomizationPlan, planned_color, planned_light
+
+
+def clear_scene():
+    """Supprime tous les objets de la scène et toutes les données qu'ils laissent derrière eux."""
+    # Objets, collections et données des véhicules précédents, en un seul appel ; les images
+    # de rendu et du compositor sont gardées mais leurs buffers sont libérés
+    removed = [*bpy.data.objects, *bpy.data.collections, *bpy.data.materials, *bpy.data.textures,
+               *bpy.data.meshes, *bpy.data.node_groups, *bpy.data.lights, *bpy.data.cameras, *bpy.data.actions,
+               *(image for image in bpy.data.images if image.type == 'IMAGE')]
+    # Les données de session (ex. l'override de la passe masque, les sols des variantes) ont un faux utilisateur
+    bpy.data.batch_remove([block for block in removed if not block.use_fake_user])
+    invalidate_bounds()
+
+    # Ce que l'import OBJ laisse sans utilisateur (images, données orphelines, ...)
+    purge_orphans()
+    free_image_buffers()
+
+
+def get_common_car_colors():
+    """Returns a list of common car colors in RGBA format."""
+    return list(CAR_COLORS)
+
+
+def assign_random_car_color(color: tuple = None):
+    """Assigns a car color to car paint materials: the given one (e.g. planned) or a random realistic one."""
+    chosen_color = color or random.choice(get_common_car_colors())
+
+    for mat in bpy.data.materials:
+        if "carpaint" in mat.name.lower():
+            mat.use_nodes = True
+            bsdf_node = mat.node_tree.nodes.get("Principled BSDF")
+            if bsdf_node:
+                bsdf_node.inputs[0].default_value = chosen_color
+    return chosen_color
+
+
+def prepare_model(filepath: str, target_size: float = 1.0, collection_name: str = "Vehicle", offset: float = 0.1,
+                  cache_dir: str = None, template: SceneTemplate = None, color: tuple = None,
+                  light_intensity: float = 400, ground_settings: dict = None) -> tuple:
+    """
+    Loads a model, normalizes it and sets up the light, ground and camera around it.
+    :param cache_dir: Asset cache to load the normalized model from, if it holds it.
+    :param template: Rig reused for every model; without it the rig is built for this model.
+    :param color: Car paint color (e.g. planned), or None for a random one.
+    :param light_intensity: Energy of the key light when the rig is built here.
+    :param ground_settings: Keyword arguments for setup_shadows_and_reflections when the ground
+        is built here, or None to leave it without material.
+    :return: (collection, light, camera, ground plane, color, vehicle center), or None if loading failed.
+    """
+    telemetry = get_telemetry()
+    # Charger le modèle déjà normalisé depuis le cache d'assets s'il existe
+    vehicle_collection = None
+    if cache_dir:
+        with telemetry.span("import", source="cache"):
+            vehicle_collection = load_cached_model(cached_blend_path(cache_dir, filepath, target_size, offset), collection_name)
+    if not vehicle_collection:
+        with telemetry.span("import", source="obj"):
+            vehicle_collection = load_model(filepath, collection_name)
+        if not vehicle_collection:
+            return None
+
+        # Centrer et redimensionner le modèle
+        with telemetry.span("normalize"):
+            normalize_collection(vehicle_collection, target_size, offset)
+
+    with telemetry.span("scene_setup"):
+        # Configurer l'éclairage, le sol, la caméra, etc.
+        min_corner, max_corner, collection_height = get_collection_bounds(vehicle_collection)
+        vehicle_center = (min_corner + max_corner) / 2
+        vehicle_center.z += collection_height
+
+        # Réutiliser la lumière, le sol et la caméra du template s'il existe
+        if template:
+            template.place(vehicle_center, max_corner)
+            chosen_color = assign_random_car_color(color)
+            return vehicle_collection, template.light, template.camera, template.ground_plane, chosen_color, vehicle_center
+
+        light_height = max_corner.z + 10
+        light = add_light_source(location=Vector((vehicle_center.x, vehicle_center.y, light_height)), intensity=light_intensity, shadow_soft_size=7)
+
+        ground_plane = add_ground_plane(Vector((0, 0, 0)), 0)
+        if ground_settings is not None:
+            setup_shadows_and_reflections(ground_plane, **ground_settings)
+
+        # Positionner la caméra
+        camera_distance = 2
+        camera_height = vehicle_center.z
+        camera = add_camera(location=Vector((vehicle_center.x, (vehicle_center.y + camera_distance), camera_height)))
+        look_at(camera, Vector((0, 0, 0.15)))
+
+        # Assigner une couleur aléatoire (ou planifiée) au véhicule
+        chosen_color = assign_random_car_color(color)
+
+        return vehicle_collection, light, camera, ground_plane, chosen_color, vehicle_center
+
+
+class ModelJob:
+    """One model handed to a render script by DatasetRun.models, loaded and placed in the scene.
+
+    Attributes:
+        path (str): The .obj file.
+        key (str): File name without extension, used in output names.
+        model_id (str): Path relative to the dataset root without extension, the key of the ledger and the plan.
+        relative_folder (str): Folder of the model relative to the dataset root.
+        planned (dict): Rows of the model in the randomization plan, or None.
+        light_plan (tuple): Planned (energies, locations) of the light for every frame, or None.
+        collection, light, camera, ground_plane, color, center: Result of prepare_model.
+    """
+
+    def __init__(self, dataset_root: str, path: str):
+        self.path = path
+        self.key = os.path.splitext(os.path.basename(path))[0]
+        self.model_id = os.path.splitext(os.path.relpath(path, dataset_root))[0]
+        self.relative_folder = os.path.relpath(os.path.dirname(path), dataset_root)
+        self.planned = None
+        self.light_plan = None
+        self.collection = self.light = self.camera = self.ground_plane = self.color = self.center = None
+
+
+class DatasetRun:
+    """One pass of a render script over its share of the dataset.
+
+    Owns everything the render scripts share around their own render loop:
+    the model list of the shard, the randomization plan, the reused scene
+    rig, the mask compositor
+    and pass, the post-processing queue, the resource watchdog, and the
+    metadata writers, ledgers and tar shard writers the script registers.
+    models yields each model loaded and placed in the scene; once the script
+    is done with it, its files are flushed and the worker may stop to be
+    recycled. close releases everything and tells whether the worker asked
+    to be recycled.
+
+    Args:
+        dataset_root (str): Root of the asset tree.
+        output_base (str): Output folder of the script.
+        shard (tuple[int, int]): Index and count of the worker.
+        num_frames (int): Poses rendered per model.
+        round (int): Pass over the dataset, for the work queue and the randomization plan.
+        cache_dir (str): Asset cache of normalized models, or None.
+        reuse_scene (bool): Build the light, ground and camera once instead of for every model.
+        light_intensity (float): Energy of the key light.
+        ground_settings (dict): Ground material settings of the script, see prepare_model.
+        passes (tuple): Render passes of the script; the mask pass is only set up with "mask".
+        mask_encoding (str): Label file format, see pipeline.label_encoding.
+        mask_bit_depth (int): 8 or 16 bits per label.
+        postprocess_workers (int): Threads running the file work of each frame (0 = inline).
+        layout (str): Output layout; with "tar" the registered roots get a tar shard writer.
+        tar_shard_bytes (int): Size cap of each tar shard.
+        catalog (str): Model catalog restricting the work list, or None.
+        work_queue (str): Shared work queue replacing the static shard split, or None.
+        max_rss_mb (int): Resident memory after which the worker is recycled (0 = never).
+        max_datablocks (int): Blender data-block count after which the worker is recycled (0 = never).
+        randomization_plan (str): Parquet plan the model parameters come from, or None.
+    """
+
+    def __init__(self, dataset_root: str, output_base: str, shard: tuple[int, int] = (0, 1), num_frames: int = 8,
+                 round: int = 0, cache_dir: str = None, reuse_scene: bool = True, light_intensity: float = 400,
+                 ground_settings: dict = None, passes: tuple = ("image", "mask"), mask_encoding: str = "png",
+                 mask_bit_depth: int = 8, postprocess_workers: int = 2, layout: str = "flat",
+                 tar_shard_bytes: int = 1 << 30, catalog: str = None, work_queue: str = None, max_rss_mb: int = 0,
+                 max_datablocks: int = 0, randomization_plan: str = None):
+        self.dataset_root = dataset_root
+        self.output_base = output_base
+        self.shard_index, self.shard_count = shard
+        self.num_frames = num_frames
+        self.round = round
+        self.cache_dir = cache_dir
+        self.light_intensity = light_intensity
+        self.ground_settings = ground_settings
+        self.layout = layout
+        self.tar_shard_bytes = tar_shard_bytes
+        self.catalog = catalog
+        self.work_queue = work_queue
+        self.recycle = False
+
+        # Couleur, lumière et caméra tirées d'avance pour chaque (modèle, tour, frame)
+        self.plan = RandomizationPlan(randomization_plan) if randomization_plan else None
+        if self.plan and (self.plan.num_frames < num_frames or self.plan.loops <= round):
+            raise ValueError(f"{randomization_plan} plans {self.plan.loops} loops of {self.plan.num_frames} frames, "
+                             f"loop {round} of {num_frames} frames requested.")
+
+        # Construire une seule fois la lumière, le sol et la caméra ; seul le véhicule change ensuite
+        self.template = None
+        if reuse_scene:
+            clear_scene()
+            self.template = SceneTemplate(light_intensity=light_intensity, shadow_soft_size=7,
+                                          ground_settings=ground_settings)
+        # Graphe compositor et passe masque construits une seule fois par session
+        self.compositor = MaskCompositor(bit_depth=mask_bit_depth, encoding=mask_encoding)
+        self.mask_pass = MaskPass(load_render_profiles()["profiles"]["mask"], self.compositor) \
+            if "mask" in passes else None
+        self.postprocessor = PostProcessor(workers=postprocess_workers)
+        # Avec une file de travail, les modèles sont distribués au fil de l'eau par coût décroissant
+        self.job_queue = WorkQueue(work_queue) if work_queue else None
+        self.watchdog = ResourceWatchdog(max_rss_mb << 20, max_datablocks)
+
+        self._writers = []
+        self._consolidated = []
+        self._ledgers = []
+        self._tar_writers = []
+
+    def shard_file_name(self, kind: str = "metadata") -> str:
+        """Name of a per-worker CSV file, e.g. shard_file_name("unmapped_parts")."""
+        return shard_metadata_name(self.shard_index, self.shard_count).replace("metadata", kind)
+
+    def metadata_writer(self, folder: str, kind: str = "metadata", columns: list[str] = METADATA_COLUMNS,
+                        consolidate: bool = True) -> MetadataWriter:
+        """Open the per-worker CSV of a kind in a folder, synced after every model and closed with the run.
+
+        Args:
+            folder (str): Folder of the file.
+            kind (str): File kind, see shard_file_name.
+            columns (list[str]): Column order of the rows.
+            consolidate (bool): Deduplicate the rows of resumed frames when the run is closed.
+        """
+        writer = MetadataWriter(os.path.join(folder, self.shard_file_name(kind)), columns=columns)
+        self._writers.append(writer)
+        if consolidate:
+            self._consolidated.append(writer.path)
+        return writer
+
+    def ledger(self, folder: str) -> JobLedger:
+        """Open the job ledger of an output folder, closed with the run."""
+        ledger = JobLedger(os.path.join(folder, "ledger.sqlite"))
+        self._ledgers.append(ledger)
+        return ledger
+
+    def staging_dir(self, folder: str) -> str:
+        """Staging folder of the samples of an output folder with the "tar" layout, else None.
+
+        Samples left in the staging after a stop are packed first; later ones
+        are packed after every model.
+        """
+        if self.layout != "tar":
+            return None
+        prefix = tar_shard_prefix(self.shard_index, self.shard_count)
+        tar_writer = TarShardWriter(folder, prefix, os.path.join(folder, f".staging.{prefix}"),
+                                    max_bytes=self.tar_shard_bytes)
+        tar_writer.pack_staging()
+        self._tar_writers.append(tar_writer)
+        return tar_writer.staging_dir
+
+    def models(self, pending=None):
+        """Yield each model of the worker, loaded and placed in the scene.
+
+        Every model is iterated inside a "model" span of the telemetry, its
+        outcome ("skipped", "failed" or "done") recorded on the span and in the
+        models and failures counters. Models with nothing left to render,
+        missing from the randomization plan or failing to load are skipped. After the caller is done with a model,
+        every file of the model is on disk and in the ledger; if the watchdog
+        then asks for a fresh process, a "recycle" event is logged, the
+        iteration stops and recycle is set.
+
+        Args:
+            pending (Callable[[str], bool]): Whether anything is left to render for a model id (default: always).
+
+        Yields:
+            ModelJob: The model and its scene.
+        """
+        if self.job_queue:
+            models = self.job_queue.jobs(self.shard_index, round=self.round)
+            print(f"✅ Worker {self.shard_index}/{self.shard_count}, round {self.round}: "
+                  f"taking models from {self.work_queue}.")
+        else:
+            models = select_shard(list_models(self.dataset_root, self.catalog), self.shard_index, self.shard_count)
+            print(f"✅ Shard {self.shard_index}/{self.shard_count}, round {self.round}: {len(models)} models.")
+
+        telemetry = get_telemetry()
+        for obj_path in telemetry.each("model", models, key=lambda path: os.path.relpath(path, self.dataset_root)):
+            job = ModelJob(self.dataset_root, obj_path)
+            if pending is not None and not pending(job.model_id):
+                # Toutes les frames existent déjà
+                telemetry.annotate(outcome="skipped")
+                telemetry.count("models", status="skipped")
+                self._finish(job, "skipped")
+                continue
+
+            job.planned = self.plan.model(job.model_id, self.round) if self.plan else None
+            if self.plan and job.planned is None:
+                print(f"❌ {job.model_id} is not in the randomization plan {self.plan.path}.")
+                telemetry.annotate(outcome="failed")
+                telemetry.count("failures", stage="randomization")
+                self._finish(job, "failed")
+                continue
+
+            # Nettoyer la scène (ou seulement le véhicule précédent) avant de charger un nouveau véhicule
+            if self.template:
+                self.template.remove_vehicle("Vehicle")
+                purge_orphans()
+                free_image_buffers()
+            else:
+                clear_scene()
+
+            prepared = prepare_model(obj_path, target_size=1.0, collection_name="Vehicle", offset=0.01,
+                                     cache_dir=self.cache_dir, template=self.template,
+                                     color=planned_color(job.planned) if job.planned else None,
+                                     light_intensity=self.light_intensity, ground_settings=self.ground_settings)
+            if not prepared:
+                print(f"❌ Failed to load model: {obj_path}")
+                telemetry.annotate(outcome="failed")
+                telemetry.count("failures", stage="load")
+                self._finish(job, "failed")
+                continue
+            job.collection, job.light, job.camera, job.ground_plane, job.color, job.center = prepared
+            # Lumière du plan, calculée avant que les rendus n'animent la lumière
+            if job.planned:
+                job.light_plan = planned_light(job.planned, self.light_intensity, job.light.location)
+
+            yield job
+
+            # Toutes les frames du modèle sont sur disque avant de passer au suivant
+            self.postprocessor.flush()
+            for tar_writer in self._tar_writers:
+                tar_writer.pack_staging()
+            for writer in self._writers:
+                writer.sync()
+            telemetry.annotate(outcome="done")
+            telemetry.count("models", status="done")
+            record_resource_gauges(telemetry)
+
+            # Tout est sur disque et dans le ledger : le worker peut être relancé sans rien perdre
+            reason = self.watchdog.check()
+            if reason:
+                telemetry.count("recycles")
+                telemetry.event("recycle", reason=reason, model=job.model_id, round=self.round)
+                self.recycle = True
+            telemetry.flush()
+            if self.recycle:
+                self._finish(job, "done")
+                return
+
+    def _finish(self, job: ModelJob, status: str) -> None:
+        if self.job_queue:
+            self.job_queue.finish(job.path, status, worker=self.shard_index)
+
+    def close(self) -> bool:
+        """Flush, close and consolidate everything the run opened.
+
+        Returns:
+            bool: True if the worker must be restarted in a fresh process.
+        """
+        self.postprocessor.close()
+        if self.mask_pass:
+            self.mask_pass.close()
+        if self.job_queue:
+            self.job_queue.close()
+        for tar_writer in self._tar_writers:
+            tar_writer.close()
+        for writer in self._writers:
+            writer.close()
+        for ledger in self._ledgers:
+            ledger.close()
+        for path in self._consolidated:
+            consolidate_metadata(path)
+        if not self.recycle:
+            print("✅ All files processed.")
+        return self.recycle
+
+
+def add_common_arguments(parser):
+    """Add the options every render script takes to its argument parser."""
+    parser.add_argument("--pattern", choices=["orbit", "spiral", "hemisphere", "rings"], default="orbit",
+                        help="Camera pose pattern.")
+    parser.add_argument("--mask-encoding", choices=sorted(LABEL_EXTENSIONS), default="png",
+                        help="Label file format: grayscale PNG, compressed NPZ or COCO RLE JSON.")
+    parser.add_argument("--mask-bit-depth", type=int, choices=[8, 16], default=8,
+                        help="Bits per label; 16 allows pass indices above 255.")
+    parser.add_argument("--postprocess-workers", type=int, default=2,
+                        help="Threads renaming, hashing and recording frames while the next one renders (0 = inline).")
+    parser.add_argument("--output-layout", choices=OUTPUT_LAYOUTS, default="flat",
+                        help="flat img/ and mask/ folders, hashed fan-out sub-folders, or WebDataset tar shards.")
+    parser.add_argument("--tar-shard-mb", type=int, default=1024, help="Size cap of each tar shard.")
+    parser.add_argument("--recompress", action="store_true",
+                        help="Write PNGs with fast compression and recompress them in the background.")
+    parser.add_argument("--shard", type=parse_shard, default=(0, 1), help="Render only shard i of N, e.g. 3/8.")
+    parser.add_argument("--device", choices=["GPU", "CPU"], default="GPU")
+    parser.add_argument("--threads", type=int, default=0, help="Cycles CPU threads (0 = all cores).")
+    parser.add_argument("--cache-dir", default=None, help="Asset cache built by convert_assets.py.")
+    parser.add_argument("--catalog", default=None,
+                        help="Model catalog built by build_catalog.py; only its valid, non-duplicate models are rendered.")
+    parser.add_argument("--metrics-dir", default=None,
+                        help="Write timing spans (JSONL) and a Prometheus textfile of this worker into this folder.")
+    parser.add_argument("--cprofile", action="store_true",
+                        help="Dump a cProfile capture of every model into <metrics-dir>/profiles.")
+    parser.add_argument("--max-rss-mb", type=int, default=0,
+                        help="Recycle the worker once its resident memory exceeds this size (0 = never).")
+    parser.add_argument("--max-datablocks", type=int, default=0,
+                        help="Recycle the worker once Blender holds more data blocks than this (0 = never).")
+    parser.add_argument("--work-queue", default=None,
+                        help="Shared queue planned by launch_workers.py; replaces the static --shard model split.")
+    parser.add_argument("--rebuild-scene", action="store_true",
+                        help="Rebuild light, ground and camera for every model instead of reusing them.")
+    return parser
+
+
+def check_common_arguments(parser, args) -> None:
+    """Reject combinations of the common options that cannot work, through parser.error."""
+    if args.cprofile and not args.metrics_dir:
+        parser.error("--cprofile requires --metrics-dir, the profiles are written into it")
+
+
+def run_options(args) -> dict:
+    """DatasetRun keyword arguments given by the common options of a render script."""
+    return dict(shard=args.shard, num_frames=args.num_frames, cache_dir=args.cache_dir,
+                reuse_scene=not args.rebuild_scene, passes=tuple(args.passes), mask_encoding=args.mask_encoding,
+                mask_bit_depth=args.mask_bit_depth, postprocess_workers=args.postprocess_workers,
+                layout=args.output_layout, tar_shard_bytes=args.tar_shard_mb << 20, catalog=args.catalog,
+                work_queue=args.work_queue, max_rss_mb=args.max_rss_mb, max_datablocks=args.max_datablocks,
+                randomization_plan=args.randomization_plan)
+
+
+def setup_worker(args, compute_device_type: str = "CUDA", denoise: bool = False) -> None:
+    """Configure Blender and the worker telemetry from the common options of a render script.
+
+    Args:
+        args (argparse.Namespace): Parsed options, see add_common_arguments.
+        compute_device_type (str): Cycles GPU backend, e.g. "CUDA" or "METAL".
+        denoise (bool): Denoise the renders.
+    """
+    #Clear default objects
+    bpy.ops.object.select_all(action='SELECT')
+    bpy.ops.object.delete()
+
+    bpy.context.scene.render.engine = "CYCLES"
+    if args.device == "GPU":
+        bpy.context.preferences.addons["cycles"].preferences.compute_device_type = compute_device_type
+    bpy.context.scene.cycles.device = args.device
+    if args.threads:
+        # Chaque worker d'un lancement multi-process ne prend que sa part des cœurs
+        bpy.context.scene.render.threads_mode = 'FIXED'
+        bpy.context.scene.render.threads = args.threads
+
+    #Transparent Shadow catcher - denoisiing off for 4.0 blender
+    bpy.context.scene.cycles.use_denoising = denoise
+    bpy.context.scene.render.film_transparent = True
+    if args.recompress:
+        # Écriture rapide pendant le rendu, compression maximale en arrière-plan
+        bpy.context.scene.render.image_settings.compression = 15
+
+    # Spans et métriques du worker, un journal et un fichier Prometheus par shard
+    shard_index, shard_count = args.shard
+    telemetry_prefix = os.path.splitext(shard_metadata_name(shard_index, shard_count).replace("metadata", "telemetry"))[0]
+    configure_telemetry(args.metrics_dir, telemetry_prefix, profile=args.cprofile, labels={'worker': shard_index})
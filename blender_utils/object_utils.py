@@ -1,98 +1,153 @@
 import bpy
-from mathutils import Vector
+import numpy as np
+from mathutils import Vector, Matrix
 
-def clear_scene() -> None:
-    """Clear all objects, cameras, and lights from the scene."""
-    bpy.ops.object.select_all(action='SELECT')
-    bpy.ops.object.delete()
-    print("Scene cleared.")
-    
+from pipeline.telemetry import get_telemetry
 
-def get_collection_bounds(collection: bpy.types.Collection) -> tuple[Vector, Vector]:
-    """Compute the bounding box dimensions of all objects in the collection.
+# Bounds of each collection, kept until invalidate_bounds
+_bounds_cache = {}
 
-    Args:
-        collection (bpy.types.Collection): The collection to compute bounds for.
+
+def _object_arrays(collection: bpy.types.Collection) -> tuple[list, np.ndarray, np.ndarray]:
+    """Read the world matrices and local bounding boxes of all mesh objects in one batch.
 
     Returns:
-        tuple[Vector, Vector]: The min and max corners of the bounding box.
+        tuple[list, np.ndarray, np.ndarray]: The mesh objects, their (n, 4, 4) row-major
+        world matrices and their (n, 8, 3) local bounding box corners.
     """
-    min_corner = Vector((float("inf"), float("inf"), float("inf")))
-    max_corner = Vector((float("-inf"), float("-inf"), float("-inf")))
+    objects = collection.objects
+    count = len(objects)
+    matrices = np.empty(count * 16, dtype=np.float64)
+    corners = np.empty(count * 24, dtype=np.float64)
+    objects.foreach_get("matrix_world", matrices)
+    objects.foreach_get("bound_box", corners)
+
+    is_mesh = np.fromiter((obj.type == 'MESH' for obj in objects), dtype=bool, count=count)
+    meshes = [obj for obj, keep in zip(objects, is_mesh) if keep]
+    # foreach_get returns matrices column-major, transpose them to the mathutils layout
+    matrices = matrices.reshape(count, 4, 4).transpose(0, 2, 1)[is_mesh]
+    corners = corners.reshape(count, 8, 3)[is_mesh]
+    return meshes, matrices, corners
+
+
+def _vertex_bounds(meshes: list, matrices: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Compute the exact world-space bounds from the vertex coordinates of each mesh."""
+    min_corner = np.full(3, np.inf)
+    max_corner = np.full(3, -np.inf)
+    for obj, matrix in zip(meshes, matrices):
+        vertices = obj.data.vertices
+        if not len(vertices):
+            continue
+        coords = np.empty(len(vertices) * 3, dtype=np.float32)
+        vertices.foreach_get("co", coords)
+        world = coords.reshape(-1, 3) @ matrix[:3, :3].T + matrix[:3, 3]
+        min_corner = np.minimum(min_corner, world.min(axis=0))
+        max_corner = np.maximum(max_corner, world.max(axis=0))
+    return min_corner, max_corner
+
+
+def invalidate_bounds(collection: bpy.types.Collection = None) -> None:
+    """Drop the cached bounds of a collection, or of all collections.
+
+    Must be called after moving, scaling or editing the objects of a collection
+    or changing its members.
+
+    Args:
+        collection (bpy.types.Collection): The collection to forget, or None for all.
+    """
+    if collection is None:
+        _bounds_cache.clear()
+    else:
+        for exact in (False, True):
+            _bounds_cache.pop((collection.session_uid, exact), None)
 
-    for obj in collection.objects:
-        if obj.type == 'MESH':
-            bbox_corners = [obj.matrix_world @ Vector(corner) for corner in obj.bound_box]
-            for corner in bbox_corners:
-                min_corner = Vector(map(min, min_corner, corner))
-                max_corner = Vector(map(max, max_corner, corner))
-    collection_height = max_corner.z - min_corner.z
-    return min_corner, max_corner, collection_height
 
-def center_collection(collection: bpy.types.Collection, offset: float = 0.0) -> None:
-    """Center the collection at the origin (0, 0, 0) and apply an optional offset.
+def get_collection_bounds(collection: bpy.types.Collection, exact: bool = False) -> tuple[Vector, Vector, float]:
+    """Compute the bounding box dimensions of all objects in the collection.
+
+    All matrices and bounding boxes are read with one foreach_get call each and
+    transformed with NumPy. The result is cached per collection and returned
+    without reading anything until invalidate_bounds is called; the helpers of
+    this module that transform objects call it themselves.
 
     Args:
-        collection (bpy.types.Collection): The collection to center.
-        offset (float): The vertical offset to apply after centering.
-    """
-    min_corner, max_corner, collection_height = get_collection_bounds(collection)
-    collection_center = (min_corner + max_corner) / 2
+        collection (bpy.types.Collection): The collection to compute bounds for.
+        exact (bool): Use the vertex coordinates instead of the object bounding boxes.
+            Tighter for rotated objects, but reads every vertex.
 
-    for obj in collection.objects:
-        obj.location -= collection_center
-        obj.location.z += offset + collection_height/2 
+    Returns:
+        tuple[Vector, Vector, float]: The min and max corners of the bounding box and its height.
+    """
+    # session_uid n'est jamais réutilisé : un nouveau modèle nommé "Vehicle" ne touche pas le cache du précédent
+    key = (collection.session_uid, exact)
+    if key in _bounds_cache:
+        min_corner, max_corner = _bounds_cache[key]
+    else:
+        meshes, matrices, corners = _object_arrays(collection)
+        if not meshes:
+            min_corner, max_corner = np.full(3, np.inf), np.full(3, -np.inf)
+        elif exact:
+            min_corner, max_corner = _vertex_bounds(meshes, matrices)
+        else:
+            world = np.einsum('nij,nkj->nki', matrices[:, :3, :3], corners) + matrices[:, None, :3, 3]
+            min_corner = world.min(axis=(0, 1))
+            max_corner = world.max(axis=(0, 1))
+        _bounds_cache[key] = (min_corner, max_corner)
+
+    # Fresh Vectors each call: callers modify them in place
+    min_corner, max_corner = Vector(min_corner), Vector(max_corner)
+    collection_height = max_corner.z - min_corner.z
+    return min_corner, max_corner, collection_height
 
-    print(f"Collection '{collection.name}' centered at origin with offset {offset}.")
-    
-def apply_transforms(obj):
-    """Apply location, rotation, and scale transformations to an object."""
-    bpy.context.view_layer.objects.active = obj
-    obj.select_set(True)
-    bpy.ops.object.transform_apply(location=True, rotation=True, scale=True)
-    obj.select_set(False)
-    
-def reset_origin_to_geometry(obj):
-    """Reset the origin of an object to the center of its geometry."""
-    bpy.context.view_layer.objects.active = obj
-    obj.select_set(True)
-    bpy.ops.object.origin_set(type='ORIGIN_GEOMETRY', center='BOUNDS')
-    obj.select_set(False)
+def normalize_collection(collection: bpy.types.Collection, target_size: float = 1.0, offset: float = 0.0) -> float:
+    """Center and scale the collection by editing mesh data directly, without operators.
 
-def scale_collection(collection: bpy.types.Collection, target_size: float = 1.0) -> None:
-    """Scale the collection uniformly to fit within a target size.
+    The model is centered on the origin with its lowest point at the offset,
+    scaled so that its largest dimension equals target_size, and every object
+    ends up with an identity transform. One combined matrix is baked into each
+    mesh with Mesh.transform, so there is no selection or context switching
+    and the cost only depends on the collection itself.
 
     Args:
-        collection (bpy.types.Collection): The collection to scale.
+        collection (bpy.types.Collection): The collection to normalize. Its objects must not be parented.
         target_size (float): The target size for the collection.
-    """
-    # Reset origin and apply transformations to all objects in the collection
-    for obj in collection.objects:
-        reset_origin_to_geometry(obj)
-        apply_transforms(obj)
+        offset (float): The vertical offset applied after centering, before scaling.
 
-    # Calculate the bounding box of the collection
-    min_corner, max_corner, _ = get_collection_bounds(collection)
+    Returns:
+        float: The scale factor that was applied.
+    """
+    min_corner, max_corner, collection_height = get_collection_bounds(collection)
     dimensions = max_corner - min_corner
-    print(f"Dimensions before scaling: {dimensions}")
-
-    # Calculate the scale factor
     scale_factor = target_size / max(dimensions) if max(dimensions) > 0 else 1.0
-    print(f"Scale factor: {scale_factor}")
 
-    # Apply the scale to each object
+    translation = -(min_corner + max_corner) / 2
+    translation.z += offset + collection_height / 2
+    transform = Matrix.Diagonal((scale_factor, scale_factor, scale_factor, 1.0)) @ Matrix.Translation(translation)
+
+    # Each object bakes its own matrix into its mesh: a mesh shared by several objects is copied
+    # for every user but the first while it is still untransformed
+    mesh_users = {}
     for obj in collection.objects:
-        obj.scale = (scale_factor, scale_factor, scale_factor)
-        bpy.ops.object.transform_apply(scale=True)  # Apply the scale transformation
+        if obj.type == 'MESH':
+            mesh_users.setdefault(obj.data, []).append(obj)
+        else:
+            obj.matrix_world = transform @ obj.matrix_world
+    for mesh, users in mesh_users.items():
+        meshes = [mesh] + [mesh.copy() for _ in users[1:]]
+        for obj, data in zip(users, meshes):
+            obj.data = data
+            data.transform(transform @ obj.matrix_world)
+            data.update()
+            obj.matrix_world = Matrix.Identity(4)
+
+    # Refresh the object bounding boxes from the edited meshes
+    bpy.context.view_layer.update()
+    invalidate_bounds(collection)
+
+    get_telemetry().annotate(scale_factor=scale_factor)
+    return scale_factor
 
-    # Verify dimensions after scaling
-    min_corner, max_corner, _ = get_collection_bounds(collection)
-    dimensions = max_corner - min_corner
-    print(f"Dimensions after scaling: {dimensions}")
 
-    print(f"Collection '{collection.name}' scaled to fit within size {target_size}.")
-    
-    
 def add_ground_plane(collection_center: Vector, offset: float = 0.01) -> bpy.types.Object:
     """Adds a ground plane below the collection center.
 
@@ -0,0 +1,31 @@
+import os
+import bpy
+import yaml
+
+project_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_OUTPUT_FORMATS = os.path.join(project_path, "output_formats.yaml")
+
+
+def load_output_formats(filepath: str = DEFAULT_OUTPUT_FORMATS) -> dict[str, dict]:
+    """Load the output formats (resolution and camera framing) rendered for each model.
+
+    Args:
+        filepath (str): Path to the YAML config, by default the one shipped with the project.
+
+    Returns:
+        dict[str, dict]: Settings of each format name.
+    """
+    with open(filepath, 'r') as file:
+        return yaml.safe_load(file)["formats"]
+
+
+def apply_output_format(output_format: dict, scene: bpy.types.Scene = None) -> None:
+    """Set the render resolution of a format.
+
+    Args:
+        output_format (dict): One entry of load_output_formats.
+        scene (bpy.types.Scene): The scene to configure, by default the current one.
+    """
+    scene = scene or bpy.context.scene
+    scene.render.resolution_x, scene.render.resolution_y = output_format["resolution"]
+    scene.render.resolution_percentage = 100
@@ -0,0 +1,101 @@
+import os
+import bpy
+import yaml
+
+project_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_RENDER_PROFILES = os.path.join(project_path, "render_profiles.yaml")
+
+# Profile keys copied as-is onto scene.cycles
+CYCLES_SETTINGS = {
+    "samples": "samples",
+    "max_bounces": "max_bounces",
+    "diffuse_bounces": "diffuse_bounces",
+    "glossy_bounces": "glossy_bounces",
+    "transmission_bounces": "transmission_bounces",
+    "volume_bounces": "volume_bounces",
+    "transparent_max_bounces": "transparent_max_bounces",
+    "tile_size": "tile_size",
+    "filter_width": "filter_width",
+    "denoiser": "denoiser",
+}
+
+
+def load_render_profiles(filepath: str = DEFAULT_RENDER_PROFILES) -> dict:
+    """Load the render quality profiles and the per-variant profile mapping.
+
+    Args:
+        filepath (str): Path to the YAML config, by default the one shipped with the project.
+
+    Returns:
+        dict: The config, with "profiles" and "variant_profiles" entries.
+    """
+    with open(filepath, 'r') as file:
+        config = yaml.safe_load(file)
+    config.setdefault("profiles", {})
+    config.setdefault("variant_profiles", {})
+    return config
+
+
+def apply_render_profile(profile: dict, scene: bpy.types.Scene = None) -> None:
+    """Apply a render quality profile to the Cycles settings of a scene.
+
+    Args:
+        profile (dict): One entry of the "profiles" section of the config.
+        scene (bpy.types.Scene): The scene to configure, by default the current one.
+    """
+    scene = scene or bpy.context.scene
+    cycles = scene.cycles
+    for key, attribute in CYCLES_SETTINGS.items():
+        if key in profile:
+            setattr(cycles, attribute, profile[key])
+
+    if "adaptive_threshold" in profile:
+        cycles.use_adaptive_sampling = profile["adaptive_threshold"] > 0
+        if cycles.use_adaptive_sampling:
+            cycles.adaptive_threshold = profile["adaptive_threshold"]
+    if "caustics" in profile:
+        cycles.caustics_reflective = profile["caustics"]
+        cycles.caustics_refractive = profile["caustics"]
+    if "denoise" in profile:
+        cycles.use_denoising = profile["denoise"]
+    if "threads" in profile:
+        scene.render.threads_mode = 'FIXED' if profile["threads"] else 'AUTO'
+        if profile["threads"]:
+            scene.render.threads = profile["threads"]
+
+
+def capture_render_profile(scene: bpy.types.Scene = None) -> dict:
+    """Read the current settings of a scene in profile form, to restore them later.
+
+    Args:
+        scene (bpy.types.Scene): The scene to read, by default the current one.
+
+    Returns:
+        dict: A profile that apply_render_profile turns back into the same settings.
+    """
+    scene = scene or bpy.context.scene
+    cycles = scene.cycles
+    profile = {key: getattr(cycles, attribute) for key, attribute in CYCLES_SETTINGS.items()}
+    profile["adaptive_threshold"] = cycles.adaptive_threshold if cycles.use_adaptive_sampling else 0
+    profile["caustics"] = cycles.caustics_reflective
+    profile["denoise"] = cycles.use_denoising
+    profile["threads"] = scene.render.threads if scene.render.threads_mode == 'FIXED' else 0
+    return profile
+
+
+def resolve_profile(config: dict, name: str, variant: str = None) -> dict:
+    """Return the profile to use for a variant.
+
+    Args:
+        config (dict): Config from load_render_profiles.
+        name (str): Profile name, or "per-variant" to look it up in "variant_profiles".
+        variant (str): Ground variant being rendered.
+
+    Returns:
+        dict: The profile settings.
+    """
+    if name == "per-variant":
+        name = config["variant_profiles"].get(variant, "train")
+    if name not in config["profiles"]:
+        raise ValueError(f"Unknown render profile '{name}'.")
+    return config["profiles"][name]
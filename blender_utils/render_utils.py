@@ -0,0 +1,122 @@
+import re
+import time
+import bpy
+
+from pipeline.telemetry import get_telemetry
+
+# Cycles reports "Sample 12/128" once path tracing has started
+SAMPLE_PATTERN = re.compile(r"Sample \d+/\d+")
+
+
+def render_keyframed_frames(num_frames: int, on_frame_written=None, scene: bpy.types.Scene = None) -> None:
+    """Renders scene frames 0 to num_frames - 1 with a single animation render.
+
+    The camera is expected to be keyframed for each of these frames. Scene sync
+    and operator overhead are paid once for the whole sequence instead of once
+    per still render.
+
+    Args:
+        num_frames (int): Number of frames to render, starting at frame 0.
+        on_frame_written (Callable[[int], None]): Called with the scene frame right after
+            each frame has been written to disk.
+        scene (bpy.types.Scene): The scene to render, by default the current one.
+    """
+    scene = scene or bpy.context.scene
+    if num_frames <= 0:
+        return
+    scene.frame_start = 0
+    scene.frame_end = num_frames - 1
+    scene.frame_step = 1
+
+    def handler(rendered_scene, *args):
+        if on_frame_written:
+            on_frame_written(rendered_scene.frame_current)
+
+    bpy.app.handlers.render_write.append(handler)
+    try:
+        bpy.ops.render.render(animation=True)
+    finally:
+        bpy.app.handlers.render_write.remove(handler)
+
+
+class RenderSession:
+    """Keeps Cycles scene data resident across all renders of one model.
+
+    Inside the session persistent data is enabled, so geometry, BVH and
+    textures are built for the first pose only and later poses just update
+    the camera. Leaving the session disables it again, which frees that data
+    before the next model is loaded.
+
+    Each frame is also split into sync time (from render start to the first
+    sampling update reported by Cycles) and sampling time (from there until
+    the frame is done), to check what persistent data saves. Both are
+    recorded as "render_sync" and "sampling" spans of the current telemetry.
+
+    Args:
+        scene (bpy.types.Scene): The scene to render, by default the current one.
+        label (str): Name shown in the timing report, e.g. the model key.
+    """
+
+    def __init__(self, scene: bpy.types.Scene = None, label: str = ""):
+        self.scene = scene or bpy.context.scene
+        self.label = label
+        self.frame_timings = []
+        self._frame_start = None
+        self._sampling_start = None
+        self._handlers = (
+            (bpy.app.handlers.render_pre, self._on_render_pre),
+            (bpy.app.handlers.render_stats, self._on_render_stats),
+            (bpy.app.handlers.render_post, self._on_render_post),
+        )
+
+    def __enter__(self):
+        self.scene.render.use_persistent_data = True
+        for handlers, handler in self._handlers:
+            handlers.append(handler)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        for handlers, handler in self._handlers:
+            if handler in handlers:
+                handlers.remove(handler)
+        # Disabling persistent data frees the resident geometry and BVH
+        self.scene.render.use_persistent_data = False
+        if self.frame_timings:
+            get_telemetry().event("render_session", **self.report())
+
+    def _on_render_pre(self, *args):
+        self._frame_start = time.perf_counter()
+        self._sampling_start = None
+
+    def _on_render_stats(self, stats, *args):
+        if self._sampling_start is None and isinstance(stats, str) and SAMPLE_PATTERN.search(stats):
+            self._sampling_start = time.perf_counter()
+
+    def _on_render_post(self, *args):
+        if self._frame_start is None:
+            return
+        end = time.perf_counter()
+        sampling_start = self._sampling_start or end
+        self.frame_timings.append((sampling_start - self._frame_start, end - sampling_start))
+        telemetry = get_telemetry()
+        telemetry.record_span("render_sync", sampling_start - self._frame_start, session=self.label)
+        telemetry.record_span("sampling", end - sampling_start, session=self.label)
+        self._frame_start = None
+
+    def report(self) -> dict:
+        """Summarize the frame timings of the session.
+
+        Returns:
+            dict: Frame count, mean sync and sampling seconds per frame, and the sync time of the
+            first frame, which includes building the persistent data.
+        """
+        count = len(self.frame_timings)
+        sync_total = sum(sync for sync, _ in self.frame_timings)
+        sampling_total = sum(sampling for _, sampling in self.frame_timings)
+        return {
+            'label': self.label,
+            'frames': count,
+            'sync_seconds_per_frame': sync_total / count if count else 0.0,
+            'sampling_seconds_per_frame': sampling_total / count if count else 0.0,
+            'first_frame_sync_seconds': self.frame_timings[0][0] if count else 0.0,
+        }
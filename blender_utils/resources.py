@@ -0,0 +1,86 @@
+import time
+import bpy
+
+from pipeline.telemetry import Telemetry, current_rss_bytes
+
+# bpy.data collections tracked between models
+DATABLOCK_TYPES = ("objects", "meshes", "materials", "images", "textures", "node_groups", "actions",
+                   "collections", "lights", "cameras", "worlds")
+
+
+def datablock_counts() -> dict[str, int]:
+    """Number of data blocks of each tracked type, to spot what accumulates across models."""
+    return {name: len(getattr(bpy.data, name)) for name in DATABLOCK_TYPES}
+
+
+def record_resource_gauges(telemetry: Telemetry) -> None:
+    """Update the memory, data-block and throughput gauges, typically once per model."""
+    telemetry.gauge("rss_bytes", current_rss_bytes())
+    for name, count in datablock_counts().items():
+        telemetry.gauge("blender_datablocks", count, type=name)
+    elapsed_hours = (time.time() - telemetry.started_at) / 3600
+    if elapsed_hours > 0:
+        telemetry.gauge("frames_per_hour", telemetry.counter_value("frames") / elapsed_hours)
+
+
+def purge_orphans() -> int:
+    """Remove every data block left without users, recursively.
+
+    Removing a mesh can orphan its materials, which can orphan their images
+    and node groups: the purge repeats until nothing is left to remove.
+    Data blocks with a fake user, such as the mask override material or the
+    ground variant materials, are kept.
+
+    Returns:
+        int: Number of data blocks removed.
+    """
+    if hasattr(bpy.data, "orphans_purge"):
+        return bpy.data.orphans_purge(do_local_ids=True, do_linked_ids=True, do_recursive=True) or 0
+
+    # Blender sans orphans_purge récursif : balayer jusqu'à ce que plus rien ne soit orphelin
+    removed = 0
+    while True:
+        orphans = [block for name in DATABLOCK_TYPES for block in getattr(bpy.data, name)
+                   if block.users == 0 and not block.use_fake_user]
+        if not orphans:
+            return removed
+        bpy.data.batch_remove(orphans)
+        removed += len(orphans)
+
+
+def free_image_buffers() -> None:
+    """Drop the pixel buffers Blender keeps for images still in the file, e.g. render results."""
+    for image in bpy.data.images:
+        if image.has_data:
+            image.buffers_free()
+
+
+class ResourceWatchdog:
+    """Tells a long-running worker when to restart before memory gets out of hand.
+
+    Purging after every model keeps Blender's own data in check, but Python
+    objects, allocator fragmentation and leaks in add-ons still grow RSS over
+    thousands of models. Once a threshold is crossed the worker checkpoints
+    and exits with pipeline.workers.RECYCLE_EXIT_CODE so that the launcher
+    starts a fresh process, which resumes from the ledger.
+
+    Args:
+        max_rss_bytes (int): Resident memory above which the worker recycles; 0 disables the check.
+        max_datablocks (int): Total tracked data blocks above which the worker recycles; 0 disables the check.
+    """
+
+    def __init__(self, max_rss_bytes: int = 0, max_datablocks: int = 0):
+        self.max_rss_bytes = max_rss_bytes
+        self.max_datablocks = max_datablocks
+
+    def check(self) -> str:
+        """Return why the worker should recycle now, or None."""
+        if self.max_rss_bytes:
+            rss = current_rss_bytes()
+            if rss > self.max_rss_bytes:
+                return f"RSS {rss >> 20} MB above {self.max_rss_bytes >> 20} MB"
+        if self.max_datablocks:
+            total = sum(datablock_counts().values())
+            if total > self.max_datablocks:
+                return f"{total} data blocks above {self.max_datablocks}"
+        return None
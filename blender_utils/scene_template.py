@@ -0,0 +1,73 @@
+import bpy
+from mathutils import Vector
+
+from blender_utils.object_utils import add_ground_plane, invalidate_bounds
+from blender_utils.lighting import add_light_source, setup_shadows_and_reflections
+from blender_utils.camera_utils import add_camera
+from actions.camera_actions import look_at
+from pipeline.telemetry import get_telemetry
+
+
+class SceneTemplate:
+    """Light, ground plane and camera built once and reused for every model.
+
+    Only the vehicle collection changes between models: remove_vehicle deletes
+    the objects and data blocks owned by the previous vehicle and place moves
+    the light and camera around the next one.
+
+    Args:
+        light_intensity (float): Energy of the key light.
+        shadow_soft_size (float): Softness of the shadows.
+        ground_settings (dict): Keyword arguments for setup_shadows_and_reflections,
+            or None to leave the ground without material (e.g. when variants swap it).
+    """
+
+    def __init__(self, light_intensity: float = 400, shadow_soft_size: float = 7, ground_settings: dict = None):
+        self.light = add_light_source(location=Vector((0, 0, 10)), intensity=light_intensity, shadow_soft_size=shadow_soft_size)
+        self.ground_plane = add_ground_plane(Vector((0, 0, 0)), 0)
+        if ground_settings is not None:
+            setup_shadows_and_reflections(self.ground_plane, **ground_settings)
+        self.camera = add_camera(location=Vector((0, 2, 1)))
+        print("✅ Scene template built.")
+
+    def place(self, vehicle_center: Vector, max_corner: Vector, camera_distance: float = 2) -> None:
+        """Moves the light above the vehicle and the camera in front of it.
+
+        Args:
+            vehicle_center (Vector): Center of the vehicle, raised by its height.
+            max_corner (Vector): Max corner of the vehicle bounding box.
+            camera_distance (float): Distance of the camera along the Y axis.
+        """
+        self.light.location = Vector((vehicle_center.x, vehicle_center.y, max_corner.z + 10))
+        self.camera.location = Vector((vehicle_center.x, vehicle_center.y + camera_distance, vehicle_center.z))
+        look_at(self.camera, Vector((0, 0, 0.15)))
+
+    def remove_vehicle(self, collection_name: str = "Vehicle") -> int:
+        """Deletes the vehicle collection with the objects, meshes, materials and images it owns.
+
+        Everything is removed with a single batch_remove call, and rig data blocks
+        are never touched, so the depsgraph only loses the vehicle.
+
+        Args:
+            collection_name (str): Name of the vehicle collection.
+
+        Returns:
+            int: Number of data blocks removed.
+        """
+        collection = bpy.data.collections.get(collection_name)
+        if not collection:
+            return 0
+        invalidate_bounds(collection)
+
+        objects = set(collection.all_objects)
+        data = {obj.data for obj in objects if obj.data}
+        materials = {slot.material for obj in objects for slot in obj.material_slots if slot.material}
+        images = {node.image for material in materials if material.node_tree
+                  for node in material.node_tree.nodes if node.type == 'TEX_IMAGE' and node.image}
+        rig = {self.light, self.light.data, self.camera, self.camera.data, self.ground_plane, self.ground_plane.data}
+        rig |= set(self.ground_plane.data.materials)
+
+        removed = (objects | data | materials | images | {collection}) - rig
+        bpy.data.batch_remove(removed)
+        get_telemetry().annotate(removed_datablocks=len(removed))
+        return len(removed)
@@ -0,0 +1,335 @@
+import os
+import json
+import shutil
+import tempfile
+import bpy
+import numpy as np
+
+from blender_utils.render_profiles import apply_render_profile, capture_render_profile
+from pipeline.class_registry import ClassRegistry
+from pipeline.label_encoding import LABEL_EXTENSIONS, decode_rle, label_dtype, write_labels
+from pipeline.ledger import commit_frame_files
+
+
+def assign_part_indices(collection: bpy.types.Collection,
+                        registry: ClassRegistry) -> tuple[list[bpy.types.Object], list[str]]:
+    """Set the pass index of every known part in a single pass over the collection.
+
+    Objects are matched by the class registry (exact name, alias, prefix or
+    pattern, ignoring Blender's ".001" duplicate suffix).
+
+    Args:
+        collection (bpy.types.Collection): The vehicle collection.
+        registry (ClassRegistry): Compiled class rules, built once per session.
+
+    Returns:
+        tuple[list[bpy.types.Object], list[str]]: The objects that received a pass index,
+        and the names of the parts no rule matched.
+    """
+    mapped, unmapped = registry.assign(collection.objects)
+    assigned = [obj for obj, is_mapped in zip(collection.objects, mapped) if is_mapped]
+    return assigned, unmapped
+
+
+# View settings changed by set_raw_view, restored after the mask pass
+VIEW_SETTINGS = ("view_transform", "look", "exposure", "gamma", "use_curve_mapping")
+
+
+def set_raw_view(view_settings: bpy.types.ColorManagedViewSettings) -> None:
+    """Turns off every display transform, so written pixel values are the composited values."""
+    view_settings.view_transform = 'Raw'
+    view_settings.look = 'None'
+    view_settings.exposure = 0.0
+    view_settings.gamma = 1.0
+    view_settings.use_curve_mapping = False
+
+
+# Cheapest scene output of the mask pass, whose file is discarded
+SCRATCH_IMAGE_SETTINGS = {"file_format": 'PNG', "color_mode": 'BW', "color_depth": '8', "compression": 15}
+
+
+class MaskCompositor:
+    """Compositor graph writing the object index pass as a single-channel label image.
+
+    The RenderLayers -> Math -> File Output graph is built once per session;
+    per frame only the output base path and slot path change. The graph is
+    rebuilt only if something removed it from the scene.
+
+    With the "png" encoding the File Output node writes grayscale PNGs whose
+    values are the object indices; its color management is overridden with
+    the Raw view so that the scene's display transform never touches them.
+    With "npz" or "rle" the File Output node stays muted and the raw indices
+    are read back from a Viewer node instead, then written directly under
+    their final name.
+
+    Args:
+        scene (bpy.types.Scene): Scene whose compositor is used, by default the current one.
+        bit_depth (int): 8 or 16 bits per label.
+        encoding (str): "png", "npz" or "rle", see pipeline.label_encoding.
+    """
+
+    OUTPUT_NODE_NAME = "MaskOutput"
+    VIEWER_NODE_NAME = "MaskViewer"
+
+    def __init__(self, scene: bpy.types.Scene = None, bit_depth: int = 8, encoding: str = "png"):
+        if encoding not in LABEL_EXTENSIONS:
+            raise ValueError(f"Unknown label encoding '{encoding}'.")
+        self.scene = scene or bpy.context.scene
+        self.dtype = label_dtype(bit_depth)
+        self.bit_depth = bit_depth
+        self.encoding = encoding
+        self._output_node = None
+        self.build()
+
+    def build(self) -> bpy.types.CompositorNodeOutputFile:
+        """Creates the mask graph, replacing any existing compositor nodes."""
+        self.scene.view_layers["ViewLayer"].use_pass_object_index = True
+        self.scene.use_nodes = True
+        tree = self.scene.node_tree
+        nodes = tree.nodes
+        links = tree.links
+
+        # Remove existing nodes
+        nodes.clear()
+
+        # Add Render Layers node
+        render_layers = nodes.new(type="CompositorNodeRLayers")
+        render_layers.location = (0, 0)
+
+        # Scale indices so that the integer PNG value is the index itself
+        bw_node = nodes.new(type="CompositorNodeMath")
+        bw_node.operation = 'DIVIDE'
+        bw_node.inputs[1].default_value = np.iinfo(self.dtype).max
+        bw_node.location = (200, 0)
+
+        # Add a output node (Final Output), one channel only
+        output_node = nodes.new(type="CompositorNodeOutputFile")
+        output_node.name = self.OUTPUT_NODE_NAME
+        output_node.location = (400, 0)
+        output_node.format.file_format = 'PNG'
+        output_node.format.color_mode = 'BW'
+        output_node.format.color_depth = str(self.bit_depth)
+        output_node.format.compression = 15
+        # Valeurs écrites telles quelles : sans cela la vue d'affichage (AgX, Filmic) les transforme
+        if hasattr(output_node.format, "color_management"):
+            output_node.format.color_management = 'OVERRIDE'
+            set_raw_view(output_node.format.view_settings)
+
+        # Link the nodes
+        links.new(render_layers.outputs["IndexOB"], bw_node.inputs[0])
+        links.new(bw_node.outputs[0], output_node.inputs[0])
+
+        if self.encoding != "png":
+            # Indices bruts relus en mémoire, sans fichier intermédiaire
+            viewer_node = nodes.new(type="CompositorNodeViewer")
+            viewer_node.name = self.VIEWER_NODE_NAME
+            viewer_node.location = (400, -200)
+            links.new(render_layers.outputs["IndexOB"], viewer_node.inputs[0])
+            output_node.mute = True
+
+        self._output_node = output_node
+        print("✅ Mask compositor graph built.")
+        return output_node
+
+    @property
+    def output_node(self) -> bpy.types.CompositorNodeOutputFile:
+        """The File Output node, rebuilt only if the graph was removed."""
+        tree = self.scene.node_tree
+        if not self.scene.use_nodes or tree is None or tree.nodes.get(self.OUTPUT_NODE_NAME) is None:
+            return self.build()
+        return self._output_node
+
+    def set_enabled(self, enabled: bool) -> None:
+        """Turns mask writing on for the mask pass and off for the image pass."""
+        self.output_node.mute = not (enabled and self.encoding == "png")
+
+    def set_paths(self, base_path: str, slot_path: str) -> None:
+        """Points the mask output of the next render to a new location.
+
+        Args:
+            base_path (str): Output directory of the File Output node.
+            slot_path (str): Path of the mask relative to base_path, with '#' for the frame number.
+        """
+        output_node = self.output_node
+        output_node.base_path = base_path
+        output_node.file_slots[0].path = slot_path
+
+    def read_labels(self) -> np.ndarray:
+        """Object indices of the last composited frame, read from the Viewer node.
+
+        Returns:
+            np.ndarray: (height, width) labels, top row first.
+        """
+        viewer = bpy.data.images["Viewer Node"]
+        width, height = viewer.size
+        pixels = np.empty(width * height * viewer.channels, dtype=np.float32)
+        viewer.pixels.foreach_get(pixels)
+        labels = pixels.reshape(height, width, viewer.channels)[::-1, :, 0]
+        return np.rint(labels).astype(self.dtype)
+
+    def capture_labels(self) -> np.ndarray:
+        """Labels of the frame just rendered when they are not written by Blender, else None.
+
+        Must be called from the render handler, while the Viewer node still holds the frame.
+        """
+        return None if self.encoding == "png" else self.read_labels()
+
+    def commit_labels(self, partial_path: str, output_stem: str, labels: np.ndarray = None) -> str:
+        """Puts the labels of a rendered frame under their final name.
+
+        Does not touch bpy, so it can run on a post-processing thread.
+
+        Args:
+            partial_path (str): PNG written by the File Output node for this frame (png encoding only).
+            output_stem (str): Final path without extension.
+            labels (np.ndarray): Result of capture_labels for the frame (npz and rle encodings).
+
+        Returns:
+            str: The final path of the labels.
+        """
+        output_path = output_stem + LABEL_EXTENSIONS[self.encoding]
+        if self.encoding == "png":
+            commit_frame_files([(partial_path, output_path)])
+        else:
+            write_labels(output_path, labels, self.encoding)
+        return output_path
+
+    def read_written_labels(self, path: str) -> np.ndarray:
+        """Labels of a mask file written by this compositor, as integers.
+
+        Args:
+            path (str): Final mask file, as returned by commit_labels.
+
+        Returns:
+            np.ndarray: (height, width) labels, top row first.
+        """
+        if self.encoding == "npz":
+            with np.load(path) as data:
+                return data["labels"]
+        if self.encoding == "rle":
+            with open(path) as file:
+                encoded = json.load(file)
+            labels = np.zeros(encoded["size"], dtype=self.dtype)
+            for label, rle in encoded["classes"].items():
+                labels[decode_rle(rle)] = int(label)
+            return labels
+        image = bpy.data.images.load(path, check_existing=False)
+        try:
+            image.colorspace_settings.name = 'Non-Color'
+            width, height = image.size
+            channels = image.channels
+            pixels = np.empty(width * height * channels, dtype=np.float32)
+            image.pixels.foreach_get(pixels)
+        finally:
+            bpy.data.images.remove(image)
+        values = pixels.reshape(height, width, channels)[::-1, :, 0]
+        return np.rint(values * np.iinfo(self.dtype).max).astype(self.dtype)
+
+    def check_labels(self, path: str, indices) -> list[int]:
+        """Checks that a written mask holds nothing but background and the given pass indices.
+
+        A display transform or a lossy conversion on the way to the file shows
+        up as values that are not part indices.
+
+        Args:
+            path (str): Final mask file, as returned by commit_labels.
+            indices (Iterable[int]): Pass indices assigned to the rendered objects.
+
+        Returns:
+            list[int]: Values found in the file that are neither 0 nor one of the indices.
+        """
+        found = np.unique(self.read_written_labels(path))
+        return sorted(int(value) for value in found if value != 0 and value not in set(indices))
+
+
+def get_mask_override_material() -> bpy.types.Material:
+    """Returns the flat black emission material used to shade every object in the mask pass.
+
+    The material has a fake user, so purging orphan data between models keeps
+    it and it is only built once per session.
+    """
+    material = bpy.data.materials.get("MaskOverride")
+    if material is None:
+        material = bpy.data.materials.new(name="MaskOverride")
+        material.use_fake_user = True
+        material.use_nodes = True
+        nodes = material.node_tree.nodes
+        nodes.clear()
+        emission = nodes.new(type="ShaderNodeEmission")
+        emission.inputs["Strength"].default_value = 0.0
+        output = nodes.new(type="ShaderNodeOutputMaterial")
+        material.node_tree.links.new(emission.outputs[0], output.inputs["Surface"])
+    return material
+
+
+class MaskPass:
+    """Temporarily turns the scene into a minimal object index render.
+
+    Inside the context the mask profile (one unfiltered sample, no bounces)
+    is applied and every object is shaded with a flat emission override, so
+    no texture or BSDF is evaluated. The view transform is set to Raw so
+    that the label values are written without tone mapping. The mask output
+    node is only enabled inside the context; the previous settings are
+    restored on exit.
+
+    The scene output of the mask pass is of no use but cannot be turned off
+    for an animation render. It is written as a fast-compressed 8-bit
+    grayscale PNG into a scratch folder owned by the pass, where frame n of
+    every mask pass overwrites the same file instead of being deleted after
+    each frame; close removes the folder.
+
+    Args:
+        profile (dict): Render profile of the mask pass, the "mask" entry of render_profiles.yaml.
+        compositor (MaskCompositor): Session compositor writing the masks.
+        scene (bpy.types.Scene): The scene to render, by default the current one.
+    """
+
+    def __init__(self, profile: dict, compositor: MaskCompositor, scene: bpy.types.Scene = None):
+        self.profile = profile
+        self.compositor = compositor
+        self.scene = scene or bpy.context.scene
+        self._previous_profile = None
+        self._previous_override = None
+        self._previous_view = None
+        self._previous_output = None
+        self._scratch_dir = None
+
+    def __enter__(self):
+        view_layer = self.scene.view_layers["ViewLayer"]
+        view_settings = self.scene.view_settings
+        self._previous_profile = capture_render_profile(self.scene)
+        self._previous_override = view_layer.material_override
+        self._previous_view = {name: getattr(view_settings, name) for name in VIEW_SETTINGS}
+        apply_render_profile(self.profile, self.scene)
+        view_layer.material_override = get_mask_override_material()
+        # Aussi pour les versions de Blender sans réglage de couleur propre au nœud File Output
+        set_raw_view(view_settings)
+        render = self.scene.render
+        image_settings = render.image_settings
+        self._previous_output = (render.filepath,
+                                 {name: getattr(image_settings, name) for name in SCRATCH_IMAGE_SETTINGS})
+        if self._scratch_dir is None:
+            self._scratch_dir = tempfile.mkdtemp(prefix="mask_pass_")
+        render.filepath = os.path.join(self._scratch_dir, "discard_####")
+        for name, value in SCRATCH_IMAGE_SETTINGS.items():
+            setattr(image_settings, name, value)
+        self.compositor.set_enabled(True)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.scene.view_layers["ViewLayer"].material_override = self._previous_override
+        for name, value in self._previous_view.items():
+            setattr(self.scene.view_settings, name, value)
+        filepath, image_settings = self._previous_output
+        self.scene.render.filepath = filepath
+        for name, value in image_settings.items():
+            setattr(self.scene.render.image_settings, name, value)
+        apply_render_profile(self._previous_profile, self.scene)
+        # The image pass must not write masks
+        self.compositor.set_enabled(False)
+
+    def close(self) -> None:
+        """Removes the scratch folder of the discarded scene output."""
+        if self._scratch_dir is not None:
+            shutil.rmtree(self._scratch_dir, ignore_errors=True)
+            self._scratch_dir = None
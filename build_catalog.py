@@ -0,0 +1,23 @@
+import os
+import argparse
+
+from pipeline.catalog import ModelCatalog
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scan the asset tree into the model catalog used to plan renders.")
+    parser.add_argument("--dataset-root", required=True)
+    parser.add_argument("--catalog", default=None, help="SQLite catalog (default: <dataset-root>/catalog.sqlite).")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Parallel OBJ parser processes.")
+    args = parser.parse_args()
+
+    catalog_path = args.catalog or os.path.join(args.dataset_root, "catalog.sqlite")
+    with ModelCatalog(catalog_path) as catalog:
+        counts = catalog.update(args.dataset_root, workers=args.workers)
+        print(f"✅ Catalog {catalog_path}: {counts['scanned']} scanned, {counts['unchanged']} unchanged, "
+              f"{counts['removed']} removed.")
+        print(f"✅ Models by status: {catalog.summary()}")
+
+
+if __name__ == "__main__":
+    main()
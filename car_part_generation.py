@@ -5,310 +5,326 @@ user_site_packages = site.getusersitepackages()
 sys.path.append(user_site_packages)
 
 import os
+import argparse
 import bpy
-import yaml
-import math
-import random
-from mathutils import Vector
-import pandas as pd
+import numpy as np
 
 project_path = os.path.dirname(os.path.abspath(__file__))
 if project_path not in sys.path:
     sys.path.append(project_path)
     
 
-from blender_utils.object_utils import center_collection, scale_collection, add_ground_plane, get_collection_bounds
-from blender_utils.lighting import add_light_source, setup_shadows_and_reflections
-from blender_utils.camera_utils import add_camera
-from models.model_loader import load_model
-from actions.camera_actions import move_camera, rotate_camera, look_at
-from actions.lighting_actions import update_light_intensity, move_light
-
-
-def clear_scene():
-    """Supprime tous les objets de la scène."""
-    bpy.ops.object.select_all(action='SELECT')  # Sélectionne tous les objets
-    bpy.ops.object.delete(use_global=False)    # Supprime les objets sélectionnés
-    
-    # Supprime également les matériaux, textures, etc. pour éviter l'accumulation
-    for material in bpy.data.materials:
-        bpy.data.materials.remove(material)
-    for texture in bpy.data.textures:
-        bpy.data.textures.remove(texture)
-    for mesh in bpy.data.meshes:
-        bpy.data.meshes.remove(mesh)
-
-def get_common_car_colors():
-    """Returns a list of common car colors in RGBA format."""
-    return [
-        (1.0, 1.0, 1.0, 1.0),  # White
-        (0.0, 0.0, 0.0, 1.0),  # Black
-        (0.5, 0.5, 0.5, 1.0),  # Gray Metallic
-        (0.75, 0.75, 0.75, 1.0),  # Silver
-        (1.0, 0.0, 0.0, 1.0),  # Red
-        (0.0, 0.0, 0.5, 1.0),  # Dark Blue
-        (0.3, 0.5, 1.0, 1.0),  # Light Blue
-        (0.0, 0.3, 0.0, 1.0),  # Dark Green
-        (0.9, 0.8, 0.6, 1.0),  # Beige
-        (1.0, 0.85, 0.0, 1.0),  # Yellow Taxi
-    ]
-    
-    
-def assign_random_car_color():
-    """Assigns a random realistic car color to car paint materials."""
-    colors = get_common_car_colors()
-    chosen_color = random.choice(colors)
-    
-    for mat in bpy.data.materials:
-        if "carpaint" in mat.name.lower():
-            mat.use_nodes = True
-            bsdf_node = mat.node_tree.nodes.get("Principled BSDF")
-            if bsdf_node:
-                bsdf_node.inputs[0].default_value = chosen_color
-    return chosen_color
-
-def prepare_model(filepath: str, target_size: float = 1.0, collection_name: str = "Vehicle", offset: float = 0.1) -> tuple:
-    # Charger le modèle
-    vehicle_collection = load_model(filepath, collection_name)
-    if not vehicle_collection:
-        return None, None, None
-
-    # Centrer et redimensionner le modèle
-    center_collection(vehicle_collection, offset)
-    scale_collection(vehicle_collection, target_size)
-    
-    # Configurer l'éclairage, le sol, la caméra, etc.
-    min_corner, max_corner, collection_height = get_collection_bounds(vehicle_collection)
-    vehicle_center = (min_corner + max_corner) / 2
-    vehicle_center.z += collection_height
-
-    light_height = max_corner.z + 10
-    light = add_light_source(location=Vector((vehicle_center.x, vehicle_center.y, light_height)), intensity=400, shadow_soft_size=7)
-
-    ground_plane = add_ground_plane(Vector((0, 0, 0)), 0)
-    setup_shadows_and_reflections(ground_plane, roughness=0.1, specular=0.9, clearcoat=0.9, clearcoat_roughness=0.1)
-    
-    # Positionner la caméra
-    camera_distance = 2
-    camera_height = vehicle_center.z 
-    camera = add_camera(location=Vector((vehicle_center.x, (vehicle_center.y + camera_distance), camera_height)))
-    look_at(camera, Vector((0,0,0.15)))
-    
-    # Assigner une couleur aléatoire au véhicule
-    chosen_color = assign_random_car_color()
-    
-    return vehicle_collection, light, camera, chosen_color, vehicle_center
-
-
-
-
-
-def car_part_segmentation_mask_assign(collection_name: str="Vehicle", file_name: str=""):
-    with open("class_gray_levels.yaml", 'r') as file:
-        f = yaml.safe_load(file)
-    bpy.context.scene.view_layers["ViewLayer"].use_pass_object_index = True
-    if collection_name in bpy.data.collections:
-        vehicle_collection = bpy.data.collections.get(collection_name)
-        for obj in vehicle_collection.objects:
-            if obj.name.split('.')[0]  not in f.keys():
-                pass
-            else:
-                obj.pass_index = f[obj.name.split('.')[0]] 
-                if obj.active_material:
-                    material = obj.active_material
-                    if material.use_nodes:
-                        bsdf_node = material.node_tree.nodes.get("Principled BSDF")
-                        if bsdf_node:
-                            bsdf_node.inputs[21].default_value = 1.0 
-          
-            bpy.context.scene.use_nodes = True
-            tree = bpy.context.scene.node_tree
-            nodes = tree.nodes
-            links = tree.links
-
-            # Remove existing nodes
-            for node in nodes:
-                nodes.remove(node)
-
-            # Add Render Layers node
-            render_layers = nodes.new(type="CompositorNodeRLayers")
-            render_layers.location = (0, 0)
-            
-            # Add a divide
-            bw_node = nodes.new(type="CompositorNodeMath")
-            bw_node.operation = 'DIVIDE'
-            bw_node.inputs[1].default_value = 255
-            bw_node.location = (200, 0)
-
-            # Add a output node (Final Output)
-            output_node = nodes.new(type="CompositorNodeOutputFile")
-            output_node.location = (400, 0)
-            output_node.format.color_mode = 'RGB'
-
-            # Link the nodes
-            links.new(render_layers.outputs["IndexOB"], bw_node.inputs[0])
-            links.new(bw_node.outputs[0], output_node.inputs[0])
-    else: 
+from blender_utils.lighting import (create_ground_variant_materials, apply_ground_variant, capture_ground_state,
+                                    restore_ground_state)
+from blender_utils.segmentation import MaskCompositor, MaskPass, assign_part_indices
+from blender_utils.model_pipeline import DatasetRun, add_common_arguments, check_common_arguments, run_options, setup_worker
+from actions.camera_actions import keyframe_camera_poses
+from actions.camera_poses import plan_poses, export_pose_table
+from blender_utils.render_utils import RenderSession, render_keyframed_frames
+from blender_utils.render_profiles import load_render_profiles, apply_render_profile, resolve_profile
+from blender_utils.output_formats import load_output_formats, apply_output_format
+from actions.lighting_actions import keyframe_light_plan
+from pipeline.metadata import MetadataWriter
+from pipeline.ledger import JobLedger, commit_frame_files, pending_frames
+from pipeline.class_registry import ClassRegistry, UNMAPPED_COLUMNS
+from pipeline.postprocess import PostProcessor, recompress_png
+from pipeline.sample_sink import layout_path, sample_key, write_sample_json
+from pipeline.hashing import file_sha256
+from pipeline.telemetry import get_telemetry
+from pipeline.workers import RECYCLE_EXIT_CODE
+
+# Énergie de la lumière principale, multipliée par le plan de randomisation s'il y en a un
+LIGHT_INTENSITY = 400
+
+# Matériau du sol, réglé pour les ombres et les reflets
+GROUND_SETTINGS = dict(roughness=0.1, specular=0.9, clearcoat=0.9, clearcoat_roughness=0.1)
+
+
+def car_part_segmentation_mask_assign(collection_name: str="Vehicle", registry: ClassRegistry=None,
+                                      compositor: MaskCompositor=None, unmapped_report: MetadataWriter=None,
+                                      model_id: str=None):
+    """
+    Assigns the part pass indices of the vehicle and returns the mask output node.
+    Unmapped parts are counted and logged as an "unmapped_parts" telemetry event.
+    :param registry: Compiled part name rules, built once by the caller.
+    :param compositor: Session compositor, built once by the caller.
+    :param unmapped_report: Sink receiving one (model, part) row per part no rule matched.
+    :param model_id: Model key written in the unmapped parts report.
+    """
+    if collection_name not in bpy.data.collections:
         return
-    return output_node
+    if registry is None:
+        registry = ClassRegistry.from_yaml()
+    if compositor is None:
+        compositor = MaskCompositor()
+
+    vehicle_collection = bpy.data.collections.get(collection_name)
+    assigned, unmapped = assign_part_indices(vehicle_collection, registry)
+    if unmapped:
+        telemetry = get_telemetry()
+        telemetry.count("unmapped_parts", len(unmapped))
+        telemetry.event("unmapped_parts", model=model_id or collection_name, parts=unmapped)
+        if unmapped_report:
+            for part in unmapped:
+                unmapped_report.write_row({'model': model_id, 'part': part})
+    for obj in assigned:
+        if obj.active_material:
+            material = obj.active_material
+            if material.use_nodes:
+                bsdf_node = material.node_tree.nodes.get("Principled BSDF")
+                if bsdf_node:
+                    bsdf_node.inputs[21].default_value = 1.0 
+    return compositor.output_node
 
 def render_360(output_folder, key, output_node, radius: float=10, height: float=3, 
-               num_frames: int=180, start_frame: int=0,
-               data_frame: pd.DataFrame=None, light=None, color=None):
+               num_frames: int=180, frames_by_pass: dict=None,
+               metadata: MetadataWriter=None, light=None, color=None,
+               ledger: JobLedger=None, model_id: str=None, pattern: str="orbit",
+               mask_pass: MaskPass=None, postprocessor: PostProcessor=None, recompress: bool=False,
+               layout: str="flat", staging_dir: str=None, jitter: tuple=(-0.3, 0.1),
+               randomization: dict=None, light_plan: tuple=None):
     """
     Renders 360-degree images at 2-degree intervals.
+    All poses are planned up front and written as camera keyframes. Images and masks are rendered
+    by two separate animation renders: the image pass with the compositor muted, the mask pass
+    with the minimal settings of mask_pass instead of a second full-quality render.
     :param output_folder: Directory to save rendered images.
     :param radius: Distance from object center.
     :param height: Camera height.
     :param num_frames: Number of images to render (default: 180 for 360° at 2° steps).
+    :param frames_by_pass: Frame indices to render for the "image" and "mask" passes
+        (default: all frames for both). A pass missing from the dict is not rendered.
+    :param metadata: Streaming sink receiving one row per rendered image.
+    :param ledger: Job ledger in which each frame is recorded once its files are in place.
+    :param model_id: Key of the model in the ledger.
+    :param pattern: Camera pose pattern, see actions.camera_poses.plan_poses.
+    :param mask_pass: Context applying the mask pass settings; without it no mask is rendered.
+    :param postprocessor: Queue running the file work of each frame; the caller flushes it
+        (default: run that work inline).
+    :param recompress: Recompress the images at the highest zlib level after rendering.
+    :param layout: "flat" img/ and mask/ folders, "fanout" hashed sub-folders, or "tar" to stage
+        each sample (image, mask, metadata JSON) in staging_dir for the tar shard writer.
+    :param staging_dir: Folder of the staged samples with the "tar" layout.
+    :param jitter: Range of the random offset added to the camera height of each pose.
+    :param randomization: Rows of the model in the randomization plan; their camera draws
+        replace the random jitter.
+    :param light_plan: Planned (energies, locations) of the light for every frame, keyframed
+        for the image pass.
+    :return: Number of images and masks rendered.
     """
     camera = bpy.data.objects.get("SceneCamera")
     
     if not camera:
         print("❌ No camera found. Exiting rendering.")
-        return
+        return 0
     
     if not os.path.exists(output_folder + "/img"):
         os.makedirs(output_folder + "/img")
     if not os.path.exists(output_folder + "/mask"):
         os.makedirs(output_folder + "/mask")
 
-    for i in range(start_frame, num_frames):
-        frame_output = os.path.join(output_folder, f"img/{key}_{i:03d}.png")
-        bpy.context.scene.render.filepath = frame_output
-
-        output_node.base_path = output_folder
-        output_node.file_slots[0].path = f"mask/{i:03d}_mask_#"
-
-        angle = i * (360 / num_frames)  # Rotate every 2 degrees
-
-        # Compute new camera position using polar coordinates
-        x = radius * math.cos(math.radians(angle + 90))
-        y = radius * math.sin(math.radians(angle + 90))
-        camera.location.x = x
-        camera.location.y = y
-        camera.location.z = random.uniform(height-0.3, height+ 0.1)
-        look_at(camera, Vector((0,0,0.15)))
-        
-        bpy.ops.render.render(write_still=True)
-        os.rename(output_folder + "/mask" + f"/{i:03d}_mask_1.png", output_folder + "/mask" + f"/{key}_{i:03d}.png")
-        print(f"✅ Rendered frame {i+1}/{num_frames}: {frame_output}")
-        
-        new_row = pd.DataFrame([{
-            'file_name': f"/{key}_{i:03d}.png",
+    postprocessor = postprocessor or PostProcessor(workers=0)
+    if frames_by_pass is None:
+        frames_by_pass = {"image": range(num_frames), "mask": range(num_frames)}
+    image_frames = list(frames_by_pass.get("image", []))
+    mask_frames = list(frames_by_pass.get("mask", [])) if mask_pass else []
+
+    # Toutes les poses sont calculées d'avance (frame de scène n -> pose frames[n])
+    positions, rotations = plan_poses(pattern, num_frames, radius, height, jitter=jitter, randomization=randomization)
+    export_pose_table(os.path.join(output_folder, "poses", f"{key}.csv"), range(num_frames), positions, rotations)
+
+    # Emplacement final des fichiers d'une frame selon la disposition de sortie
+    def output_path(kind, i):
+        if layout == "tar":
+            sample = sample_key(model_id or key, f"{i:03d}")
+            return os.path.join(staging_dir, sample + (".png" if kind == "img" else ".mask"))
+        path = layout_path(os.path.join(output_folder, kind), f"{key}_{i:03d}.png", layout)
+        return path if kind == "img" else os.path.splitext(path)[0]
+
+    def finish_image(scene_frame, i, light_intensity):
+        frame_output = output_path("img", i)
+        commit_frame_files([(os.path.join(output_folder, f"img/{key}.partial_{scene_frame:04d}.png"), frame_output)])
+        if recompress:
+            recompress_png(frame_output)
+        get_telemetry().count("frames", kind="image")
+
+        x_angle, y_angle, z_angle = np.degrees(rotations[i])
+        row = {
+            'file_name': "/" + os.path.relpath(frame_output, staging_dir if layout == "tar" else os.path.join(output_folder, "img")),
             'folder': os.path.basename(output_folder),
-            'x_angle': math.degrees(camera.rotation_euler.x),  
-            'y_angle': math.degrees(camera.rotation_euler.y),  
-            'z_angle': math.degrees(camera.rotation_euler.z),  
+            'x_angle': x_angle,  
+            'y_angle': y_angle,  
+            'z_angle': z_angle,  
             'color': color,  
             'distance': radius,  
-            'height': camera.location.z,  
-            'light_intensity': light.data.energy  
-        }])
-
-        # Use pd.concat() to append the new row
-        data_frame = pd.concat([data_frame, new_row], ignore_index=True)
-
-    return data_frame
-
-
-    
-def get_last_rendered_frame(output_base, key, num_frames):
-    """
-    Finds the last successfully rendered frame in the output directory.
-    Returns the next frame to start from.
-    """
-    shadow_dir = os.path.join(output_base, "shadow")
-    last_frame = -1
-
-    for i in range(num_frames):
-        frame_path = os.path.join(shadow_dir, f"{key}_{i:03d}.png")
-        if os.path.exists(frame_path):
-            last_frame = i
-
-    return last_frame + 1  # Start from the next frame
-
-
-def process_dataset(dataset_root, output_base, num_frames=8):
-    # Parcourir tous les sous-dossiers et fichiers dans dataset_root
-    df = pd.DataFrame(columns=['file_name', 'folder', 'x_angle', 'y_angle', 'z_angle', 'color', 'distance', 'height', 'light_intensity'])
-    for root, dirs, files in os.walk(dataset_root):
-        for file in files:
-            if file.endswith(".obj"):
-                # Chemin complet du fichier .obj
-                obj_path = os.path.join(root, file)
-                
-                # Créer un dossier de sortie basé sur le nom du sous-dossier (véhicule)
-                relative_path = os.path.relpath(root, dataset_root)
-                vehicle_output_folder = os.path.join(output_base, relative_path)
-                
-                # Créer les dossiers de sortie s'ils n'existent pas
-                os.makedirs(vehicle_output_folder, exist_ok=True)
-                os.makedirs(os.path.join(vehicle_output_folder, "img"), exist_ok=True)
-                os.makedirs(os.path.join(vehicle_output_folder, "mask"), exist_ok=True)
-                
-                # Nom du fichier sans extension (utilisé comme clé)
-                key = os.path.splitext(file)[0]
-                
-                # Vérifier si le rendu est déjà complet
-                last_frame_path = os.path.join(vehicle_output_folder, "img", f"{key}_{num_frames-1}.png")
-                if os.path.exists(last_frame_path):
-                    print(f"✅ Skipping {file}, all frames exist.")
-                    continue  # Passer au fichier suivant
-                
-                # Nettoyer la scène avant de charger un nouveau véhicule
-                clear_scene()
-                
-                # Charger le modèle et préparer la scène
-                vehicle_collection, light, camera, chosen_color, vehicle_center = prepare_model(obj_path, target_size=1.0,
-                                                                                                collection_name="Vehicle", 
-                                                                                                offset=0.01)
-                
-                #Set up output node
-                output_node = car_part_segmentation_mask_assign(file_name="class_gray_levels.yaml")
-
-                if not vehicle_collection:
-                    print(f"❌ Failed to load model: {obj_path}")
-                    continue
-                
-                # Trouver la dernière frame rendue
-                last_rendered_frame = get_last_rendered_frame(vehicle_output_folder, key, num_frames)
-                
-                # Rendre les images
-                df = render_360(vehicle_output_folder, key, output_node, radius=math.sqrt(3), height=vehicle_center.z, 
-                           num_frames=num_frames, start_frame=last_rendered_frame, 
-                           data_frame=df, light=light, color=chosen_color)
-
-                print(f"✅ Finished processing {file} in {relative_path}")
-    df.to_csv(os.path.join(output_base, "metadata.csv"), index=False)
-    print("✅ All files processed.")
-
+            'height': positions[i][2],  
+            'light_intensity': light_intensity  
+        }
+        metadata.write_row(row)
+        if layout == "tar":
+            write_sample_json(os.path.splitext(frame_output)[0] + ".json", row)
+        # Enregistrer la frame en dernier : le ledger n'affirme jamais une frame incomplète
+        if ledger:
+            ledger.mark_done(model_id, i, image=frame_output, variant="image", checksum=file_sha256(frame_output))
+
+    def finish_mask(scene_frame, i, labels):
+        mask_output = mask_pass.compositor.commit_labels(
+            os.path.join(output_folder, f"mask/{key}.partial_{scene_frame:04d}.png"),
+            output_path("mask", i), labels)
+        get_telemetry().count("frames", kind="mask")
+        if ledger:
+            ledger.mark_done(model_id, i, mask=mask_output, variant="mask", checksum=file_sha256(mask_output))
+
+    # Les handlers ne lisent que Blender ; les fichiers sont traités pendant le rendu de la frame suivante
+    def on_image_written(scene_frame):
+        i = image_frames[scene_frame]
+        postprocessor.submit(finish_image, scene_frame, i, light_plan[0][i] if light_plan else light.data.energy)
+
+    def on_mask_written(scene_frame):
+        postprocessor.submit(finish_mask, scene_frame, mask_frames[scene_frame], mask_pass.compositor.capture_labels())
+
+    # Données Cycles persistantes pour toutes les poses du modèle, libérées avant le modèle suivant
+    with RenderSession(label=key):
+        if image_frames:
+            # Rendu dans des fichiers temporaires, renommés seulement une fois complets
+            output_node.mute = True
+            keyframe_camera_poses(camera, positions[image_frames], rotations[image_frames])
+            if light_plan:
+                keyframe_light_plan(light, light_plan[0][image_frames], light_plan[1][image_frames])
+            bpy.context.scene.render.filepath = os.path.join(output_folder, f"img/{key}.partial_####")
+            with get_telemetry().span("render", kind="image"):
+                render_keyframed_frames(len(image_frames), on_image_written)
+
+        if mask_frames:
+            keyframe_camera_poses(camera, positions[mask_frames], rotations[mask_frames])
+            output_node.base_path = output_folder
+            output_node.file_slots[0].path = f"mask/{key}.partial_####"
+            with mask_pass, get_telemetry().span("render", kind="mask"):
+                render_keyframed_frames(len(mask_frames), on_mask_written)
+    return len(image_frames) + len(mask_frames)
+
+
+def process_dataset(dataset_root, output_base, num_frames=8, shard: tuple[int, int] = (0, 1),
+                    cache_dir: str = None, reuse_scene: bool = True, pattern: str = "orbit",
+                    passes: tuple = ("image", "mask"), mask_encoding: str = "png", mask_bit_depth: int = 8,
+                    postprocess_workers: int = 2, recompress: bool = False, layout: str = "flat",
+                    tar_shard_bytes: int = 1 << 30, formats: dict = None, catalog: str = None,
+                    work_queue: str = None, max_rss_mb: int = 0, max_datablocks: int = 0,
+                    randomization_plan: str = None):
+    if formats is None:
+        formats = {"landscape": load_output_formats()["landscape"]}
+    run = DatasetRun(dataset_root, output_base, shard=shard, num_frames=num_frames, cache_dir=cache_dir,
+                     reuse_scene=reuse_scene, light_intensity=LIGHT_INTENSITY, ground_settings=GROUND_SETTINGS,
+                     passes=passes, mask_encoding=mask_encoding, mask_bit_depth=mask_bit_depth,
+                     postprocess_workers=postprocess_workers, layout=layout, tar_shard_bytes=tar_shard_bytes,
+                     catalog=catalog, work_queue=work_queue, max_rss_mb=max_rss_mb, max_datablocks=max_datablocks,
+                     randomization_plan=randomization_plan)
+    print(f"✅ Formats {list(formats)}.")
+
+    # Un seul format écrit directement dans output_base ; plusieurs formats ont chacun leur sous-dossier
+    format_roots = {name: output_base if len(formats) == 1 else os.path.join(output_base, name) for name in formats}
+    metadata = {name: run.metadata_writer(root) for name, root in format_roots.items()}
+    ledgers = {name: run.ledger(root) for name, root in format_roots.items()}
+    staging_dirs = {name: run.staging_dir(root) for name, root in format_roots.items()}
+    completed = {name: {render_pass: ledger.completed_frames(render_pass) for render_pass in passes}
+                 for name, ledger in ledgers.items()}
+    # Règles de classes compilées une seule fois par session
+    registry = ClassRegistry.from_yaml()
+    unmapped_report = run.metadata_writer(output_base, "unmapped_parts", columns=UNMAPPED_COLUMNS, consolidate=False)
+    # Matériaux des variantes planifiées, gardés d'un modèle à l'autre par leur faux utilisateur, et sol du
+    # script, remis pour les modèles dont le plan ne choisit pas de variante
+    ground_materials = {}
+    default_ground = capture_ground_state(run.template.ground_plane, run.template.light) if run.template else None
+
+    # Vérifier dans le ledger de chaque format si le rendu est déjà complet
+    def frames_by_format(model_id):
+        return {name: {render_pass: pending_frames(completed[name][render_pass], model_id, num_frames)
+                       for render_pass in passes}
+                for name in formats}
+
+    def pending(model_id):
+        return any(any(frames_by_pass.values()) for frames_by_pass in frames_by_format(model_id).values())
+
+    for job in run.models(pending):
+        #Set up output node
+        with get_telemetry().span("mask_assign"):
+            output_node = car_part_segmentation_mask_assign(registry=registry, compositor=run.compositor,
+                                                            unmapped_report=unmapped_report, model_id=job.model_id)
+
+        # Sol du plan
+        if job.planned:
+            variant = job.planned['ground_variant'][0]
+            if variant:
+                if variant not in ground_materials:
+                    ground_materials.update(create_ground_variant_materials([variant]))
+                apply_ground_variant(job.ground_plane, job.light, variant, ground_materials)
+            elif default_ground:
+                # Sans variante planifiée, ne pas garder celle du modèle précédent
+                restore_ground_state(job.ground_plane, job.light, default_ground)
+
+        # Rendre les images de chaque format, à partir d'un seul chargement du modèle
+        model_frames = frames_by_format(job.model_id)
+        for name, output_format in formats.items():
+            if not any(model_frames[name].values()):
+                continue
+            # Créer un dossier de sortie basé sur le nom du sous-dossier (véhicule)
+            vehicle_output_folder = os.path.join(format_roots[name], job.relative_folder)
+            os.makedirs(os.path.join(vehicle_output_folder, "img"), exist_ok=True)
+            os.makedirs(os.path.join(vehicle_output_folder, "mask"), exist_ok=True)
+
+            apply_output_format(output_format)
+            render_360(vehicle_output_folder, job.key, output_node, radius=output_format["radius"], height=job.center.z,
+                       num_frames=num_frames, frames_by_pass=model_frames[name],
+                       metadata=metadata[name], light=job.light, color=job.color,
+                       ledger=ledgers[name], model_id=job.model_id, pattern=pattern, mask_pass=run.mask_pass,
+                       postprocessor=run.postprocessor, recompress=recompress,
+                       layout=layout, staging_dir=staging_dirs[name], jitter=tuple(output_format["jitter"]),
+                       randomization=job.planned, light_plan=job.light_plan)
+    return run.close()
+
+
+def parse_args(argv=None):
+    """Parse the script arguments passed after '--' on the Blender command line."""
+    if argv is None:
+        argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    parser = argparse.ArgumentParser(description="Render car part segmentation data.")
+    parser.add_argument("--dataset-root", default="/home/yannou/OneDrive/Documents/deeplearning/data/car_3d")
+    parser.add_argument("--output-base", default="/home/yannou/OneDrive/Documents/deeplearning/data/output")
+    parser.add_argument("--num-frames", type=int, default=8)
+    parser.add_argument("--formats", nargs="+", choices=sorted(load_output_formats()), default=["landscape"],
+                        help="Output formats from output_formats.yaml, all rendered from one load of each model. "
+                             "With several formats each one gets its own sub-folder of the output base.")
+    parser.add_argument("--passes", nargs="+", choices=["image", "mask"], default=["image", "mask"],
+                        help="Render passes to run (images and masks are rendered separately).")
+    parser.add_argument("--profile", choices=sorted(load_render_profiles()["profiles"]), default=None,
+                        help="Render quality profile from render_profiles.yaml (default: Blender settings).")
+    parser.add_argument("--randomization-plan", default=None,
+                        help="Parquet plan written by plan_randomization.py; colors, light, camera jitter and ground "
+                             "come from it instead of being drawn during the render.")
+    add_common_arguments(parser)
+    args = parser.parse_args(argv)
+    check_common_arguments(parser, args)
+    return args
 
 
 def main():
-    bpy.ops.object.select_all(action='SELECT')
-    bpy.ops.object.delete()
+    args = parse_args()
+    setup_worker(args, compute_device_type="CUDA", denoise=False)
 
-    bpy.context.scene.render.engine = "CYCLES"
-    bpy.context.preferences.addons["cycles"].preferences.compute_device_type = "CUDA"
-    bpy.context.scene.cycles.device = "GPU"
-    
-    #Transparent Shadow catcher - denoisiing off for 4.0 blender
-    bpy.context.scene.cycles.use_denoising = False
-    bpy.context.scene.render.film_transparent = True
+    # Profil de qualité nommé ; --threads garde la priorité sur celui du profil
+    if args.profile:
+        profile = dict(resolve_profile(load_render_profiles(), args.profile))
+        if args.threads:
+            profile["threads"] = args.threads
+        apply_render_profile(profile)
+
+    output_formats = load_output_formats()
+    recycle = process_dataset(args.dataset_root, args.output_base, pattern=args.pattern, recompress=args.recompress,
+                              formats={name: output_formats[name] for name in args.formats}, **run_options(args))
+    get_telemetry().close()
+    if recycle:
+        sys.exit(RECYCLE_EXIT_CODE)
 
-    output_base = "/home/yannou/OneDrive/Documents/deeplearning/data/output"
-    dataset_root = "/home/yannou/OneDrive/Documents/deeplearning/data/car_3d"
 
-    process_dataset(dataset_root, output_base, num_frames=8)       
-    
 if __name__ == "__main__":
     main()
-    
-    
-    
-    
-    
-    
-    
-    
@@ -0,0 +1,93 @@
+import site
+import sys
+
+user_site_packages = site.getusersitepackages()
+sys.path.append(user_site_packages)
+
+import os
+import time
+import argparse
+
+project_path = os.path.dirname(os.path.abspath(__file__))
+if project_path not in sys.path:
+    sys.path.append(project_path)
+
+from pipeline.class_registry import ClassRegistry
+from models.asset_cache import cached_blend_path, convert_to_blend, load_cached_model
+from pipeline.catalog import list_models
+from pipeline.sharding import parse_shard, select_shard, shard_metadata_name
+from pipeline.metadata import MetadataWriter
+from blender_utils.model_pipeline import clear_scene
+
+TIMING_COLUMNS = ['model', 'blend', 'convert_seconds', 'cached_load_seconds']
+
+
+def convert_dataset(dataset_root, cache_dir, target_size=1.0, offset=0.01, shard: tuple[int, int] = (0, 1),
+                    catalog: str = None):
+    """Convert every model of a shard into a normalized .blend file in the asset cache.
+
+    For each converted model the time spent on the conversion (OBJ import,
+    normalization, part indices and .blend write) is recorded next to the
+    time needed to load the cached file. The conversion also covers work a
+    render worker does not repeat, so the first column is an upper bound of
+    what the cache saves.
+    """
+    shard_index, shard_count = shard
+    registry = ClassRegistry.from_yaml()
+    models = select_shard(list_models(dataset_root, catalog), shard_index, shard_count)
+    timings = MetadataWriter(os.path.join(cache_dir, shard_metadata_name(shard_index, shard_count).replace("metadata", "timings")),
+                             columns=TIMING_COLUMNS)
+    print(f"✅ Shard {shard_index}/{shard_count}: {len(models)} models to convert.")
+
+    for obj_path in models:
+        blend_path = cached_blend_path(cache_dir, obj_path, target_size, offset)
+        if os.path.exists(blend_path):
+            print(f"✅ Skipping {obj_path}, already cached.")
+            continue
+
+        clear_scene()
+        start = time.perf_counter()
+        if not convert_to_blend(obj_path, blend_path, registry, target_size, offset):
+            print(f"❌ Failed to load model: {obj_path}")
+            continue
+        convert_seconds = time.perf_counter() - start
+
+        clear_scene()
+        start = time.perf_counter()
+        load_cached_model(blend_path)
+        cached_load_seconds = time.perf_counter() - start
+
+        timings.write_row({
+            'model': os.path.relpath(obj_path, dataset_root),
+            'blend': os.path.relpath(blend_path, cache_dir),
+            'convert_seconds': convert_seconds,
+            'cached_load_seconds': cached_load_seconds,
+        })
+        print(f"✅ {obj_path}: converted in {convert_seconds:.2f}s, {cached_load_seconds:.2f}s from cache")
+
+    timings.close()
+    print("✅ All files converted.")
+
+
+def parse_args(argv=None):
+    """Parse the script arguments passed after '--' on the Blender command line."""
+    if argv is None:
+        argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    parser = argparse.ArgumentParser(description="Convert OBJ models into normalized cached .blend files.")
+    parser.add_argument("--dataset-root", required=True)
+    parser.add_argument("--cache-dir", required=True)
+    parser.add_argument("--target-size", type=float, default=1.0)
+    parser.add_argument("--offset", type=float, default=0.01)
+    parser.add_argument("--shard", type=parse_shard, default=(0, 1), help="Convert only shard i of N, e.g. 3/8.")
+    parser.add_argument("--catalog", default=None, help="Model catalog built by build_catalog.py.")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    convert_dataset(args.dataset_root, args.cache_dir, args.target_size, args.offset, shard=args.shard,
+                    catalog=args.catalog)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+import os
+import sys
+import argparse
+
+from pipeline.catalog import ModelCatalog
+from pipeline.scheduler import WorkQueue, learn_cost_model
+from pipeline.supervisor import ModelSupervisor
+from pipeline.sharding import find_shard_metadata_dirs, merge_shard_metadata
+from pipeline.telemetry import configure_telemetry, get_telemetry
+from pipeline.workers import run_blender_workers
+
+project_path = os.path.dirname(os.path.abspath(__file__))
+
+# Render scripts that take --formats
+FORMAT_SCRIPTS = ("car_part_generation.py",)
+
+
+def render_worker_args(args, index: int) -> list[str]:
+    """Build the render script arguments of one shard."""
+    worker_args = [
+        "--dataset-root", args.dataset_root,
+        "--output-base", args.output_base,
+        "--num-frames", str(args.num_frames),
+        "--shard", f"{index}/{args.workers}",
+        "--device", args.device,
+        "--threads", str(args.threads),
+    ]
+    if args.cache_dir:
+        worker_args += ["--cache-dir", args.cache_dir]
+    if args.profile:
+        worker_args += ["--profile", args.profile]
+    if args.formats:
+        worker_args += ["--formats", *args.formats]
+    if args.catalog:
+        worker_args += ["--catalog", args.catalog, "--work-queue", work_queue_path(args)]
+    if args.metrics_dir:
+        worker_args += ["--metrics-dir", args.metrics_dir]
+    if args.max_rss_mb:
+        worker_args += ["--max-rss-mb", str(args.max_rss_mb)]
+    if args.max_datablocks:
+        worker_args += ["--max-datablocks", str(args.max_datablocks)]
+    if args.randomization_plan:
+        worker_args += ["--randomization-plan", args.randomization_plan]
+    return worker_args
+
+
+def work_queue_path(args) -> str:
+    """Shared work queue of a render batch, next to its outputs."""
+    return os.path.join(args.output_base, "work_queue.sqlite")
+
+
+def plan_work_queue(args, catalog: ModelCatalog) -> None:
+    """Predict the cost of every model from past timings and plan the batch longest-first."""
+    kind = os.path.basename(args.script)
+    cost_model = learn_cost_model(catalog, args.dataset_root, kind)
+    features = catalog.cost_features(args.dataset_root)
+    costs = {model: cost_model.predict(features[model]) * args.num_frames
+             for model in catalog.work_list(args.dataset_root)}
+    with WorkQueue(work_queue_path(args)) as work_queue:
+        if args.retry_quarantined:
+            print(f"✅ Released {work_queue.release_quarantine()} quarantined models.")
+        quarantined = work_queue.quarantined()
+        loads = work_queue.plan(costs, args.workers)
+    if quarantined:
+        # Détail des raisons dans quarantine.csv ; --retry-quarantined leur redonne une chance
+        telemetry = get_telemetry()
+        telemetry.gauge("quarantined_models", len(quarantined))
+        telemetry.event("quarantine_skipped", models=sorted(quarantined))
+        costs = {model: cost for model, cost in costs.items() if model not in quarantined}
+    if costs:
+        print(f"✅ Planned {len(costs)} models: predicted makespan {max(loads.values()):.0f}s, "
+              f"ideal {sum(costs.values()) / args.workers:.0f}s.")
+
+
+def record_work_timings(args, catalog: ModelCatalog) -> None:
+    """Store the seconds per frame measured by the workers, for the next cost model fit."""
+    with WorkQueue(work_queue_path(args)) as work_queue:
+        timings = work_queue.timings()
+    catalog.record_timings(args.dataset_root, os.path.basename(args.script),
+                           {model: seconds / args.num_frames for model, seconds in timings.items()})
+
+
+def cache_worker_args(args, index: int) -> list[str]:
+    """Build the asset conversion script arguments of one shard."""
+    worker_args = [
+        "--dataset-root", args.dataset_root,
+        "--cache-dir", args.cache_dir,
+        "--shard", f"{index}/{args.workers}",
+    ]
+    if args.catalog:
+        worker_args += ["--catalog", args.catalog]
+    return worker_args
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Render a dataset with several headless Blender workers.")
+    parser.add_argument("--workers", type=int, default=2,
+                        help="Headless Blender processes; each one holds a full copy of the scene in memory.")
+    parser.add_argument("--blender", default="blender", help="Path to the Blender executable.")
+    parser.add_argument("--script", default="car_part_generation.py", help="Render script run by every worker.")
+    parser.add_argument("--dataset-root", required=True)
+    parser.add_argument("--output-base", required=True)
+    parser.add_argument("--num-frames", type=int, default=8)
+    parser.add_argument("--device", choices=["GPU", "CPU"], default="CPU")
+    parser.add_argument("--threads", type=int, default=None,
+                        help="Cycles threads per worker (default: cores divided by workers).")
+    parser.add_argument("--cache-dir", default=None, help="Load normalized models from this asset cache.")
+    parser.add_argument("--profile", default=None, help="Render quality profile passed to every worker.")
+    parser.add_argument("--formats", nargs="+", default=None,
+                        help="Output formats passed to every worker (car_part_generation.py only).")
+    parser.add_argument("--catalog", default=None,
+                        help="Model catalog, updated before the workers start; invalid and duplicate models are "
+                             "skipped and the others are handed out longest-first from a shared work queue.")
+    parser.add_argument("--metrics-dir", default=None,
+                        help="Folder receiving the span log and Prometheus textfile of every worker and of the launcher.")
+    parser.add_argument("--max-rss-mb", type=int, default=0,
+                        help="Restart a worker in a fresh Blender process once its RSS exceeds this size (0 = never).")
+    parser.add_argument("--max-datablocks", type=int, default=0,
+                        help="Restart a worker once Blender holds more data blocks than this (0 = never).")
+    parser.add_argument("--timeout-factor", type=float, default=4.0,
+                        help="With --catalog, kill a worker whose model runs longer than this many times its "
+                             "predicted cost.")
+    parser.add_argument("--min-timeout", type=float, default=600.0,
+                        help="Smallest per-model budget in seconds, whatever the prediction.")
+    parser.add_argument("--max-attempts", type=int, default=3,
+                        help="Failures after which a model is quarantined instead of retried.")
+    parser.add_argument("--retry-backoff", type=float, default=60.0,
+                        help="Seconds before the first retry of a failed model, doubled at each failure.")
+    parser.add_argument("--retry-quarantined", action="store_true",
+                        help="Give the models quarantined by previous runs another chance.")
+    parser.add_argument("--randomization-plan", default=None,
+                        help="Parquet plan from plan_randomization.py; workers render its parameters, so the output "
+                             "does not depend on which worker renders which model.")
+    parser.add_argument("--build-cache", action="store_true",
+                        help="Convert missing models into the asset cache before rendering.")
+    args = parser.parse_args(argv)
+    if args.threads is None:
+        args.threads = max(1, (os.cpu_count() or 1) // args.workers)
+    if args.build_cache and not args.cache_dir:
+        parser.error("--build-cache requires --cache-dir")
+    # Seul car_part_generation.py rend plusieurs formats ; les autres scripts refuseraient l'option
+    if args.formats and os.path.basename(args.script) not in FORMAT_SCRIPTS:
+        parser.error(f"--formats is only accepted by {', '.join(FORMAT_SCRIPTS)}, not {args.script}")
+    return args
+
+
+def main():
+    args = parse_args()
+    # Durée de chaque worker et avertissements du lancement, à côté des métriques des workers
+    telemetry = configure_telemetry(args.metrics_dir, "launcher")
+
+    if args.catalog:
+        # Mise à jour incrémentale : seuls les modèles dont un fichier a changé depuis le dernier lancement sont relus
+        with ModelCatalog(args.catalog) as catalog:
+            counts = catalog.update(args.dataset_root)
+            print(f"✅ Catalog: {counts['scanned']} scanned, {counts['unchanged']} unchanged, "
+                  f"{counts['removed']} removed; {catalog.summary()}")
+            plan_work_queue(args, catalog)
+
+    if args.build_cache:
+        exit_codes = run_blender_workers(args.blender, os.path.join(project_path, "convert_assets.py"),
+                                         lambda index: cache_worker_args(args, index), args.workers,
+                                         args.cache_dir, log_prefix="converter")
+        if any(exit_codes):
+            # Les modèles non convertis seront importés depuis l'OBJ
+            telemetry.count("cache_failures", sum(1 for code in exit_codes if code))
+            telemetry.event("cache_incomplete", exit_codes=exit_codes)
+
+    supervisor = None
+    if args.catalog:
+        # Les délais, reprises et mises en quarantaine reposent sur la file de travail
+        supervisor = ModelSupervisor(work_queue_path(args), os.path.join(args.output_base, "quarantine.csv"),
+                                     timeout_factor=args.timeout_factor, min_timeout=args.min_timeout,
+                                     max_attempts=args.max_attempts, backoff_seconds=args.retry_backoff)
+    exit_codes = run_blender_workers(args.blender, os.path.join(project_path, args.script),
+                                     lambda index: render_worker_args(args, index), args.workers,
+                                     args.output_base, supervisor=supervisor)
+    if supervisor is not None:
+        supervisor.close()
+        with ModelCatalog(args.catalog) as catalog:
+            record_work_timings(args, catalog)
+    for folder in find_shard_metadata_dirs(args.output_base, args.workers):
+        merge_shard_metadata(folder, args.workers)
+    telemetry.close()
+    failed = [index for index, code in enumerate(exit_codes) if code != 0]
+    if failed:
+        print(f"❌ {len(failed)} worker(s) failed: {failed}")
+        sys.exit(1)
+    print("✅ All workers finished.")
+
+
+if __name__ == "__main__":
+    main()
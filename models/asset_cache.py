@@ -0,0 +1,100 @@
+import bpy
+import os
+from typing import Optional
+
+from blender_utils.object_utils import normalize_collection
+from blender_utils.segmentation import assign_part_indices
+from models.model_loader import load_model
+from pipeline.hashing import cached_content_hash
+from pipeline.class_registry import ClassRegistry
+
+# Bump when the normalization changes so stale .blend files are not reused
+CACHE_VERSION = 2
+
+
+def cached_blend_path(cache_dir: str, filepath: str, target_size: float = 1.0, offset: float = 0.01) -> str:
+    """Return the cache location of the normalized version of a model.
+
+    The key combines the content hash of the source with the normalization
+    parameters, so moving or renaming a model keeps its cache entry while
+    editing it, or changing the parameters, does not. The hash is only
+    recomputed when the size or mtime of the model or of its material
+    libraries changed (see pipeline.hashing.cached_content_hash).
+
+    Args:
+        cache_dir (str): Root of the asset cache.
+        filepath (str): Path to the source .obj file.
+        target_size (float): Size the model is scaled to.
+        offset (float): Vertical offset applied when centering.
+
+    Returns:
+        str: Path of the cached .blend file.
+    """
+    content_hash = cached_content_hash(filepath, os.path.join(cache_dir, "sources"))
+    name = f"{content_hash}_v{CACHE_VERSION}_s{target_size:g}_o{offset:g}.blend"
+    return os.path.join(cache_dir, content_hash[:2], name)
+
+
+def convert_to_blend(filepath: str, blend_path: str, registry: ClassRegistry,
+                     target_size: float = 1.0, offset: float = 0.01,
+                     collection_name: str = "Vehicle") -> Optional[bpy.types.Collection]:
+    """Import a model, normalize it, assign part indices and save it as a .blend file.
+
+    The file is written under a temporary name and renamed, so concurrent
+    converters and readers never see a partial file.
+
+    Args:
+        filepath (str): Path to the source .obj file.
+        blend_path (str): Destination, as returned by cached_blend_path.
+        registry (ClassRegistry): Compiled part name rules.
+        target_size (float): Size the model is scaled to.
+        offset (float): Vertical offset applied when centering.
+        collection_name (str): Name of the collection stored in the file.
+
+    Returns:
+        Optional[bpy.types.Collection]: The normalized collection, or None if loading failed.
+    """
+    vehicle_collection = load_model(filepath, collection_name)
+    if not vehicle_collection:
+        return None
+
+    normalize_collection(vehicle_collection, target_size, offset)
+    assign_part_indices(vehicle_collection, registry)
+
+    os.makedirs(os.path.dirname(blend_path), exist_ok=True)
+    tmp_path = blend_path + ".partial.blend"
+    bpy.data.libraries.write(tmp_path, {vehicle_collection}, path_remap='ABSOLUTE')
+    os.replace(tmp_path, blend_path)
+
+    print(f"✅ Cached normalized model '{filepath}' as '{blend_path}'.")
+    return vehicle_collection
+
+
+def load_cached_model(blend_path: str, collection_name: str = "Vehicle") -> Optional[bpy.types.Collection]:
+    """Append a normalized model from the cache into the current scene.
+
+    Args:
+        blend_path (str): Path of the cached .blend file.
+        collection_name (str): Name of the collection stored in the file.
+
+    Returns:
+        Optional[bpy.types.Collection]: The appended collection, or None if the file is missing.
+    """
+    if not os.path.exists(blend_path):
+        return None
+
+    if collection_name in bpy.data.collections:
+        bpy.data.collections.remove(bpy.data.collections[collection_name])
+
+    with bpy.data.libraries.load(blend_path, link=False) as (data_from, data_to):
+        data_to.collections = [name for name in data_from.collections if name == collection_name]
+
+    if not data_to.collections:
+        print(f"Error: No collection '{collection_name}' in '{blend_path}'.")
+        return None
+
+    vehicle_collection = data_to.collections[0]
+    bpy.context.scene.collection.children.link(vehicle_collection)
+
+    print(f"Cached model loaded into collection '{collection_name}'.")
+    return vehicle_collection
@@ -0,0 +1,337 @@
+import os
+import json
+import time
+import hashlib
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+
+from pipeline.hashing import file_content_hash
+from pipeline.sharding import discover_models
+from pipeline.class_registry import ClassRegistry
+
+# MTL statements referencing a texture file
+TEXTURE_STATEMENTS = (b"map_Kd", b"map_Ka", b"map_Ks", b"map_Ns", b"map_d", b"map_Bump", b"map_bump", b"bump",
+                      b"disp", b"decal", b"norm", b"map_Pr", b"map_Pm", b"map_Ke")
+
+
+def parse_obj_header(filepath: str) -> dict:
+    """Stream an OBJ file once and collect what is needed to plan its rendering.
+
+    Only the statement keyword of each line is inspected, so the cost is one
+    sequential read however large the file is.
+
+    Args:
+        filepath (str): Path to the .obj file.
+
+    Returns:
+        dict: Vertex, face and triangle counts, object/group names, material
+        names and referenced material libraries.
+    """
+    vertices = faces = triangles = 0
+    objects, materials, libraries = [], [], []
+    seen_objects, seen_materials = set(), set()
+    with open(filepath, "rb") as file:
+        for line in file:
+            if line.startswith(b"v "):
+                vertices += 1
+            elif line.startswith(b"f "):
+                faces += 1
+                # Un polygone de n sommets donne n - 2 triangles une fois triangulé
+                triangles += max(len(line.split()) - 3, 1)
+            elif line.startswith((b"o ", b"g ")):
+                name = line[2:].strip().decode("utf-8", "replace")
+                if name and name not in seen_objects:
+                    seen_objects.add(name)
+                    objects.append(name)
+            elif line.startswith(b"usemtl "):
+                name = line[7:].strip().decode("utf-8", "replace")
+                if name not in seen_materials:
+                    seen_materials.add(name)
+                    materials.append(name)
+            elif line.startswith(b"mtllib "):
+                libraries.extend(line[7:].strip().decode("utf-8", "replace").split())
+    return {'vertices': vertices, 'faces': faces, 'triangles': triangles, 'objects': objects, 'materials': materials,
+            'libraries': libraries}
+
+
+def parse_mtl_textures(filepath: str) -> list[str]:
+    """Return the texture files referenced by a material library, as written in the file."""
+    textures = []
+    with open(filepath, "rb") as file:
+        for line in file:
+            parts = line.strip().split()
+            if len(parts) >= 2 and parts[0] in TEXTURE_STATEMENTS:
+                # Les options (-bm 1.0, ...) précèdent le nom du fichier, toujours en dernier
+                textures.append(parts[-1].decode("utf-8", "replace"))
+    return textures
+
+
+def stat_signature(filepath: str, sources: list[str]) -> str:
+    """Combined size/mtime signature of a model and of the files it depends on.
+
+    Args:
+        filepath (str): Path to the .obj file.
+        sources (list[str]): Material libraries and textures, relative to the model folder as written
+            in the OBJ and MTL files. Missing ones are part of the signature, so their arrival is seen.
+
+    Returns:
+        str: Hex digest that changes whenever one of the files is edited, replaced, added or removed.
+    """
+    folder = os.path.dirname(filepath)
+    digest = hashlib.sha1()
+    # Noms relatifs : la signature ne dépend pas de la façon dont la racine du dataset est écrite
+    for name in (os.path.basename(filepath), *sources):
+        try:
+            stat = os.stat(os.path.join(folder, name))
+            digest.update(f"{name}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode("utf-8", "replace"))
+        except OSError:
+            digest.update(f"{name}\0missing\n".encode("utf-8", "replace"))
+    return digest.hexdigest()
+
+
+def scan_model(dataset_root: str, relative_path: str) -> dict:
+    """Parse and hash one model. Runs in a worker process, outside Blender.
+
+    Args:
+        dataset_root (str): Root of the asset tree.
+        relative_path (str): Path of the .obj file relative to dataset_root.
+
+    Returns:
+        dict: One catalog record. status is "ok", "empty" (no vertex or face) or "broken".
+        sources lists the material libraries and textures the record depends on and
+        signature is the stat_signature of the model and its sources, taken before hashing.
+    """
+    filepath = os.path.join(dataset_root, relative_path)
+    # Signature inconnue tant que le modèle n'a pas pu être lu : il sera relu au prochain passage
+    record = {'path': relative_path, 'signature': None, 'sources': [], 'hash': None,
+              'vertices': 0, 'faces': 0, 'triangles': 0, 'objects': [], 'materials': [], 'textures': [],
+              'texture_bytes': 0, 'missing_files': [], 'status': "ok", 'error': None}
+    try:
+        header = parse_obj_header(filepath)
+        libraries = header.pop('libraries')
+        folder = os.path.dirname(filepath)
+        textures = []
+        for library in libraries:
+            library_path = os.path.join(folder, library)
+            if os.path.exists(library_path):
+                textures += parse_mtl_textures(library_path)
+        sources = list(dict.fromkeys(libraries + textures))
+        # Signature prise avant le hachage : un fichier modifié entre-temps sera relu au passage suivant
+        signature = stat_signature(filepath, sources)
+        record['hash'] = file_content_hash(filepath)
+        for library in libraries:
+            if not os.path.exists(os.path.join(folder, library)):
+                record['missing_files'].append(library)
+        for texture in textures:
+            record['textures'].append(texture)
+            texture_path = os.path.join(folder, texture)
+            if os.path.exists(texture_path):
+                record['texture_bytes'] += os.path.getsize(texture_path)
+            else:
+                record['missing_files'].append(texture)
+        record.update(header)
+        record['signature'], record['sources'] = signature, sources
+        if record['vertices'] == 0 or record['faces'] == 0:
+            record['status'] = "empty"
+    except (OSError, UnicodeError) as error:
+        record['status'] = "broken"
+        record['error'] = str(error)
+    return record
+
+
+class ModelCatalog:
+    """SQLite index of the asset tree, updated incrementally.
+
+    One row per .obj file with its content hash, geometry counts, object
+    and material names, texture references, class coverage against the
+    class registry and the first model sharing its content, if any.
+
+    Args:
+        path (str): SQLite database file, created if needed.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._connection = sqlite3.connect(path, timeout=60)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            """CREATE TABLE IF NOT EXISTS models (
+                   path TEXT PRIMARY KEY,
+                   signature TEXT,
+                   sources TEXT NOT NULL,
+                   hash TEXT,
+                   vertices INTEGER NOT NULL,
+                   faces INTEGER NOT NULL,
+                   triangles INTEGER NOT NULL,
+                   texture_bytes INTEGER NOT NULL,
+                   objects TEXT NOT NULL,
+                   materials TEXT NOT NULL,
+                   textures TEXT NOT NULL,
+                   missing_files TEXT NOT NULL,
+                   unmapped_parts TEXT NOT NULL,
+                   class_coverage REAL NOT NULL,
+                   duplicate_of TEXT,
+                   status TEXT NOT NULL,
+                   error TEXT,
+                   scanned_at REAL NOT NULL
+               ) WITHOUT ROWID"""
+        )
+        self._connection.execute(
+            """CREATE TABLE IF NOT EXISTS render_timings (
+                   path TEXT NOT NULL,
+                   kind TEXT NOT NULL,
+                   seconds_per_frame REAL NOT NULL,
+                   recorded_at REAL NOT NULL
+               )"""
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS models_hash ON models (hash)")
+        self._connection.execute("CREATE INDEX IF NOT EXISTS models_status ON models (status)")
+        self._connection.execute("CREATE INDEX IF NOT EXISTS render_timings_kind ON render_timings (kind, path)")
+        self._connection.commit()
+
+    def update(self, dataset_root: str, registry: ClassRegistry = None, workers: int = None) -> dict:
+        """Bring the catalog in line with the asset tree.
+
+        A model is read again only when the stat_signature of its OBJ, material
+        libraries and textures changed, so a replaced texture or MTL file is
+        seen even though the OBJ itself is untouched. Changed or new models are
+        parsed in parallel worker processes. Rows of deleted files are removed
+        and duplicates are recomputed.
+
+        Args:
+            dataset_root (str): Root of the asset tree.
+            registry (ClassRegistry): Class rules used for the coverage (default: the shipped ones).
+            workers (int): Number of parser processes (default: one per core).
+
+        Returns:
+            dict: Counts of scanned, unchanged and removed models.
+        """
+        registry = registry or ClassRegistry.from_yaml()
+        known = {path: (signature, json.loads(sources)) for path, signature, sources in
+                 self._connection.execute("SELECT path, signature, sources FROM models")}
+
+        on_disk = set()
+        to_scan = []
+        for root, dirs, files in os.walk(dataset_root):
+            for file in files:
+                if not file.endswith(".obj"):
+                    continue
+                filepath = os.path.join(root, file)
+                relative_path = os.path.relpath(filepath, dataset_root)
+                on_disk.add(relative_path)
+                signature, sources = known.get(relative_path, (None, []))
+                if signature is None or stat_signature(filepath, sources) != signature:
+                    to_scan.append(relative_path)
+
+        removed = [path for path in known if path not in on_disk]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            records = executor.map(scan_model, [dataset_root] * len(to_scan), to_scan, chunksize=8)
+            with self._connection:
+                for record in records:
+                    self._store(record, registry)
+                self._connection.executemany("DELETE FROM models WHERE path = ?", [(path,) for path in removed])
+                self._mark_duplicates()
+        return {'scanned': len(to_scan), 'unchanged': len(on_disk) - len(to_scan), 'removed': len(removed)}
+
+    def _store(self, record: dict, registry: ClassRegistry) -> None:
+        objects = record['objects']
+        unmapped = sorted({name.split('.')[0] for name in objects if registry.lookup(name) is None})
+        mapped_count = sum(1 for name in objects if registry.lookup(name) is not None)
+        coverage = mapped_count / len(objects) if objects else 0.0
+        self._connection.execute(
+            "INSERT OR REPLACE INTO models (path, signature, sources, hash, vertices, faces, triangles, "
+            "texture_bytes, objects, materials, textures, missing_files, unmapped_parts, class_coverage, "
+            "duplicate_of, status, error, scanned_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, NULL, ?, ?, ?)",
+            (record['path'], record['signature'], json.dumps(record['sources']), record['hash'], record['vertices'],
+             record['faces'], record['triangles'], record['texture_bytes'], json.dumps(objects), json.dumps(record['materials']),
+             json.dumps(record['textures']), json.dumps(record['missing_files']), json.dumps(unmapped), coverage,
+             record['status'], record['error'], time.time()),
+        )
+
+    def _mark_duplicates(self) -> None:
+        # Le premier chemin d'un contenu est l'original, les suivants pointent vers lui
+        self._connection.execute("UPDATE models SET duplicate_of = NULL")
+        self._connection.execute(
+            """UPDATE models SET duplicate_of = (
+                   SELECT MIN(other.path) FROM models AS other
+                   WHERE other.hash = models.hash AND other.path < models.path)
+               WHERE hash IS NOT NULL"""
+        )
+
+    def work_list(self, dataset_root: str, include_duplicates: bool = False) -> list[str]:
+        """Models to render, in the same order as pipeline.sharding.discover_models.
+
+        Args:
+            dataset_root (str): Root the catalog paths are relative to.
+            include_duplicates (bool): Also render models whose content duplicates another one.
+
+        Returns:
+            list[str]: Absolute .obj paths of the valid models.
+        """
+        query = "SELECT path FROM models WHERE status = 'ok'"
+        if not include_duplicates:
+            query += " AND duplicate_of IS NULL"
+        paths = sorted(path for path, in self._connection.execute(query))
+        return [os.path.join(dataset_root, path) for path in paths]
+
+    def cost_features(self, dataset_root: str) -> dict[str, dict]:
+        """Render cost statistics of every catalogued model.
+
+        Args:
+            dataset_root (str): Root the catalog paths are relative to.
+
+        Returns:
+            dict[str, dict]: Absolute .obj path to its triangles, texture_bytes and parts.
+        """
+        features = {}
+        for path, triangles, texture_bytes, objects in self._connection.execute(
+                "SELECT path, triangles, texture_bytes, objects FROM models"):
+            features[os.path.join(dataset_root, path)] = {'triangles': triangles, 'texture_bytes': texture_bytes,
+                                                          'parts': len(json.loads(objects))}
+        return features
+
+    def record_timings(self, dataset_root: str, kind: str, timings: dict[str, float]) -> None:
+        """Append measured render times to the history the cost model learns from.
+
+        Args:
+            dataset_root (str): Root the catalog paths are relative to.
+            kind (str): Kind of job the times belong to, e.g. the render script name.
+            timings (dict[str, float]): Absolute .obj path to its seconds per rendered frame.
+        """
+        now = time.time()
+        with self._connection:
+            self._connection.executemany(
+                "INSERT INTO render_timings (path, kind, seconds_per_frame, recorded_at) VALUES (?, ?, ?, ?)",
+                [(os.path.relpath(path, dataset_root), kind, seconds, now) for path, seconds in timings.items()],
+            )
+
+    def timing_history(self, dataset_root: str, kind: str) -> dict[str, float]:
+        """Latest seconds per frame measured for each model, for one kind of job."""
+        rows = self._connection.execute(
+            "SELECT path, seconds_per_frame FROM render_timings WHERE kind = ? ORDER BY recorded_at", (kind,))
+        return {os.path.join(dataset_root, path): seconds for path, seconds in rows}
+
+    def summary(self) -> dict:
+        """Number of models per status, and of duplicates."""
+        counts = dict(self._connection.execute("SELECT status, COUNT(*) FROM models GROUP BY status"))
+        counts['duplicates'] = self._connection.execute(
+            "SELECT COUNT(*) FROM models WHERE duplicate_of IS NOT NULL").fetchone()[0]
+        return counts
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def list_models(dataset_root: str, catalog: str = None) -> list[str]:
+    """Work list of a run: the valid, non-duplicate models of the catalog if given, else every .obj file."""
+    if catalog is None:
+        return discover_models(dataset_root)
+    with ModelCatalog(catalog) as model_catalog:
+        return model_catalog.work_list(dataset_root)
@@ -0,0 +1,131 @@
+import os
+import re
+import numpy as np
+import yaml
+
+project_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_GRAY_LEVELS = os.path.join(project_path, "class_gray_levels.yaml")
+DEFAULT_CLASS_RULES = os.path.join(project_path, "class_aliases.yaml")
+
+# Columns of the per-model report of parts no rule matched
+UNMAPPED_COLUMNS = ['model', 'part']
+
+# Separators treated as "_" when matching vendor names
+SEPARATORS = re.compile(r"[\s\-]+")
+
+
+def normalize_part_name(name: str) -> str:
+    """Lowercase a part name, drop Blender's ".001" duplicate suffix and unify separators."""
+    return SEPARATORS.sub("_", name.split('.')[0].strip()).lower()
+
+
+class ClassRegistry:
+    """Maps object names to segmentation classes and their gray levels.
+
+    Rules are compiled once: exact and alias names go into one hash table,
+    prefixes are grouped by length so a lookup tries one slice per distinct
+    length, and all regular expressions are joined into a single pattern
+    matched once. Results are memoized per name, so the cost of a lookup
+    does not grow with the number of rules.
+
+    Matching order: exact class name, alias, longest prefix, first regex.
+
+    Args:
+        gray_levels (dict[str, int]): Class name to gray level, as in class_gray_levels.yaml.
+        aliases (dict[str, str]): Alternative name to class name.
+        prefixes (dict[str, str]): Name prefix to class name.
+        patterns (dict[str, str]): Regular expression, searched in the normalized name, to class name.
+    """
+
+    def __init__(self, gray_levels: dict[str, int], aliases: dict[str, str] = None,
+                 prefixes: dict[str, str] = None, patterns: dict[str, str] = None):
+        self.gray_levels = dict(gray_levels)
+        aliases = aliases or {}
+        prefixes = prefixes or {}
+        patterns = patterns or {}
+        for target in (*aliases.values(), *prefixes.values(), *patterns.values()):
+            if target not in self.gray_levels:
+                raise ValueError(f"Class rule targets unknown class '{target}'.")
+
+        self._exact = {normalize_part_name(name): name for name in self.gray_levels}
+        for alias, target in aliases.items():
+            self._exact.setdefault(normalize_part_name(alias), target)
+
+        self._prefixes = {}
+        for prefix, target in prefixes.items():
+            key = normalize_part_name(prefix)
+            self._prefixes.setdefault(len(key), {})[key] = target
+        self._prefix_lengths = sorted(self._prefixes, reverse=True)
+
+        self._pattern_targets = list(patterns.values())
+        self._pattern = None
+        if patterns:
+            groups = "|".join(f"(?P<rule{index}>{pattern})" for index, pattern in enumerate(patterns))
+            self._pattern = re.compile(groups, re.IGNORECASE)
+        self._memo = {}
+
+    @classmethod
+    def from_yaml(cls, gray_levels_path: str = DEFAULT_GRAY_LEVELS,
+                  rules_path: str = DEFAULT_CLASS_RULES) -> "ClassRegistry":
+        """Build the registry from the gray level table and the optional alias rules file.
+
+        Args:
+            gray_levels_path (str): Class name to gray level mapping.
+            rules_path (str): YAML file with "aliases", "prefixes" and "patterns" sections.
+                Ignored if it does not exist.
+
+        Returns:
+            ClassRegistry: The compiled registry.
+        """
+        with open(gray_levels_path, 'r') as file:
+            gray_levels = yaml.safe_load(file)
+        rules = {}
+        if rules_path and os.path.exists(rules_path):
+            with open(rules_path, 'r') as file:
+                rules = yaml.safe_load(file) or {}
+        return cls(gray_levels, rules.get("aliases"), rules.get("prefixes"), rules.get("patterns"))
+
+    def lookup(self, name: str) -> str:
+        """Return the class of an object name, or None if no rule matches."""
+        if name in self._memo:
+            return self._memo[name]
+        key = normalize_part_name(name)
+        match = self._exact.get(key)
+        if match is None:
+            for length in self._prefix_lengths:
+                match = self._prefixes[length].get(key[:length])
+                if match is not None:
+                    break
+        if match is None and self._pattern is not None:
+            found = self._pattern.search(key)
+            if found:
+                match = self._pattern_targets[int(found.lastgroup[len("rule"):])]
+        self._memo[name] = match
+        return match
+
+    def gray_level(self, name: str) -> int:
+        """Return the gray level of an object name, or None if it is unmapped."""
+        match = self.lookup(name)
+        return None if match is None else self.gray_levels[match]
+
+    def assign(self, objects) -> tuple[np.ndarray, list[str]]:
+        """Set the pass index of every mapped object with a single foreach_set.
+
+        Unmapped objects keep their current pass index.
+
+        Args:
+            objects: A Blender collection of objects, e.g. collection.objects.
+
+        Returns:
+            tuple[np.ndarray, list[str]]: Boolean mask of the mapped objects, in collection order,
+            and the sorted distinct names (without duplicate suffix) of the unmapped ones.
+        """
+        names = [obj.name for obj in objects]
+        levels = np.array([-1 if level is None else level for level in map(self.gray_level, names)], dtype=np.int64)
+        mapped = levels >= 0
+        pass_indices = np.empty(len(names), dtype=np.int32)
+        objects.foreach_get("pass_index", pass_indices)
+        pass_indices[mapped] = levels[mapped]
+        objects.foreach_set("pass_index", pass_indices)
+        unmapped = sorted({name.split('.')[0] for name, is_mapped in zip(names, mapped) if not is_mapped})
+        return mapped, unmapped
@@ -0,0 +1,122 @@
+import os
+import re
+import json
+import hashlib
+
+
+# "mtllib" statement at the start of an OBJ line, with the library names it references
+MTLLIB_PATTERN = re.compile(rb"^mtllib[ \t]+(.*?)[ \t]*\r?$", re.MULTILINE)
+
+
+def model_content_hash(filepath: str, chunk_size: int = 1 << 20) -> tuple[str, list[str]]:
+    """Compute the SHA-256 of a model file and of the material libraries it references.
+
+    The libraries are the ones named by the "mtllib" statements of the OBJ,
+    collected while it is hashed, and are hashed after it in order. They are
+    part of the key because they change what the import produces even when
+    the geometry is identical. Missing libraries are left out.
+
+    Args:
+        filepath (str): Path to the .obj file.
+        chunk_size (int): Read size, so large files are hashed in constant memory.
+
+    Returns:
+        tuple[str, list[str]]: Hex digest of the content and paths of the existing libraries that went into it.
+    """
+    digest = hashlib.sha256()
+    names = []
+    pending = b""
+    with open(filepath, "rb") as file:
+        while chunk := file.read(chunk_size):
+            digest.update(chunk)
+            # Seules les lignes complètes sont cherchées, la dernière attend le bloc suivant
+            lines, _, pending = (pending + chunk).rpartition(b"\n")
+            names += [name for match in MTLLIB_PATTERN.finditer(lines) for name in match.group(1).split()]
+    names += [name for match in MTLLIB_PATTERN.finditer(pending) for name in match.group(1).split()]
+
+    folder = os.path.dirname(filepath)
+    libraries = []
+    for name in dict.fromkeys(names):
+        library_path = os.path.join(folder, name.decode("utf-8", "replace"))
+        if not os.path.isfile(library_path):
+            continue
+        libraries.append(library_path)
+        with open(library_path, "rb") as file:
+            while chunk := file.read(chunk_size):
+                digest.update(chunk)
+    return digest.hexdigest(), libraries
+
+
+def file_content_hash(filepath: str, chunk_size: int = 1 << 20) -> str:
+    """Compute the SHA-256 of a model file and of its material libraries, see model_content_hash.
+
+    Args:
+        filepath (str): Path to the .obj file.
+        chunk_size (int): Read size, so large files are hashed in constant memory.
+
+    Returns:
+        str: Hex digest of the content.
+    """
+    return model_content_hash(filepath, chunk_size)[0]
+
+
+def _file_stamp(filepath: str) -> list[int]:
+    stat = os.stat(filepath)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def cached_content_hash(filepath: str, index_dir: str) -> str:
+    """Return file_content_hash of a model, reusing the last one while its files are unchanged.
+
+    The hash is stored in index_dir together with the size and mtime of the
+    OBJ and of every material library it was computed from. As long as none
+    of them changed, the stored hash is returned without reading the model,
+    so a cache lookup costs a few stat calls instead of a full pass over a
+    file of several hundred MB. The entry is written under a temporary name
+    and renamed, so concurrent workers never read a partial one.
+
+    Args:
+        filepath (str): Path to the .obj file.
+        index_dir (str): Folder holding one small JSON entry per source path.
+
+    Returns:
+        str: Hex digest of the content.
+    """
+    filepath = os.path.abspath(filepath)
+    entry_path = os.path.join(index_dir, hashlib.sha1(filepath.encode("utf-8")).hexdigest() + ".json")
+    stamp = _file_stamp(filepath)
+    try:
+        with open(entry_path) as file:
+            entry = json.load(file)
+        if entry['path'] == filepath and entry['stamp'] == stamp and all(
+                _file_stamp(library) == library_stamp for library, library_stamp in entry['libraries']):
+            return entry['hash']
+    except (OSError, ValueError, KeyError):
+        pass
+
+    content_hash, libraries = model_content_hash(filepath)
+    entry = {'path': filepath, 'stamp': stamp, 'hash': content_hash,
+             'libraries': [[library, _file_stamp(library)] for library in libraries]}
+    os.makedirs(index_dir, exist_ok=True)
+    tmp_path = f"{entry_path}.{os.getpid()}.partial"
+    with open(tmp_path, "w") as file:
+        json.dump(entry, file)
+    os.replace(tmp_path, entry_path)
+    return content_hash
+
+
+def file_sha256(filepath: str, chunk_size: int = 1 << 20) -> str:
+    """Compute the SHA-256 of a single output file, e.g. a rendered image.
+
+    Args:
+        filepath (str): File to hash.
+        chunk_size (int): Read size, so large files are hashed in constant memory.
+
+    Returns:
+        str: Hex digest of the content.
+    """
+    digest = hashlib.sha256()
+    with open(filepath, "rb") as file:
+        while chunk := file.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
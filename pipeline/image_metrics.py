@@ -0,0 +1,20 @@
+import numpy as np
+
+
+def psnr(reference: np.ndarray, image: np.ndarray, max_value: float = 1.0) -> float:
+    """Peak signal-to-noise ratio of an image against a reference, in dB.
+
+    Args:
+        reference (np.ndarray): Reference pixels.
+        image (np.ndarray): Pixels to compare, same shape as the reference.
+        max_value (float): Largest possible pixel value (1.0 for float images, 255 for uint8).
+
+    Returns:
+        float: The PSNR, or infinity for identical images.
+    """
+    if reference.shape != image.shape:
+        raise ValueError(f"Image shape {image.shape} does not match reference {reference.shape}.")
+    mse = np.mean((reference.astype(np.float64) - image.astype(np.float64)) ** 2)
+    if mse == 0:
+        return float("inf")
+    return float(10 * np.log10(max_value ** 2 / mse))
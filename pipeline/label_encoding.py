@@ -0,0 +1,69 @@
+import json
+import numpy as np
+
+# File extension of each label encoding
+LABEL_EXTENSIONS = {
+    "png": ".png",
+    "npz": ".npz",
+    "rle": ".json",
+}
+
+
+def label_dtype(bit_depth: int) -> np.dtype:
+    """Integer type holding the labels of a mask with the given bit depth (8 or 16)."""
+    if bit_depth not in (8, 16):
+        raise ValueError(f"Unsupported label bit depth {bit_depth}, expected 8 or 16.")
+    return np.dtype(np.uint8 if bit_depth == 8 else np.uint16)
+
+
+def encode_rle(mask: np.ndarray) -> dict:
+    """Uncompressed COCO run-length encoding of a binary mask.
+
+    Runs are counted in column-major order and start with the number of
+    zeros, as expected by pycocotools.
+
+    Args:
+        mask (np.ndarray): (height, width) boolean mask.
+
+    Returns:
+        dict: {"size": [height, width], "counts": [...]}.
+    """
+    pixels = np.asarray(mask, dtype=bool).ravel(order="F")
+    changes = np.flatnonzero(pixels[1:] != pixels[:-1]) + 1
+    bounds = np.concatenate(([0], changes, [pixels.size]))
+    counts = np.diff(bounds).tolist()
+    if pixels.size and pixels[0]:
+        counts.insert(0, 0)
+    return {"size": list(mask.shape), "counts": counts}
+
+
+def decode_rle(rle: dict) -> np.ndarray:
+    """Inverse of encode_rle."""
+    height, width = rle["size"]
+    values = np.arange(len(rle["counts"])) % 2 == 1
+    pixels = np.repeat(values, rle["counts"])
+    return pixels.reshape((height, width), order="F")
+
+
+def write_labels(filepath: str, labels: np.ndarray, encoding: str) -> None:
+    """Write a label image with one of the non-PNG encodings.
+
+    "npz" stores the array compressed under the key "labels"; "rle" stores a
+    JSON object with one COCO RLE per label present in the image, background
+    (0) excluded.
+
+    Args:
+        filepath (str): Destination file, used as is.
+        labels (np.ndarray): (height, width) integer labels.
+        encoding (str): "npz" or "rle".
+    """
+    if encoding == "npz":
+        # Un objet fichier évite que numpy ajoute une extension au nom demandé
+        with open(filepath, "wb") as file:
+            np.savez_compressed(file, labels=labels)
+    elif encoding == "rle":
+        classes = {str(int(label)): encode_rle(labels == label) for label in np.unique(labels) if label != 0}
+        with open(filepath, "w") as file:
+            json.dump({"size": list(labels.shape), "classes": classes}, file)
+    else:
+        raise ValueError(f"Unknown label encoding '{encoding}'.")
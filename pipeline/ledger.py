@@ -0,0 +1,94 @@
+import os
+import time
+import sqlite3
+import threading
+
+
+def commit_frame_files(renames: list[tuple[str, str]]) -> None:
+    """Atomically move freshly rendered files from their temporary to their final names.
+
+    Args:
+        renames (list[tuple[str, str]]): (temporary path, final path) pairs, e.g. image and mask.
+    """
+    for tmp_path, final_path in renames:
+        os.replace(tmp_path, final_path)
+
+
+class JobLedger:
+    """SQLite record of every frame that was fully written to disk.
+
+    A frame is keyed by (model, variant, loop, frame) and is only recorded
+    after its image and mask were renamed into place, so the ledger never
+    claims a frame whose files are missing or truncated. Several shard
+    workers may share one ledger file, and frames may be recorded from
+    post-processing threads.
+
+    Args:
+        path (str): SQLite database file, created if needed.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, timeout=60, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            """CREATE TABLE IF NOT EXISTS frames (
+                   model TEXT NOT NULL,
+                   variant TEXT NOT NULL,
+                   loop INTEGER NOT NULL,
+                   frame INTEGER NOT NULL,
+                   image TEXT,
+                   mask TEXT,
+                   completed_at REAL NOT NULL,
+                   checksum TEXT,
+                   PRIMARY KEY (variant, loop, model, frame)
+               ) WITHOUT ROWID"""
+        )
+        self._connection.commit()
+
+    def completed_frames(self, variant: str = "default", loop: int = 0) -> dict[str, set[int]]:
+        """Return the completed frames of every model for one variant and loop.
+
+        This is a single range scan on the primary key, done once at startup
+        instead of probing the filesystem for every frame.
+
+        Returns:
+            dict[str, set[int]]: Completed frame indices per model key.
+        """
+        completed = {}
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT model, frame FROM frames WHERE variant = ? AND loop = ?", (variant, loop)
+            ).fetchall()
+        for model, frame in rows:
+            completed.setdefault(model, set()).add(frame)
+        return completed
+
+    def mark_done(self, model: str, frame: int, image: str = None, mask: str = None,
+                  variant: str = "default", loop: int = 0, checksum: str = None) -> None:
+        """Record a frame as complete. Call only once its files are in their final place."""
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO frames (model, variant, loop, frame, image, mask, completed_at, checksum) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (model, variant, loop, frame, image, mask, time.time(), checksum),
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def pending_frames(completed: dict[str, set[int]], model: str, num_frames: int) -> list[int]:
+    """Return the frames of a model that still have to be rendered."""
+    done = completed.get(model, set())
+    return [frame for frame in range(num_frames) if frame not in done]
@@ -0,0 +1,206 @@
+import os
+import json
+import hashlib
+import numpy as np
+import yaml
+
+project_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_RANDOMIZATION = os.path.join(project_path, "randomization.yaml")
+
+# Common car colors in RGBA format
+CAR_COLORS = [
+    (1.0, 1.0, 1.0, 1.0),  # White
+    (0.0, 0.0, 0.0, 1.0),  # Black
+    (0.5, 0.5, 0.5, 1.0),  # Gray Metallic
+    (0.75, 0.75, 0.75, 1.0),  # Silver
+    (1.0, 0.0, 0.0, 1.0),  # Red
+    (0.0, 0.0, 0.5, 1.0),  # Dark Blue
+    (0.3, 0.5, 1.0, 1.0),  # Light Blue
+    (0.0, 0.3, 0.0, 1.0),  # Dark Green
+    (0.9, 0.8, 0.6, 1.0),  # Beige
+    (1.0, 0.85, 0.0, 1.0),  # Yellow Taxi
+]
+
+# 64-bit draws reserved for each frame: a multiple of 4, the number of words one Philox counter step yields,
+# so the stream of frame f starts exactly FRAME_DRAWS // 4 * f counter steps into the stream of its model
+FRAME_DRAWS = 8
+
+RANDOMIZATION_COLUMNS = ['model_id', 'loop', 'frame', 'seed', 'color_index', 'color_r', 'color_g', 'color_b',
+                         'ground_variant', 'light_energy_scale', 'light_offset_x', 'light_offset_y', 'light_offset_z',
+                         'camera_height_u', 'camera_azimuth_u']
+
+
+def load_randomization(filepath: str = DEFAULT_RANDOMIZATION) -> dict:
+    """Load the domain randomization ranges.
+
+    Args:
+        filepath (str): Path to the YAML config, by default the one shipped with the project.
+
+    Returns:
+        dict: Ranges of the light energy scale and offsets, and the ground variants to draw from.
+    """
+    with open(filepath, 'r') as file:
+        return yaml.safe_load(file)
+
+
+def randomization_rng(seed: int, model_id: str, loop: int = 0, frame: int = None) -> np.random.Generator:
+    """Counter-based generator of one frame of a model, or of its per-model draws when frame is None.
+
+    The Philox key is the seed and a hash of the model id, the counter
+    encodes the loop and the frame: every (model, loop, frame) has its own
+    stream, independent of which worker draws it, in which order, or how
+    many other models exist.
+    """
+    model_hash = int.from_bytes(hashlib.blake2b(model_id.encode("utf-8"), digest_size=8).digest(), "little")
+    counter = [0, 0, loop, 1] if frame is None else [frame * FRAME_DRAWS // 4, 0, loop, 0]
+    return np.random.Generator(np.random.Philox(key=[seed & (2 ** 64 - 1), model_hash], counter=counter))
+
+
+def _columns(model_id: str, loop: int, frames: np.ndarray, draws: np.ndarray, seed: int, config: dict) -> dict:
+    model_draws = randomization_rng(seed, model_id, loop).random(2)
+    color_index = int(model_draws[0] * len(CAR_COLORS))
+    variants = config.get("ground_variants") or []
+    variant = variants[int(model_draws[1] * len(variants))] if variants else None
+
+    def scaled(u, bounds):
+        return bounds[0] + (bounds[1] - bounds[0]) * u
+
+    count = len(frames)
+    offsets = config["light_offset"]
+    return {
+        'model_id': [model_id] * count,
+        'loop': np.full(count, loop, dtype=np.int32),
+        'frame': np.asarray(frames, dtype=np.int32),
+        'seed': np.full(count, seed, dtype=np.int64),
+        'color_index': np.full(count, color_index, dtype=np.int32),
+        'color_r': np.full(count, CAR_COLORS[color_index][0]),
+        'color_g': np.full(count, CAR_COLORS[color_index][1]),
+        'color_b': np.full(count, CAR_COLORS[color_index][2]),
+        'ground_variant': [variant] * count,
+        'light_energy_scale': scaled(draws[:, 0], config["light_energy_scale"]),
+        'light_offset_x': scaled(draws[:, 1], offsets["x"]),
+        'light_offset_y': scaled(draws[:, 2], offsets["y"]),
+        'light_offset_z': scaled(draws[:, 3], offsets["z"]),
+        # Tirages uniformes bruts : la plage de chaque format de sortie est appliquée au rendu
+        'camera_height_u': draws[:, 4],
+        'camera_azimuth_u': draws[:, 5],
+    }
+
+
+def plan_model(model_id: str, num_frames: int, loop: int = 0, seed: int = 0, config: dict = None) -> dict:
+    """Randomization parameters of every frame of one model, drawn with one vectorized call.
+
+    Returns:
+        dict[str, np.ndarray]: One array per column of RANDOMIZATION_COLUMNS, indexed by frame.
+    """
+    config = config or load_randomization()
+    draws = randomization_rng(seed, model_id, loop, 0).random((num_frames, FRAME_DRAWS))
+    return _columns(model_id, loop, np.arange(num_frames), draws, seed, config)
+
+
+def plan_frame(model_id: str, frame: int, loop: int = 0, seed: int = 0, config: dict = None) -> dict:
+    """Parameters of a single frame, identical to its row in plan_model, without drawing the others."""
+    config = config or load_randomization()
+    draws = randomization_rng(seed, model_id, loop, frame).random((1, FRAME_DRAWS))
+    return {name: values[0] for name, values in _columns(model_id, loop, np.array([frame]), draws, seed,
+                                                         config).items()}
+
+
+def write_randomization_plan(filepath: str, model_ids: list[str], num_frames: int, loops: int = 1, seed: int = 0,
+                             config: dict = None, models_per_row_group: int = 256) -> int:
+    """Write the parameter table of every (model, loop, frame) as a Parquet file.
+
+    Models are written in sorted order, several per row group, so that a
+    worker reading one model only decodes the row group holding it. The
+    seed, frame count and ranges are stored in the file metadata. The file
+    is written next to its destination and renamed into place.
+
+    Args:
+        filepath (str): Destination .parquet file.
+        model_ids (list[str]): Model keys, the .obj path relative to the dataset root without extension.
+        num_frames (int): Frames per model and loop.
+        loops (int): Passes over the dataset (render_variants.py --loops).
+        seed (int): Run seed; the same seed always gives the same table.
+        config (dict): Ranges from load_randomization, by default the shipped ones.
+        models_per_row_group (int): Models written per Parquet row group.
+
+    Returns:
+        int: Number of rows written.
+    """
+    # pyarrow n'est nécessaire que pour les plans de randomisation
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    config = config or load_randomization()
+    schema = pa.schema([('model_id', pa.string()), ('loop', pa.int32()), ('frame', pa.int32()), ('seed', pa.int64()),
+                        ('color_index', pa.int32()), ('color_r', pa.float64()), ('color_g', pa.float64()),
+                        ('color_b', pa.float64()), ('ground_variant', pa.string()),
+                        *((name, pa.float64()) for name in RANDOMIZATION_COLUMNS[9:])],
+                       metadata={'randomization': json.dumps({'seed': seed, 'num_frames': num_frames,
+                                                              'loops': loops, 'config': config})})
+    os.makedirs(os.path.dirname(os.path.abspath(filepath)), exist_ok=True)
+    tmp_path = filepath + ".tmp"
+    rows = 0
+    model_ids = sorted(model_ids)
+    with pq.ParquetWriter(tmp_path, schema) as writer:
+        for start in range(0, len(model_ids), models_per_row_group):
+            batch = [plan_model(model_id, num_frames, loop, seed, config)
+                     for model_id in model_ids[start:start + models_per_row_group] for loop in range(loops)]
+            table = pa.Table.from_pydict({name: np.concatenate([columns[name] for columns in batch])
+                                          for name in RANDOMIZATION_COLUMNS}, schema=schema)
+            writer.write_table(table, row_group_size=table.num_rows)
+            rows += table.num_rows
+    os.replace(tmp_path, filepath)
+    return rows
+
+
+class RandomizationPlan:
+    """Read side of a plan written by write_randomization_plan.
+
+    Args:
+        path (str): The .parquet plan.
+    """
+
+    def __init__(self, path: str):
+        import pyarrow.parquet as pq
+
+        self.path = path
+        metadata = json.loads(pq.read_schema(path).metadata[b'randomization'])
+        self.seed = metadata['seed']
+        self.num_frames = metadata['num_frames']
+        self.loops = metadata['loops']
+        self.config = metadata['config']
+
+    def model(self, model_id: str, loop: int = 0) -> dict:
+        """Rows of one model and loop, sorted by frame, or None if the plan does not cover them.
+
+        Returns:
+            dict[str, np.ndarray]: One array per column of RANDOMIZATION_COLUMNS.
+        """
+        import pyarrow.parquet as pq
+
+        table = pq.read_table(self.path, filters=[('model_id', '=', model_id), ('loop', '=', loop)])
+        if table.num_rows == 0:
+            return None
+        order = np.argsort(table.column('frame').to_numpy())
+        return {name: table.column(name).to_numpy(zero_copy_only=False)[order] for name in RANDOMIZATION_COLUMNS}
+
+
+def planned_color(rows: dict) -> tuple:
+    """RGBA car color of a model in its plan rows."""
+    return CAR_COLORS[int(rows['color_index'][0])]
+
+
+def planned_light(rows: dict, base_energy: float, base_location) -> tuple[np.ndarray, np.ndarray]:
+    """Light energy and location of every planned frame.
+
+    Args:
+        rows (dict): Plan rows of a model, from RandomizationPlan.model.
+        base_energy (float): Light energy of the render script, scaled by the plan.
+        base_location: Default light position, offset by the plan.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: (n,) energies and (n, 3) locations, indexed by frame.
+    """
+    offsets = np.column_stack((rows['light_offset_x'], rows['light_offset_y'], rows['light_offset_z']))
+    return base_energy * rows['light_energy_scale'], np.asarray(base_location, dtype=float) + offsets
@@ -0,0 +1,178 @@
+import os
+import re
+import json
+import hashlib
+import tarfile
+import numpy as np
+
+from pipeline.metadata import MetadataWriter
+
+OUTPUT_LAYOUTS = ("flat", "fanout", "tar")
+
+# Columns of the index written next to the tar shards
+TAR_INDEX_COLUMNS = ['shard', 'key', 'member', 'offset', 'size']
+
+# WebDataset keys end at the first dot
+KEY_UNSAFE = re.compile(r"[.\s/]")
+
+
+def sample_key(*parts) -> str:
+    """Join name parts into a WebDataset sample key, without dots or separators."""
+    return KEY_UNSAFE.sub("_", "_".join(str(part) for part in parts))
+
+
+def fanout_subdir(name: str, levels: int = 2, width: int = 2) -> str:
+    """Hashed sub-directory of a file name, e.g. "3f/a1", spreading files evenly.
+
+    Args:
+        name (str): File name, hashed as is.
+        levels (int): Number of directory levels.
+        width (int): Hex digits per level; 2 gives 256 directories per level.
+
+    Returns:
+        str: Relative directory path.
+    """
+    digest = hashlib.sha1(name.encode("utf-8")).hexdigest()
+    return os.path.join(*(digest[level * width:(level + 1) * width] for level in range(levels)))
+
+
+def layout_path(folder: str, name: str, layout: str = "flat") -> str:
+    """Final path of an output file in a flat or hashed fan-out folder, creating its directory.
+
+    Args:
+        folder (str): Output folder, e.g. ".../img".
+        name (str): File name.
+        layout (str): "flat" or "fanout".
+
+    Returns:
+        str: The path to write.
+    """
+    if layout == "fanout":
+        folder = os.path.join(folder, fanout_subdir(name))
+        os.makedirs(folder, exist_ok=True)
+    return os.path.join(folder, name)
+
+
+def write_sample_json(filepath: str, row: dict) -> None:
+    """Write the metadata row of a staged sample as its JSON member."""
+    with open(filepath, "w") as file:
+        json.dump({name: value.item() if isinstance(value, np.generic) else value for name, value in row.items()}, file)
+
+
+def tar_shard_prefix(index: int = 0, count: int = 1) -> str:
+    """Name prefix of the tar shards and index written by one render shard."""
+    if count == 1:
+        return "samples"
+    return f"samples.shard-{index:03d}-of-{count:03d}"
+
+
+class TarShardWriter:
+    """Packs staged sample files into size-capped WebDataset tar shards.
+
+    Samples are first committed as loose files in a staging folder, named
+    "<key>.<ext>" (e.g. "car_012.png", "car_012.mask.png", "car_012.json").
+    pack_staging groups them by key and appends each sample to the current
+    shard, written as "<prefix>-000000.tar.partial". Once a shard reaches
+    max_bytes it is renamed into place, its members are appended to the
+    index and only then are the staged files deleted. After a crash the
+    partial shard is discarded and the still staged files are packed again.
+
+    Args:
+        output_dir (str): Folder receiving the shards and the index.
+        prefix (str): Shard name prefix, see tar_shard_prefix.
+        staging_dir (str): Folder holding the loose sample files.
+        max_bytes (int): Size after which a shard is closed.
+    """
+
+    def __init__(self, output_dir: str, prefix: str, staging_dir: str, max_bytes: int = 1 << 30):
+        self.output_dir = output_dir
+        self.prefix = prefix
+        self.staging_dir = staging_dir
+        self.max_bytes = max_bytes
+        os.makedirs(output_dir, exist_ok=True)
+        os.makedirs(staging_dir, exist_ok=True)
+        self.index = MetadataWriter(os.path.join(output_dir, f"{prefix}.index.csv"), columns=TAR_INDEX_COLUMNS)
+
+        shard_name = re.compile(rf"{re.escape(prefix)}-(\d+)\.tar(\.partial)?$")
+        numbers = []
+        for entry in os.scandir(output_dir):
+            match = shard_name.match(entry.name)
+            if not match:
+                continue
+            if match.group(2):
+                # Shard interrompu : ses échantillons sont encore dans le staging
+                os.remove(entry.path)
+            else:
+                numbers.append(int(match.group(1)))
+        self._next_number = max(numbers, default=-1) + 1
+        self._tar = None
+        self._rows = []
+        self._staged = []
+
+    @property
+    def _shard_name(self) -> str:
+        return f"{self.prefix}-{self._next_number:06d}.tar"
+
+    def add_sample(self, key: str, paths: list[str]) -> None:
+        """Append one sample to the current shard. The files are deleted once the shard is closed."""
+        if self._tar is None:
+            self._tar = tarfile.open(os.path.join(self.output_dir, self._shard_name + ".partial"), "w")
+        for path in sorted(paths):
+            info = self._tar.gettarinfo(path, arcname=os.path.basename(path))
+            info.uid = info.gid = 0
+            info.uname = info.gname = ""
+            with open(path, "rb") as file:
+                self._tar.addfile(info, file)
+            # Les données du membre précèdent directement la position courante, complétées à 512 octets
+            data_offset = self._tar.offset - -(-info.size // tarfile.BLOCKSIZE) * tarfile.BLOCKSIZE
+            self._rows.append({'shard': self._shard_name, 'key': key, 'member': info.name,
+                               'offset': data_offset, 'size': info.size})
+        self._staged.extend(paths)
+        if self._tar.offset >= self.max_bytes:
+            self.close_shard()
+
+    def pack_staging(self) -> int:
+        """Pack every sample currently in the staging folder.
+
+        Returns:
+            int: Number of samples packed.
+        """
+        samples = {}
+        for entry in os.scandir(self.staging_dir):
+            if entry.is_file() and ".partial" not in entry.name and ".discard" not in entry.name:
+                samples.setdefault(entry.name.split(".")[0], []).append(entry.path)
+        already_packed = set(self._staged)
+        packed = 0
+        for key in sorted(samples):
+            paths = [path for path in samples[key] if path not in already_packed]
+            if paths:
+                self.add_sample(key, paths)
+                packed += 1
+        return packed
+
+    def close_shard(self) -> None:
+        """Finish the current shard, publish it and its index rows, then drop the staged files."""
+        if self._tar is None:
+            return
+        self._tar.close()
+        partial_path = os.path.join(self.output_dir, self._shard_name + ".partial")
+        os.replace(partial_path, os.path.join(self.output_dir, self._shard_name))
+        for row in self._rows:
+            self.index.write_row(row)
+        self.index.sync()
+        for path in self._staged:
+            os.remove(path)
+        self._tar = None
+        self._rows = []
+        self._staged = []
+        self._next_number += 1
+
+    def close(self) -> None:
+        self.close_shard()
+        self.index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
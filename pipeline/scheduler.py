@@ -0,0 +1,322 @@
+import os
+import time
+import heapq
+import sqlite3
+import numpy as np
+
+from pipeline.catalog import ModelCatalog
+
+# Rows a worker may claim for their round: neither rendered by a worker right now nor quarantined
+PENDING = "status NOT IN ('running', 'quarantined')"
+
+# Catalog statistics the render time of a model is predicted from
+COST_FEATURES = ('triangles', 'texture_bytes', 'parts')
+
+# Used until enough timings are recorded: about one second per frame for a
+# million triangles, plus fixed scene preparation
+DEFAULT_COEFFICIENTS = (1.0, 1e-6, 1e-9, 1e-3)
+
+
+class CostModel:
+    """Linear prediction of the render seconds per frame of a model.
+
+    cost = c0 + c1 * triangles + c2 * texture_bytes + c3 * parts
+
+    Args:
+        coefficients (tuple[float, ...]): Intercept followed by one coefficient per feature of COST_FEATURES.
+    """
+
+    def __init__(self, coefficients: tuple = DEFAULT_COEFFICIENTS):
+        self.coefficients = np.asarray(coefficients, dtype=np.float64)
+
+    @staticmethod
+    def _design(features: list[dict]) -> np.ndarray:
+        rows = [[1.0] + [float(stats[name]) for name in COST_FEATURES] for stats in features]
+        return np.array(rows, dtype=np.float64).reshape(len(rows), len(COST_FEATURES) + 1)
+
+    def predict(self, features: dict) -> float:
+        """Predicted seconds per frame of one model, from its catalog statistics."""
+        return float(self._design([features])[0] @ self.coefficients)
+
+    @classmethod
+    def fit(cls, features: list[dict], seconds: list[float]) -> "CostModel":
+        """Least-squares fit on measured timings.
+
+        Features are scaled before solving so that triangle and byte counts do
+        not swamp the part count. Negative coefficients, which only appear when
+        features are collinear on a small history, are clipped to zero so that
+        a bigger model is never predicted cheaper. With fewer samples than
+        coefficients the default model is returned.
+
+        Args:
+            features (list[dict]): Catalog statistics of each timed model.
+            seconds (list[float]): Measured seconds per frame, in the same order.
+
+        Returns:
+            CostModel: The fitted model.
+        """
+        if len(features) < len(COST_FEATURES) + 1:
+            return cls()
+        design = cls._design(features)
+        scale = np.abs(design).max(axis=0)
+        scale[scale == 0] = 1.0
+        solution, *_ = np.linalg.lstsq(design / scale, np.asarray(seconds, dtype=np.float64), rcond=None)
+        coefficients = np.clip(solution / scale, 0.0, None)
+        if not coefficients.any():
+            return cls()
+        return cls(tuple(coefficients))
+
+
+def learn_cost_model(catalog: ModelCatalog, dataset_root: str, kind: str) -> CostModel:
+    """Fit the cost model on the timings the catalog recorded for one kind of job."""
+    features = catalog.cost_features(dataset_root)
+    history = {path: seconds for path, seconds in catalog.timing_history(dataset_root, kind).items() if path in features}
+    return CostModel.fit([features[path] for path in history], list(history.values()))
+
+
+def plan_longest_first(costs: dict[str, float], workers: int) -> dict[str, int]:
+    """Assign models to workers, most expensive first, each to the least loaded worker.
+
+    Args:
+        costs (dict[str, float]): Predicted cost of every model.
+        workers (int): Number of workers.
+
+    Returns:
+        dict[str, int]: Worker index of every model.
+    """
+    loads = [(0.0, worker) for worker in range(workers)]
+    assignments = {}
+    # Le tri secondaire par nom rend le plan identique d'un lancement à l'autre
+    for model in sorted(costs, key=lambda model: (-costs[model], model)):
+        load, worker = heapq.heappop(loads)
+        assignments[model] = worker
+        heapq.heappush(loads, (load + costs[model], worker))
+    return assignments
+
+
+class WorkQueue:
+    """Shared SQLite queue handing models to render workers.
+
+    The launcher plans the batch with plan_longest_first, so every worker
+    owns a list of models balanced by predicted cost. A worker always takes
+    its own most expensive pending model; once its list is empty it steals
+    the most expensive pending model of the worker with the most predicted
+    work left. Prediction errors are thus absorbed at the end of the batch
+    instead of leaving workers idle. The seconds spent on each model are
+    stored for the cost model to learn from.
+
+    Scripts that go over the dataset several times (render_variants.py
+    loops) claim each model once per round: a model is pending for round r
+    until someone claims it in that round, and is never handed out while a
+    worker is still rendering it in the previous round. Completing a model
+    only updates its row if the completing worker still holds it, so a
+    model taken back by fail is not recorded as done by its old worker.
+
+    A model whose worker hung or crashed is handed out again after an
+    exponential backoff (see fail), and put in quarantine once it failed too
+    many times. Quarantined models are left out of every later plan.
+
+    Args:
+        path (str): SQLite database file shared by the launcher and the workers.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # Transactions explicites : la réservation d'un modèle doit être atomique entre processus
+        self._connection = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            """CREATE TABLE IF NOT EXISTS jobs (
+                   model TEXT PRIMARY KEY,
+                   cost REAL NOT NULL,
+                   owner INTEGER NOT NULL,
+                   round INTEGER NOT NULL,
+                   status TEXT NOT NULL,
+                   worker INTEGER,
+                   started_at REAL,
+                   seconds REAL,
+                   attempts INTEGER NOT NULL DEFAULT 0,
+                   not_before REAL NOT NULL DEFAULT 0,
+                   error TEXT
+               ) WITHOUT ROWID"""
+        )
+        self._connection.execute(
+            """CREATE TABLE IF NOT EXISTS quarantine (
+                   model TEXT PRIMARY KEY,
+                   reason TEXT NOT NULL,
+                   attempts INTEGER NOT NULL,
+                   quarantined_at REAL NOT NULL
+               ) WITHOUT ROWID"""
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS jobs_pending ON jobs (round, owner, cost)")
+
+    def plan(self, costs: dict[str, float], workers: int) -> dict[int, float]:
+        """Replace the queue content with a new longest-first plan of the models not in quarantine.
+
+        Args:
+            costs (dict[str, float]): Predicted cost of every model of the batch.
+            workers (int): Number of workers.
+
+        Returns:
+            dict[int, float]: Predicted load of every worker.
+        """
+        quarantined = self.quarantined()
+        assignments = plan_longest_first({model: cost for model, cost in costs.items() if model not in quarantined},
+                                         workers)
+        self._connection.execute("BEGIN IMMEDIATE")
+        self._connection.execute("DELETE FROM jobs")
+        self._connection.executemany(
+            "INSERT INTO jobs (model, cost, owner, round, status) VALUES (?, ?, ?, 0, 'pending')",
+            [(model, costs[model], worker) for model, worker in assignments.items()],
+        )
+        self._connection.execute("COMMIT")
+        loads = {worker: 0.0 for worker in range(workers)}
+        for model, worker in assignments.items():
+            loads[worker] += costs[model]
+        return loads
+
+    def claim(self, worker: int, round: int = 0) -> str:
+        """Reserve the next model of a worker, stealing one if its own list is empty.
+
+        Args:
+            worker (int): Index of the claiming worker.
+            round (int): Pass over the dataset the model is claimed for.
+
+        Returns:
+            str: The model path, or None when no pending model is left.
+        """
+        self._connection.execute("BEGIN IMMEDIATE")
+        try:
+            now = time.time()
+            row = self._connection.execute(
+                f"SELECT model FROM jobs WHERE round = ? AND owner = ? AND {PENDING} AND not_before <= ? "
+                "ORDER BY cost DESC LIMIT 1",
+                (round, worker, now)).fetchone()
+            if row is None:
+                row = self._connection.execute(
+                    f"""SELECT model FROM jobs
+                       WHERE round = ?1 AND {PENDING} AND not_before <= ?2 AND owner = (
+                           SELECT owner FROM jobs WHERE round = ?1 AND {PENDING} AND not_before <= ?2
+                           GROUP BY owner ORDER BY SUM(cost) DESC LIMIT 1)
+                       ORDER BY cost DESC LIMIT 1""", (round, now)).fetchone()
+            if row is not None:
+                self._connection.execute(
+                    "UPDATE jobs SET round = round + 1, status = 'running', worker = ?, started_at = ? WHERE model = ?",
+                    (worker, time.time(), row[0]))
+            self._connection.execute("COMMIT")
+        except BaseException:
+            self._connection.execute("ROLLBACK")
+            raise
+        return None if row is None else row[0]
+
+    def finish(self, model: str, status: str = "done", seconds: float = None, worker: int = None) -> bool:
+        """Record the outcome of a claimed model ("done", "skipped" or "failed").
+
+        Args:
+            model (str): The model path, as returned by claim.
+            status (str): Outcome of the model.
+            seconds (float): Time spent on the model, or None.
+            worker (int): Index of the worker that claimed it; the row is only updated while that worker holds it.
+
+        Returns:
+            bool: False if the model was no longer held, e.g. taken back after a timeout.
+        """
+        query = "UPDATE jobs SET status = ?, seconds = ? WHERE model = ? AND status = 'running'"
+        parameters = (status, seconds, model)
+        if worker is not None:
+            query += " AND worker = ?"
+            parameters += (worker,)
+        return self._connection.execute(query, parameters).rowcount > 0
+
+    def next_retry_in(self, round: int = 0) -> float:
+        """Seconds until a model waiting for its retry becomes available, or None if none is waiting."""
+        row = self._connection.execute(
+            f"SELECT MIN(not_before) FROM jobs WHERE round = ? AND {PENDING}", (round,)).fetchone()
+        return None if row[0] is None else max(row[0] - time.time(), 0.0)
+
+    def jobs(self, worker: int, round: int = 0):
+        """Yield the models of a worker until no model is pending for the round.
+
+        A model still marked running when the next one is requested is
+        recorded as done, with the time elapsed since it was handed out.
+        While the only pending models wait for a retry, the worker waits too.
+        """
+        while True:
+            model = self.claim(worker, round)
+            if model is None:
+                wait = self.next_retry_in(round)
+                if wait is None:
+                    return
+                time.sleep(min(wait, 60.0) + 0.1)
+                continue
+            start = time.perf_counter()
+            yield model
+            # Un modèle déjà marqué sauté ou en échec par la boucle appelante garde son statut
+            self.finish(model, "done", time.perf_counter() - start, worker=worker)
+
+    def running_jobs(self) -> list[tuple[str, int, float, float]]:
+        """(model, worker, started_at, cost) of every model currently being rendered."""
+        return self._connection.execute(
+            "SELECT model, worker, started_at, cost FROM jobs WHERE status = 'running'").fetchall()
+
+    def fail(self, worker: int, reason: str, max_attempts: int = 3, backoff_seconds: float = 60.0) -> tuple:
+        """Record that the model a worker was rendering hung or crashed.
+
+        The model is handed out again after backoff_seconds * 2 ** (attempts - 1),
+        for the same round, unless it already failed max_attempts times: it is
+        then put in quarantine with the reason.
+
+        Returns:
+            tuple[str, str]: The model and "retry" or "quarantined", or (None, None) if the worker held no model.
+        """
+        self._connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = self._connection.execute(
+                "SELECT model, attempts FROM jobs WHERE status = 'running' AND worker = ?", (worker,)).fetchone()
+            outcome = None
+            if row is not None:
+                model, attempts = row[0], row[1] + 1
+                if attempts >= max_attempts:
+                    outcome = "quarantined"
+                    self._connection.execute(
+                        "UPDATE jobs SET status = 'quarantined', attempts = ?, error = ? WHERE model = ?",
+                        (attempts, reason, model))
+                    self._connection.execute(
+                        "INSERT OR REPLACE INTO quarantine (model, reason, attempts, quarantined_at) "
+                        "VALUES (?, ?, ?, ?)",
+                        (model, reason, attempts, time.time()))
+                else:
+                    outcome = "retry"
+                    # Le modèle redevient disponible pour le tour où il a échoué
+                    self._connection.execute(
+                        "UPDATE jobs SET status = 'pending', round = round - 1, worker = NULL, attempts = ?, "
+                        "not_before = ?, error = ? WHERE model = ?",
+                        (attempts, time.time() + backoff_seconds * 2 ** (attempts - 1), reason, model))
+            self._connection.execute("COMMIT")
+        except BaseException:
+            self._connection.execute("ROLLBACK")
+            raise
+        return (None, None) if row is None else (row[0], outcome)
+
+    def quarantined(self) -> dict[str, str]:
+        """Failure reason of every model in quarantine."""
+        return dict(self._connection.execute("SELECT model, reason FROM quarantine"))
+
+    def release_quarantine(self) -> int:
+        """Give every quarantined model another chance at the next plan. Returns how many were released."""
+        return self._connection.execute("DELETE FROM quarantine").rowcount
+
+    def timings(self) -> dict[str, float]:
+        """Seconds spent on every model completed in this batch, in its latest round."""
+        return dict(self._connection.execute(
+            "SELECT model, seconds FROM jobs WHERE status = 'done' AND seconds IS NOT NULL"))
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
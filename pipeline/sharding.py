@@ -0,0 +1,135 @@
+import os
+import csv
+
+from pipeline.telemetry import get_telemetry
+
+
+def discover_models(dataset_root: str) -> list[str]:
+    """Walk the dataset tree and return every .obj file in a stable order.
+
+    Args:
+        dataset_root (str): Root directory containing the vehicle models.
+
+    Returns:
+        list[str]: Absolute .obj paths sorted by their path relative to dataset_root.
+    """
+    models = []
+    for root, dirs, files in os.walk(dataset_root):
+        for file in files:
+            if file.endswith(".obj"):
+                models.append(os.path.join(root, file))
+    return sorted(models, key=lambda path: os.path.relpath(path, dataset_root))
+
+
+def parse_shard(spec: str) -> tuple[int, int]:
+    """Parse a shard specification of the form "i/N".
+
+    Args:
+        spec (str): Shard index and shard count, e.g. "3/8". The index is zero-based.
+
+    Returns:
+        tuple[int, int]: The (index, count) pair.
+    """
+    try:
+        index, count = (int(part) for part in spec.split("/"))
+    except ValueError:
+        raise ValueError(f"Invalid shard '{spec}', expected 'i/N'.")
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"Invalid shard '{spec}', index must be in [0, {count}).")
+    return index, count
+
+
+def select_shard(models: list[str], index: int = 0, count: int = 1) -> list[str]:
+    """Return the models assigned to one shard.
+
+    Models are dealt round-robin from the sorted list, so every shard gets a
+    disjoint, deterministic subset regardless of which machine computes it.
+
+    Args:
+        models (list[str]): Sorted model paths, as returned by discover_models.
+        index (int): Zero-based shard index.
+        count (int): Total number of shards.
+
+    Returns:
+        list[str]: The models belonging to the shard.
+    """
+    return models[index::count]
+
+
+def shard_metadata_name(index: int = 0, count: int = 1) -> str:
+    """Return the metadata file name written by one shard.
+
+    Args:
+        index (int): Zero-based shard index.
+        count (int): Total number of shards.
+
+    Returns:
+        str: "metadata.csv" for unsharded runs, a per-shard name otherwise.
+    """
+    if count == 1:
+        return "metadata.csv"
+    return f"metadata.shard-{index:03d}-of-{count:03d}.csv"
+
+
+def find_shard_metadata_dirs(output_base: str, count: int) -> list[str]:
+    """Return every directory under output_base holding per-shard metadata files.
+
+    Multi-variant runs write one metadata file per variant sub-folder, so
+    output_base and its direct sub-folders are checked; deeper image folders
+    are never listed.
+
+    Args:
+        output_base (str): Output directory shared by all shards.
+        count (int): Total number of shards.
+
+    Returns:
+        list[str]: Sorted directories to pass to merge_shard_metadata.
+    """
+    suffix = f"-of-{count:03d}.csv"
+    candidates = [output_base] + [entry.path for entry in os.scandir(output_base) if entry.is_dir()]
+    folders = []
+    for folder in candidates:
+        if any(file.startswith("metadata.shard-") and file.endswith(suffix) for file in os.listdir(folder)):
+            folders.append(folder)
+    return sorted(folders)
+
+
+def merge_shard_metadata(output_base: str, count: int) -> str:
+    """Concatenate the per-shard metadata files into metadata.csv.
+
+    Rows are copied as text, so the merge never holds more than one line in memory.
+    Missing shard files (e.g. a worker that rendered nothing) are skipped.
+    A single shard already writes metadata.csv itself, so there is nothing to merge.
+
+    Args:
+        output_base (str): Output directory shared by all shards.
+        count (int): Total number of shards.
+
+    Returns:
+        str: Path of the merged metadata file.
+    """
+    merged_path = os.path.join(output_base, "metadata.csv")
+    if count == 1:
+        # metadata.csv est à la fois la sortie du shard et la cible : l'ouvrir en écriture l'effacerait
+        return merged_path
+    header = None
+    with open(merged_path, "w", newline="") as merged:
+        writer = csv.writer(merged)
+        for index in range(count):
+            shard_path = os.path.join(output_base, shard_metadata_name(index, count))
+            if not os.path.exists(shard_path):
+                get_telemetry().event("missing_shard_metadata", folder=output_base, shard=index, count=count)
+                continue
+            with open(shard_path, newline="") as shard:
+                reader = csv.reader(shard)
+                shard_header = next(reader, None)
+                if shard_header is None:
+                    continue
+                if header is None:
+                    header = shard_header
+                    writer.writerow(header)
+                elif shard_header != header:
+                    raise ValueError(f"Shard {index} metadata header does not match shard 0.")
+                writer.writerows(reader)
+    print(f"✅ Merged metadata of {count} shards into {merged_path}")
+    return merged_path
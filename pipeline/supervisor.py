@@ -0,0 +1,86 @@
+import time
+
+from pipeline.metadata import MetadataWriter
+from pipeline.scheduler import WorkQueue
+from pipeline.telemetry import get_telemetry
+
+# Columns of the quarantine report written next to the renders
+QUARANTINE_COLUMNS = ['model', 'reason', 'attempts', 'quarantined_at']
+
+
+class ModelSupervisor:
+    """Watches the models being rendered through a work queue and handles the ones that hang or crash.
+
+    Every model gets a wall-clock budget proportional to its predicted cost
+    (the cost planned in the queue, in seconds), never below min_timeout.
+    A worker still on a model past its budget is reported by overdue so
+    that run_blender_workers kills and restarts it. The model of a killed or
+    crashed worker is queued again after an exponential backoff and, after
+    max_attempts failures, put in quarantine with the reason of its last
+    failure; quarantined models are appended to the report as they happen.
+    Retries and quarantines are counted and logged as "retry" and
+    "quarantine" events of the current telemetry.
+
+    Args:
+        queue_path (str): SQLite file of the work queue shared with the workers.
+        report_path (str): CSV receiving the quarantined models, or None.
+        timeout_factor (float): Budget of a model as a multiple of its predicted cost.
+        min_timeout (float): Smallest budget, in seconds, covering Blender start-up and poor predictions.
+        max_attempts (int): Failures after which a model is quarantined.
+        backoff_seconds (float): Delay before the first retry, doubled at each new failure.
+    """
+
+    def __init__(self, queue_path: str, report_path: str = None, timeout_factor: float = 4.0,
+                 min_timeout: float = 600.0, max_attempts: int = 3, backoff_seconds: float = 60.0):
+        self.queue = WorkQueue(queue_path)
+        self.report = MetadataWriter(report_path, columns=QUARANTINE_COLUMNS, sync_every=1) if report_path else None
+        self.timeout_factor = timeout_factor
+        self.min_timeout = min_timeout
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+
+    def budget(self, cost: float) -> float:
+        """Seconds a model of the given predicted cost may run."""
+        return max(self.min_timeout, self.timeout_factor * cost)
+
+    def overdue(self) -> dict[int, str]:
+        """Failure reason of every worker whose current model ran past its budget, by worker index."""
+        now = time.time()
+        reasons = {}
+        for model, worker, started_at, cost in self.queue.running_jobs():
+            budget = self.budget(cost)
+            if started_at is not None and now - started_at > budget:
+                reasons[worker] = f"timeout after {now - started_at:.0f}s (budget {budget:.0f}s)"
+        return reasons
+
+    def fail(self, worker: int, reason: str) -> bool:
+        """Record the failure of the model a worker was rendering.
+
+        Returns:
+            bool: True if the worker held a model, i.e. the failure is the model's and the worker can be restarted.
+        """
+        model, outcome = self.queue.fail(worker, reason, self.max_attempts, self.backoff_seconds)
+        if model is None:
+            return False
+        telemetry = get_telemetry()
+        if outcome == "quarantined":
+            telemetry.count("quarantined_models")
+            telemetry.event("quarantine", model=model, reason=reason, worker=worker, attempts=self.max_attempts)
+            if self.report is not None:
+                self.report.write_row({'model': model, 'reason': reason, 'attempts': self.max_attempts,
+                                       'quarantined_at': time.time()})
+        else:
+            telemetry.count("model_retries")
+            telemetry.event("retry", model=model, reason=reason, worker=worker)
+        return True
+
+    def close(self) -> None:
+        self.queue.close()
+        if self.report is not None:
+            self.report.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,255 @@
+import os
+import re
+import sys
+import json
+import hashlib
+import time
+import cProfile
+import threading
+from contextlib import contextmanager
+
+
+def current_rss_bytes() -> int:
+    """Resident set size of the current process, or 0 where it cannot be read."""
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+        # Hors Linux seul le pic est disponible ; ru_maxrss est en octets sous macOS, en kilo-octets ailleurs
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+    except (ImportError, OSError):
+        return 0
+
+
+def _metric_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for value in labels.values())
+    return "{" + ",".join(f'{name}="{value}"' for name, value in zip(labels, escaped)) + "}"
+
+
+def profile_file_name(name: str, item_id: str) -> str:
+    """File name of the cProfile dump of one item.
+
+    The id is made file-name safe and followed by a short hash of the
+    original, so items sharing a base name in different folders
+    (a/car.obj, b/car.obj) never overwrite each other's dump.
+    """
+    safe_id = re.sub(r"[^A-Za-z0-9._-]+", "_", item_id).strip("_")[-96:]
+    return f"{name}-{safe_id}-{hashlib.sha1(item_id.encode('utf-8')).hexdigest()[:8]}.prof"
+
+
+class Telemetry:
+    """Timing spans, counters and gauges of a render worker.
+
+    Spans nest per thread: a span opened while another one is open records
+    it as its parent, so "import" inside "prepare_model" inside "model" can
+    be told apart from the same stage elsewhere. Code running inside a span
+    can add attributes to it with annotate, e.g. the outcome of a model, in
+    place of a progress print. Every closed span and every
+    event is appended to a JSONL log; span totals, counters and gauges are
+    exported as a Prometheus textfile, rewritten atomically on each flush so
+    node_exporter never reads half a file.
+
+    Without paths nothing is written, but spans and metrics are still kept,
+    so instrumented code does not depend on the configuration.
+
+    Args:
+        jsonl_path (str): Event log, appended to.
+        prometheus_path (str): Textfile for the node_exporter textfile collector.
+        profile_dir (str): Folder receiving one cProfile dump per profiled item, or None to disable profiling.
+        labels (dict[str, str]): Constant labels added to every metric, e.g. the worker shard.
+        namespace (str): Prefix of the metric names.
+    """
+
+    def __init__(self, jsonl_path: str = None, prometheus_path: str = None, profile_dir: str = None,
+                 labels: dict = None, namespace: str = "render"):
+        self.jsonl_path = jsonl_path
+        self.prometheus_path = prometheus_path
+        self.profile_dir = profile_dir
+        self.labels = dict(labels or {})
+        self.namespace = namespace
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._span_totals = {}
+        self._counters = {}
+        self._gauges = {}
+        self._log = None
+        if jsonl_path:
+            os.makedirs(os.path.dirname(os.path.abspath(jsonl_path)), exist_ok=True)
+            self._log = open(jsonl_path, "a", buffering=1)
+        if profile_dir:
+            os.makedirs(profile_dir, exist_ok=True)
+
+    def _stack(self) -> list:
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def _write(self, record: dict) -> None:
+        if self._log is None:
+            return
+        line = json.dumps(record, default=str)
+        with self._lock:
+            self._log.write(line + "\n")
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        """Time a block of code as a span nested in the spans open on this thread."""
+        stack = self._stack()
+        parent = stack[-1][0] if stack else None
+        stack.append((name, attributes))
+        start_time = time.time()
+        start = time.perf_counter()
+        status = "ok"
+        try:
+            yield
+        except Exception:
+            status = "error"
+            raise
+        finally:
+            stack.pop()
+            self.record_span(name, time.perf_counter() - start, parent=parent, start=start_time, status=status,
+                             **attributes)
+
+    def record_span(self, name: str, seconds: float, parent: str = None, start: float = None, status: str = "ok",
+                    **attributes) -> None:
+        """Record a span measured elsewhere, e.g. by Blender render handlers.
+
+        Without an explicit parent the span is attached to the innermost span open on this thread.
+        """
+        if parent is None:
+            stack = self._stack()
+            parent = stack[-1][0] if stack else None
+        with self._lock:
+            count, total = self._span_totals.get(name, (0, 0.0))
+            self._span_totals[name] = (count + 1, total + seconds)
+        self._write({'type': "span", 'name': name, 'parent': parent, 'start': start or time.time() - seconds,
+                     'seconds': seconds, 'status': status, **self.labels, **attributes})
+
+    def annotate(self, **attributes) -> None:
+        """Add attributes to the innermost span open on this thread; ignored outside any span."""
+        stack = self._stack()
+        if stack:
+            stack[-1][1].update(attributes)
+
+    def each(self, name: str, items, profile: bool = True, key=str):
+        """Yield items one by one, each inside its own span and, if enabled, its own cProfile capture.
+
+        The span of an item ends when the next one is requested, so it covers
+        the whole loop body, including early continues.
+
+        Args:
+            name (str): Span name, also the prefix of the profile dumps.
+            items (Iterable): Items to iterate over.
+            profile (bool): Capture a cProfile dump per item when profiling is enabled.
+            key (Callable): Unique id of an item (default: str), e.g. the model path relative to the
+                dataset root, naming its profile dump.
+        """
+        for item in items:
+            profiler = cProfile.Profile() if profile and self.profile_dir else None
+            with self.span(name, item=str(item)):
+                if profiler:
+                    profiler.enable()
+                try:
+                    yield item
+                finally:
+                    if profiler:
+                        profiler.disable()
+                        profiler.dump_stats(os.path.join(self.profile_dir, profile_file_name(name, key(item))))
+
+    def count(self, name: str, value: float = 1, **labels) -> None:
+        """Increase a counter."""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def counter_value(self, name: str, **labels) -> float:
+        """Current value of a counter, summed over the labels not given."""
+        with self._lock:
+            return sum(value for (counter, counter_labels), value in self._counters.items()
+                       if counter == name and set(labels.items()) <= set(counter_labels))
+
+    def gauge(self, name: str, value: float, **labels) -> None:
+        """Set a gauge to its current value."""
+        with self._lock:
+            self._gauges[(name, tuple(sorted(labels.items())))] = value
+
+    def event(self, name: str, **attributes) -> None:
+        """Append a structured event to the log, in place of a progress print."""
+        self._write({'type': "event", 'name': name, 'time': time.time(), **self.labels, **attributes})
+
+    def prometheus_text(self) -> str:
+        """Metrics in the Prometheus text exposition format."""
+        prefix = self.namespace
+        lines = [f"# TYPE {prefix}_span_seconds summary"]
+        with self._lock:
+            for name, (count, total) in sorted(self._span_totals.items()):
+                labels = _metric_labels({**self.labels, 'span': name})
+                lines.append(f"{prefix}_span_seconds_sum{labels} {total:.6f}")
+                lines.append(f"{prefix}_span_seconds_count{labels} {count}")
+            for kind, metrics in (("counter", self._counters), ("gauge", self._gauges)):
+                declared = set()
+                for (name, labels), value in sorted(metrics.items()):
+                    metric = f"{prefix}_{name}_total" if kind == "counter" else f"{prefix}_{name}"
+                    if metric not in declared:
+                        declared.add(metric)
+                        lines.append(f"# TYPE {metric} {kind}")
+                    lines.append(f"{metric}{_metric_labels({**self.labels, **dict(labels)})} {value}")
+        lines.append(f"# TYPE {prefix}_started_at_seconds gauge")
+        lines.append(f"{prefix}_started_at_seconds{_metric_labels(self.labels)} {self.started_at:.3f}")
+        return "\n".join(lines) + "\n"
+
+    def flush(self) -> None:
+        """Rewrite the Prometheus textfile and push the log to disk."""
+        if self.prometheus_path:
+            tmp_path = self.prometheus_path + ".tmp"
+            with open(tmp_path, "w") as file:
+                file.write(self.prometheus_text())
+            os.replace(tmp_path, self.prometheus_path)
+        if self._log is not None:
+            with self._lock:
+                self._log.flush()
+
+    def close(self) -> None:
+        self.flush()
+        if self._log is not None:
+            with self._lock:
+                self._log.close()
+                self._log = None
+
+
+# Instance used by the instrumented modules; a run replaces it with configure_telemetry
+_telemetry = Telemetry()
+
+
+def get_telemetry() -> Telemetry:
+    """The telemetry of the current run. Without configuration, metrics are kept in memory only."""
+    return _telemetry
+
+
+def configure_telemetry(output_dir: str = None, prefix: str = "telemetry", profile: bool = False,
+                        labels: dict = None) -> Telemetry:
+    """Replace the current telemetry with one writing "<prefix>.jsonl" and "<prefix>.prom" into output_dir.
+
+    Args:
+        output_dir (str): Folder of the log, the textfile and the "profiles" sub-folder; None keeps everything in memory.
+        prefix (str): File name prefix, e.g. one per worker shard.
+        profile (bool): Dump a cProfile capture for every item iterated with Telemetry.each.
+        labels (dict[str, str]): Constant metric labels.
+
+    Returns:
+        Telemetry: The new current telemetry.
+    """
+    global _telemetry
+    _telemetry.close()
+    if output_dir:
+        _telemetry = Telemetry(os.path.join(output_dir, f"{prefix}.jsonl"), os.path.join(output_dir, f"{prefix}.prom"),
+                               os.path.join(output_dir, "profiles") if profile else None, labels)
+    else:
+        _telemetry = Telemetry(labels=labels)
+    return _telemetry
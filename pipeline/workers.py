@@ -0,0 +1,101 @@
+import os
+import time
+import subprocess
+
+from pipeline.telemetry import get_telemetry
+
+# Exit code of a worker asking to be restarted in a fresh process (EX_TEMPFAIL)
+RECYCLE_EXIT_CODE = 75
+
+
+def blender_command(blender: str, script: str, script_args: list[str]) -> list[str]:
+    """Build a headless Blender command line running one of the project scripts.
+
+    --python-exit-code makes an uncaught Python exception fail the process
+    instead of exiting with 0.
+    """
+    return [blender, "--background", "--factory-startup", "--python-exit-code", "1",
+            "--python", script, "--"] + script_args
+
+
+def run_blender_workers(blender: str, script: str, args_for_shard, count: int, log_dir: str,
+                        log_prefix: str = "worker", poll_seconds: float = 1.0, supervisor=None) -> list[int]:
+    """Start one headless Blender process per shard and wait for all of them.
+
+    Each worker logs to its own file so that the interleaved progress of
+    dozens of processes stays readable. The lifetime of every worker process
+    is recorded as a span named after log_prefix in the current telemetry,
+    with its pid, log file and exit code. A worker exiting with
+    RECYCLE_EXIT_CODE asked for a fresh process (see
+    blender_utils.resources.ResourceWatchdog): its span gets the "recycled"
+    status and it is started again with the same arguments, appending to the
+    same log.
+
+    With a supervisor (see pipeline.supervisor.ModelSupervisor), a worker
+    whose current model ran past its budget is killed, and a worker killed
+    or crashed while it held a model is restarted; their spans get the
+    "timeout" and "crashed" statuses. The model itself is retried later or
+    quarantined by the supervisor, not by the restarted worker's own claim
+    order.
+
+    Args:
+        blender (str): Path to the Blender executable.
+        script (str): Python script run by every worker.
+        args_for_shard (Callable[[int], list[str]]): Script arguments of the worker with a given shard index.
+        count (int): Number of workers.
+        log_dir (str): Directory receiving one log file per worker.
+        log_prefix (str): Prefix of the log file names.
+        poll_seconds (float): Interval between two checks of the running workers.
+        supervisor (ModelSupervisor): Per-model timeouts, retries and quarantine, or None.
+
+    Returns:
+        list[int]: The exit code of every worker, indexed by shard.
+    """
+    os.makedirs(log_dir, exist_ok=True)
+    telemetry = get_telemetry()
+
+    def start(index, mode):
+        log_path = os.path.join(log_dir, f"{log_prefix}-{index:03d}.log")
+        log_file = open(log_path, mode)
+        process = subprocess.Popen(blender_command(blender, script, args_for_shard(index)),
+                                   stdout=log_file, stderr=subprocess.STDOUT)
+        return process, log_file, log_path, time.time()
+
+    def stop(index, code, status, **attributes):
+        process, log_file, log_path, started_at = running[index]
+        log_file.close()
+        telemetry.record_span(log_prefix, time.time() - started_at, start=started_at, status=status,
+                              index=index, count=count, pid=process.pid, log=log_path, exit_code=code, **attributes)
+
+    running = {index: start(index, "w") for index in range(count)}
+    exit_codes = [None] * count
+    while running:
+        if supervisor is not None:
+            for index, reason in supervisor.overdue().items():
+                if index in running and running[index][0].poll() is None:
+                    process = running[index][0]
+                    process.kill()
+                    stop(index, process.wait(), "timeout", reason=reason)
+                    telemetry.count("worker_restarts", reason="timeout")
+                    supervisor.fail(index, reason)
+                    running[index] = start(index, "a")
+        for index in list(running):
+            code = running[index][0].poll()
+            if code is None:
+                continue
+            if code == RECYCLE_EXIT_CODE:
+                stop(index, code, "recycled")
+                telemetry.count("worker_restarts", reason="recycle")
+                running[index] = start(index, "a")
+                continue
+            if code != 0 and supervisor is not None and supervisor.fail(index, f"worker exited with code {code}"):
+                stop(index, code, "crashed")
+                telemetry.count("worker_restarts", reason="crash")
+                running[index] = start(index, "a")
+                continue
+            stop(index, code, "ok" if code == 0 else "error")
+            del running[index]
+            exit_codes[index] = code
+        if running:
+            time.sleep(poll_seconds)
+    return exit_codes
@@ -0,0 +1,29 @@
+import os
+import argparse
+
+from pipeline.catalog import list_models
+from pipeline.randomization import DEFAULT_RANDOMIZATION, load_randomization, write_randomization_plan
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Draw the domain randomization parameters of every frame up front.")
+    parser.add_argument("--dataset-root", required=True)
+    parser.add_argument("--output", default=None, help="Parquet plan (default: <dataset-root>/randomization.parquet).")
+    parser.add_argument("--catalog", default=None, help="Plan only the valid, non-duplicate models of this catalog.")
+    parser.add_argument("--num-frames", type=int, default=180, help="Frames planned per model and loop.")
+    parser.add_argument("--loops", type=int, default=1, help="Passes over the dataset, as render_variants.py --loops.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--config", default=DEFAULT_RANDOMIZATION, help="Randomization ranges.")
+    args = parser.parse_args()
+
+    output = args.output or os.path.join(args.dataset_root, "randomization.parquet")
+    # Même clé que les scripts de rendu : chemin relatif du .obj sans extension
+    model_ids = [os.path.splitext(os.path.relpath(path, args.dataset_root))[0]
+                 for path in list_models(args.dataset_root, args.catalog)]
+    rows = write_randomization_plan(output, model_ids, args.num_frames, loops=args.loops, seed=args.seed,
+                                    config=load_randomization(args.config))
+    print(f"✅ Randomization plan {output}: {len(model_ids)} models, {rows} rows, seed {args.seed}.")
+
+
+if __name__ == "__main__":
+    main()
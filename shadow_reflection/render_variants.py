@@ -0,0 +1,314 @@
+import site
+import sys
+
+user_site_packages = site.getusersitepackages()
+sys.path.append(user_site_packages)
+
+import os
+import argparse
+import bpy
+import math
+import numpy as np
+
+project_path = os.path.dirname(os.path.abspath(__file__))
+if os.path.dirname(project_path) not in sys.path:
+    sys.path.append(os.path.dirname(project_path))
+
+from blender_utils.lighting import create_ground_variant_materials, apply_ground_variant, GROUND_VARIANTS
+from blender_utils.segmentation import MaskCompositor, MaskPass
+from blender_utils.model_pipeline import DatasetRun, add_common_arguments, check_common_arguments, run_options, setup_worker
+from actions.camera_actions import keyframe_camera_poses
+from actions.camera_poses import plan_poses, export_pose_table
+from actions.lighting_actions import keyframe_light_plan
+from blender_utils.render_utils import RenderSession, render_keyframed_frames
+from blender_utils.render_profiles import load_render_profiles, apply_render_profile, resolve_profile
+from pipeline.ledger import JobLedger, commit_frame_files, pending_frames
+from pipeline.postprocess import PostProcessor, recompress_png
+from pipeline.sample_sink import layout_path, sample_key, write_sample_json
+from pipeline.hashing import file_sha256
+from pipeline.telemetry import get_telemetry
+from pipeline.workers import RECYCLE_EXIT_CODE
+
+# Énergie de la lumière principale, multipliée par le plan de randomisation s'il y en a un
+LIGHT_INTENSITY = 800
+
+
+def car_segmentation_mask_assign(collection_name: str = "Vehicle", compositor: MaskCompositor = None):
+    """
+    Marks every vehicle object with pass index 255 and returns the mask output node.
+    :param compositor: Session compositor, built once by the caller.
+    """
+    if collection_name not in bpy.data.collections:
+        return
+    if compositor is None:
+        compositor = MaskCompositor()
+
+    vehicle_collection = bpy.data.collections.get(collection_name)
+    for obj in vehicle_collection.objects:
+        obj.pass_index = 255
+        if obj.active_material:
+            material = obj.active_material
+            if material.use_nodes:
+                bsdf_node = material.node_tree.nodes.get("Principled BSDF")
+                if bsdf_node:
+                    bsdf_node.inputs[21].default_value = 1.0
+    return compositor.output_node
+
+
+def render_variants_360(output_base, key, output_node, variants: list[str], materials: dict,
+                        ground_plane=None, light=None, radius: float = 10, height: float = 3,
+                        num_frames: int = 180, frames_by_variant: dict = None, loop: int = 0,
+                        metadata: dict = None, color=None, ledger: JobLedger = None, model_id: str = None,
+                        pattern: str = "orbit", profiles: dict = None, mask_frames: list = None,
+                        mask_pass: MaskPass = None, postprocessor: PostProcessor = None, recompress: bool = False,
+                        layout: str = "flat", staging_dir: str = None, randomization: dict = None,
+                        light_plan: tuple = None):
+    """
+    Renders every requested ground variant from the same planned camera poses.
+    Poses are computed once per model; each variant is one animation render over its pending poses,
+    with only the ground material swapped in between and the compositor muted.
+    The mask does not depend on the ground, so it is rendered once per pose by a separate
+    minimal pass into the shared mask folder.
+    :param output_base: Directory holding one sub-folder per variant and the shared mask folder.
+    :param variants: Ground variants to render, in order.
+    :param materials: Ground material of each variant.
+    :param num_frames: Number of poses on the orbit.
+    :param frames_by_variant: Frame indices still to render for each variant (default: all of them).
+    :param metadata: Streaming metadata sink of each variant.
+    :param pattern: Camera pose pattern, see actions.camera_poses.plan_poses.
+    :param profiles: Render quality profile of each variant (default: keep the scene settings).
+    :param mask_frames: Frame indices whose mask is still to render (default: all of them).
+    :param mask_pass: Context applying the mask pass settings; without it no mask is rendered.
+    :param postprocessor: Queue running the file work of each frame; the caller flushes it
+        (default: run that work inline).
+    :param recompress: Recompress the images at the highest zlib level after rendering.
+    :param layout: "flat", "fanout" (hashed sub-folders) or "tar", which stages every pose as one
+        sample holding each variant image and JSON plus the mask in staging_dir.
+    :param staging_dir: Folder of the staged samples with the "tar" layout.
+    :param randomization: Rows of the model and loop in the randomization plan; their camera
+        draws replace the random jitter.
+    :param light_plan: Planned (energies, locations) of the light for every frame, keyframed
+        for every variant.
+    :return: Number of images and masks rendered.
+    """
+    camera = bpy.data.objects.get("SceneCamera")
+
+    if not camera:
+        print("❌ No camera found. Exiting rendering.")
+        return 0
+
+    for variant in variants:
+        os.makedirs(os.path.join(output_base, variant, "img"), exist_ok=True)
+    os.makedirs(os.path.join(output_base, "mask"), exist_ok=True)
+
+    postprocessor = postprocessor or PostProcessor(workers=0)
+    if frames_by_variant is None:
+        frames_by_variant = {variant: range(num_frames) for variant in variants}
+    mask_frames = sorted(range(num_frames) if mask_frames is None else mask_frames) if mask_pass else []
+
+    positions, rotations = plan_poses(pattern, num_frames, radius, height, jitter=(-0.3, 0.1),
+                                      randomization=randomization)
+    export_pose_table(os.path.join(output_base, "poses", f"{key}_{loop}.csv"), range(num_frames), positions, rotations)
+
+    # Les masques, communs à toutes les variantes, vont dans le même échantillon que leurs images
+    def mask_stem(i):
+        if layout == "tar":
+            return os.path.join(staging_dir, sample_key(model_id or key, loop, f"{i:03d}") + ".mask")
+        return os.path.splitext(layout_path(os.path.join(output_base, "mask"), f"{key}_{loop}{i:03d}.png", layout))[0]
+
+    # Tâches de fin de frame, sans bpy : elles tournent pendant le rendu de la frame suivante
+    def finish_image(variant, scene_frame, i, light_intensity):
+        variant_folder = os.path.join(output_base, variant)
+        file_name = f"{key}_{loop}{i:03d}.png"
+        if layout == "tar":
+            frame_output = os.path.join(staging_dir, f"{sample_key(model_id or key, loop, f'{i:03d}')}.{variant}.png")
+        else:
+            frame_output = layout_path(os.path.join(variant_folder, "img"), file_name, layout)
+        commit_frame_files([
+            (os.path.join(variant_folder, "img", f"{key}_{loop}.partial_{scene_frame:04d}.png"), frame_output),
+        ])
+        if recompress:
+            recompress_png(frame_output)
+        get_telemetry().count("frames", kind=variant)
+
+        x_angle, y_angle, z_angle = np.degrees(rotations[i])
+        row = {
+            'file_name': "/" + os.path.relpath(frame_output, staging_dir if layout == "tar" else os.path.join(variant_folder, "img")),
+            'folder': variant,
+            'x_angle': x_angle,
+            'y_angle': y_angle,
+            'z_angle': z_angle,
+            'color': color,
+            'distance': radius,
+            'height': positions[i][2],
+            'light_intensity': light_intensity
+        }
+        metadata[variant].write_row(row)
+        if layout == "tar":
+            write_sample_json(os.path.splitext(frame_output)[0] + ".json", row)
+        if ledger:
+            ledger.mark_done(model_id, i, image=frame_output, variant=variant, loop=loop,
+                             checksum=file_sha256(frame_output))
+
+    def finish_mask(scene_frame, i, labels):
+        mask_folder = os.path.join(output_base, "mask")
+        mask_output = mask_pass.compositor.commit_labels(
+            os.path.join(mask_folder, f"{key}_{loop}.partial_{scene_frame:04d}.png"),
+            mask_stem(i), labels)
+        get_telemetry().count("frames", kind="mask")
+        if ledger:
+            ledger.mark_done(model_id, i, mask=mask_output, variant="mask", loop=loop,
+                             checksum=file_sha256(mask_output))
+
+    rendered = 0
+    # Données Cycles persistantes pour toutes les variantes et poses du modèle
+    with RenderSession(label=key):
+        output_node.mute = True
+        for variant in variants:
+            frames = sorted(frames_by_variant[variant])
+            if not frames:
+                continue
+            variant_folder = os.path.join(output_base, variant)
+
+            apply_ground_variant(ground_plane, light, variant, materials)
+            if profiles:
+                apply_render_profile(profiles[variant])
+            keyframe_camera_poses(camera, positions[frames], rotations[frames])
+            if light_plan:
+                keyframe_light_plan(light, light_plan[0][frames], light_plan[1][frames])
+            bpy.context.scene.render.filepath = os.path.join(variant_folder, "img", f"{key}_{loop}.partial_####")
+
+            def on_frame_written(scene_frame, variant=variant, frames=frames):
+                nonlocal rendered
+                i = frames[scene_frame]
+                postprocessor.submit(finish_image, variant, scene_frame, i,
+                                     light_plan[0][i] if light_plan else light.data.energy)
+                rendered += 1
+
+            with get_telemetry().span("render", kind=variant):
+                render_keyframed_frames(len(frames), on_frame_written)
+
+        # Le masque ne dépend pas du sol : un seul passage minimal pour toutes les variantes
+        if mask_frames:
+            mask_folder = os.path.join(output_base, "mask")
+            keyframe_camera_poses(camera, positions[mask_frames], rotations[mask_frames])
+            output_node.base_path = mask_folder
+            output_node.file_slots[0].path = f"{key}_{loop}.partial_####"
+
+            def on_mask_written(scene_frame):
+                nonlocal rendered
+                postprocessor.submit(finish_mask, scene_frame, mask_frames[scene_frame],
+                                     mask_pass.compositor.capture_labels())
+                rendered += 1
+
+            with mask_pass, get_telemetry().span("render", kind="mask"):
+                render_keyframed_frames(len(mask_frames), on_mask_written)
+
+    return rendered
+
+
+def process_dataset(dataset_root, output_base, variants: list[str], num_frames=180, loop=0,
+                    shard: tuple[int, int] = (0, 1),
+                    cache_dir: str = None, reuse_scene: bool = True, pattern: str = "orbit",
+                    profiles: dict = None, passes: tuple = ("image", "mask"), mask_encoding: str = "png",
+                    mask_bit_depth: int = 8, postprocess_workers: int = 2, recompress: bool = False,
+                    layout: str = "flat", tar_shard_bytes: int = 1 << 30, catalog: str = None,
+                    work_queue: str = None, max_rss_mb: int = 0, max_datablocks: int = 0,
+                    randomization_plan: str = None):
+    # Une seule importation et préparation de scène par modèle, pour toutes les variantes ; le plan
+    # ne choisit pas le sol, toutes les variantes sont rendues
+    run = DatasetRun(dataset_root, output_base, shard=shard, num_frames=num_frames, round=loop, cache_dir=cache_dir,
+                     reuse_scene=reuse_scene, light_intensity=LIGHT_INTENSITY, passes=passes,
+                     mask_encoding=mask_encoding, mask_bit_depth=mask_bit_depth,
+                     postprocess_workers=postprocess_workers, layout=layout, tar_shard_bytes=tar_shard_bytes,
+                     catalog=catalog, work_queue=work_queue, max_rss_mb=max_rss_mb, max_datablocks=max_datablocks,
+                     randomization_plan=randomization_plan)
+    print(f"✅ Loop {loop}, variants {variants}.")
+
+    metadata = {variant: run.metadata_writer(os.path.join(output_base, variant)) for variant in variants}
+    ledger = run.ledger(output_base)
+    staging_dir = run.staging_dir(output_base)
+    image_variants = variants if "image" in passes else []
+    completed = {variant: ledger.completed_frames(variant, loop) for variant in image_variants}
+    completed_masks = ledger.completed_frames("mask", loop) if run.mask_pass else None
+    # Matériaux du sol construits une seule fois : leur faux utilisateur les garde d'un modèle à l'autre
+    materials = create_ground_variant_materials(variants)
+
+    def pending_by_pass(model_id):
+        frames_by_variant = {variant: pending_frames(completed[variant], model_id, num_frames)
+                             for variant in image_variants}
+        mask_frames = pending_frames(completed_masks, model_id, num_frames) if run.mask_pass else []
+        return frames_by_variant, mask_frames
+
+    def pending(model_id):
+        frames_by_variant, mask_frames = pending_by_pass(model_id)
+        return any(frames_by_variant.values()) or bool(mask_frames)
+
+    for job in run.models(pending):
+        frames_by_variant, mask_frames = pending_by_pass(job.model_id)
+        with get_telemetry().span("mask_assign"):
+            output_node = car_segmentation_mask_assign(compositor=run.compositor)
+
+        render_variants_360(output_base, job.key, output_node, image_variants, materials,
+                            ground_plane=job.ground_plane, light=job.light, radius=math.sqrt(3),
+                            height=job.center.z, num_frames=num_frames, frames_by_variant=frames_by_variant,
+                            loop=loop, metadata=metadata, color=job.color, ledger=ledger, model_id=job.model_id,
+                            pattern=pattern, profiles=profiles, mask_frames=mask_frames, mask_pass=run.mask_pass,
+                            postprocessor=run.postprocessor, recompress=recompress,
+                            layout=layout, staging_dir=staging_dir, randomization=job.planned,
+                            light_plan=job.light_plan)
+    return run.close()
+
+
+def parse_args(argv=None, default_variants=("shadow", "reflection"),
+               default_output="/Users/dattrongnguyen/Documents/output"):
+    """Parse the script arguments passed after '--' on the Blender command line."""
+    if argv is None:
+        argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    parser = argparse.ArgumentParser(description="Render vehicle masks with several ground variants.")
+    parser.add_argument("--dataset-root", default="/Users/dattrongnguyen/Documents/blenderTest/3d_models_SEB")
+    parser.add_argument("--output-base", default=default_output, help="One sub-folder is created per variant.")
+    parser.add_argument("--variants", nargs="+", choices=sorted(GROUND_VARIANTS), default=list(default_variants))
+    parser.add_argument("--num-frames", type=int, default=180)
+    parser.add_argument("--loops", type=int, default=4)
+    parser.add_argument("--passes", nargs="+", choices=["image", "mask"], default=["image", "mask"],
+                        help="Render passes to run; masks are shared by all variants.")
+    parser.add_argument("--profile", choices=sorted(load_render_profiles()["profiles"]) + ["per-variant"], default=None,
+                        help="Render quality profile from render_profiles.yaml, or per-variant to use "
+                             "its variant_profiles mapping (default: Blender settings).")
+    parser.add_argument("--randomization-plan", default=None,
+                        help="Parquet plan written by plan_randomization.py with --loops at least as large; "
+                             "colors, light and camera jitter come from it instead of being drawn during the render.")
+    add_common_arguments(parser)
+    args = parser.parse_args(argv)
+    check_common_arguments(parser, args)
+    return args
+
+
+def main(default_variants=("shadow", "reflection")):
+    args = parse_args(default_variants=default_variants)
+    setup_worker(args, compute_device_type="METAL", denoise=True)
+
+    # Profil de qualité par variante ; --threads garde la priorité sur celui du profil
+    profiles = None
+    if args.profile:
+        config = load_render_profiles()
+        profiles = {variant: dict(resolve_profile(config, args.profile, variant)) for variant in args.variants}
+        if args.threads:
+            for profile in profiles.values():
+                profile["threads"] = args.threads
+
+    recycle = False
+    for i in range(args.loops):
+        recycle = process_dataset(args.dataset_root, args.output_base, args.variants, loop=i, pattern=args.pattern,
+                                  profiles=profiles, recompress=args.recompress, **run_options(args))
+        if recycle:
+            # Le nouveau processus reprend au premier tour inachevé, grâce au ledger
+            break
+    get_telemetry().close()
+    if recycle:
+        sys.exit(RECYCLE_EXIT_CODE)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Les modules du projet sont importés depuis la racine, comme dans les scripts Blender
+project_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_path not in sys.path:
+    sys.path.insert(0, project_path)
@@ -0,0 +1,84 @@
+import os
+
+import pytest
+
+from pipeline.catalog import ModelCatalog, list_models, scan_model
+from pipeline.class_registry import ClassRegistry
+
+OBJ = "mtllib car.mtl\no door_front_left\nv 0 0 0\nv 1 0 0\nv 0 1 0\nusemtl paint\nf 1 2 3\n"
+
+
+def write_model(folder, material="newmtl paint\nKd 1 0 0\n"):
+    os.makedirs(folder, exist_ok=True)
+    with open(os.path.join(folder, "car.obj"), "w") as file:
+        file.write(OBJ)
+    with open(os.path.join(folder, "car.mtl"), "w") as file:
+        file.write(material)
+    return os.path.join(folder, "car.obj")
+
+
+@pytest.fixture
+def registry():
+    return ClassRegistry({"door_front_left": 1})
+
+
+def test_catalog_duplicates_need_identical_materials(tmp_path, registry):
+    root = tmp_path / "dataset"
+    write_model(root / "a", material="newmtl paint\nKd 1 0 0\n")
+    write_model(root / "b", material="newmtl paint\nKd 0 0 1\n")
+    write_model(root / "c", material="newmtl paint\nKd 1 0 0\n")
+    with ModelCatalog(str(tmp_path / "catalog.sqlite")) as catalog:
+        counts = catalog.update(str(root), registry=registry, workers=1)
+        assert counts == {'scanned': 3, 'unchanged': 0, 'removed': 0}
+        assert catalog.summary() == {'ok': 3, 'duplicates': 1}
+        assert catalog.work_list(str(root)) == [str(root / "a" / "car.obj"), str(root / "b" / "car.obj")]
+
+        assert catalog.update(str(root), registry=registry, workers=1)['unchanged'] == 3
+        os.remove(root / "c" / "car.obj")
+        assert catalog.update(str(root), registry=registry, workers=1)['removed'] == 1
+        assert catalog.summary() == {'ok': 2, 'duplicates': 0}
+    assert list_models(str(root), str(tmp_path / "catalog.sqlite")) == [str(root / "a" / "car.obj"),
+                                                                        str(root / "b" / "car.obj")]
+
+
+def test_texture_changes_trigger_a_rescan(tmp_path, registry):
+    root = tmp_path / "dataset"
+    write_model(root / "a", material="newmtl paint\nmap_Kd paint.png\n")
+    with ModelCatalog(str(tmp_path / "catalog.sqlite")) as catalog:
+        catalog.update(str(root), registry=registry, workers=1)
+        assert catalog.update(str(root), registry=registry, workers=1)['unchanged'] == 1
+        # La texture manquante apparaît sans que l'OBJ ni le MTL ne changent
+        (root / "a" / "paint.png").write_bytes(b"\x89PNG")
+        assert catalog.update(str(root), registry=registry, workers=1)['scanned'] == 1
+        (root / "a" / "paint.png").write_bytes(b"\x89PNG with more bytes")
+        assert catalog.update(str(root), registry=registry, workers=1)['scanned'] == 1
+        assert catalog.update(str(root), registry=registry, workers=1)['unchanged'] == 1
+
+
+def test_scan_model_reports_a_removed_file(tmp_path):
+    record = scan_model(str(tmp_path), "gone.obj")
+    assert record['status'] == "broken"
+    assert record['signature'] is None
+    assert record['error']
+
+
+def test_scan_model_counts_geometry_and_missing_files(tmp_path):
+    write_model(tmp_path, material="newmtl paint\nmap_Kd paint.png\n")
+    record = scan_model(str(tmp_path), "car.obj")
+    assert record['status'] == "ok"
+    assert (record['vertices'], record['faces'], record['triangles']) == (3, 1, 1)
+    assert record['objects'] == ["door_front_left"]
+    assert record['sources'] == ["car.mtl", "paint.png"]
+    assert record['missing_files'] == ["paint.png"]
+
+
+def test_render_timings_feed_the_cost_features(tmp_path, registry):
+    root = tmp_path / "dataset"
+    path = write_model(root / "a")
+    with ModelCatalog(str(tmp_path / "catalog.sqlite")) as catalog:
+        catalog.update(str(root), registry=registry, workers=1)
+        assert catalog.cost_features(str(root)) == {path: {'triangles': 1, 'texture_bytes': 0, 'parts': 1}}
+        catalog.record_timings(str(root), "car_part_generation.py", {path: 2.0})
+        catalog.record_timings(str(root), "car_part_generation.py", {path: 3.0})
+        assert catalog.timing_history(str(root), "car_part_generation.py") == {path: 3.0}
+        assert catalog.timing_history(str(root), "render_variants.py") == {}
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from pipeline.class_registry import ClassRegistry
+
+
+class FakeObject:
+    def __init__(self, name, pass_index=0):
+        self.name = name
+        self.pass_index = pass_index
+
+
+class FakeObjects(list):
+    """Stand-in for collection.objects with the two bulk accessors used by assign."""
+
+    def foreach_get(self, attribute, values):
+        values[:] = [getattr(obj, attribute) for obj in self]
+
+    def foreach_set(self, attribute, values):
+        for obj, value in zip(self, values):
+            setattr(obj, attribute, int(value))
+
+
+@pytest.fixture
+def registry():
+    return ClassRegistry({"front_hood": 10, "front_left_door": 20, "roof": 30},
+                         aliases={"bonnet": "front_hood"}, prefixes={"roof_panel": "roof"},
+                         patterns={"^door_?fl(_|$)": "front_left_door"})
+
+
+def test_lookup_order(registry):
+    assert registry.lookup("Front-Hood.001") == "front_hood"
+    assert registry.lookup("Bonnet") == "front_hood"
+    assert registry.lookup("roof_panel_left") == "roof"
+    assert registry.lookup("door_FL_glass") == "front_left_door"
+    assert registry.gray_level("exhaust") is None
+
+
+def test_rules_must_target_known_classes():
+    with pytest.raises(ValueError):
+        ClassRegistry({"roof": 30}, aliases={"top": "sunroof"})
+
+
+def test_assign_keeps_unmapped_pass_indices(registry):
+    objects = FakeObjects([FakeObject("bonnet"), FakeObject("exhaust.002", 7), FakeObject("roof")])
+    mapped, unmapped = registry.assign(objects)
+    assert np.array_equal(mapped, [True, False, True])
+    assert unmapped == ["exhaust"]
+    assert [obj.pass_index for obj in objects] == [10, 7, 30]
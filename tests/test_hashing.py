@@ -0,0 +1,51 @@
+import os
+
+from pipeline.hashing import cached_content_hash, file_content_hash, model_content_hash
+
+OBJ = "mtllib {library}\no door_front_left\nv 0 0 0\nv 1 0 0\nv 0 1 0\nusemtl paint\nf 1 2 3\n"
+
+
+def write_model(folder, name="car.obj", library="car.mtl", material="newmtl paint\nKd 1 0 0\n"):
+    os.makedirs(folder, exist_ok=True)
+    with open(os.path.join(folder, name), "w") as file:
+        file.write(OBJ.format(library=library))
+    if material is not None:
+        with open(os.path.join(folder, library), "w") as file:
+            file.write(material)
+    return os.path.join(folder, name)
+
+
+def test_hash_covers_the_mtllib_library(tmp_path):
+    red = write_model(tmp_path / "a", material="newmtl paint\nKd 1 0 0\n")
+    blue = write_model(tmp_path / "b", material="newmtl paint\nKd 0 0 1\n")
+    assert file_content_hash(red) != file_content_hash(blue)
+
+
+def test_hash_uses_the_named_library_not_the_sibling(tmp_path):
+    path = write_model(tmp_path, library="shared.mtl")
+    digest, libraries = model_content_hash(path)
+    assert libraries == [str(tmp_path / "shared.mtl")]
+    # Un .mtl homonyme mais non référencé ne change rien
+    (tmp_path / "car.mtl").write_text("newmtl other\n")
+    assert file_content_hash(path) == digest
+
+
+def test_hash_does_not_depend_on_chunk_size(tmp_path):
+    path = write_model(tmp_path)
+    assert model_content_hash(path, chunk_size=3) == model_content_hash(path)
+
+
+def test_missing_library_is_left_out(tmp_path):
+    path = write_model(tmp_path, material=None)
+    assert model_content_hash(path)[1] == []
+
+
+def test_cached_content_hash_follows_library_edits(tmp_path):
+    path = write_model(tmp_path / "models")
+    index_dir = str(tmp_path / "index")
+    first = cached_content_hash(path, index_dir)
+    assert first == file_content_hash(path)
+    assert cached_content_hash(path, index_dir) == first
+    with open(tmp_path / "models" / "car.mtl", "a") as file:
+        file.write("Ns 10\n")
+    assert cached_content_hash(path, index_dir) == file_content_hash(path) != first
@@ -0,0 +1,29 @@
+import json
+
+import numpy as np
+import pytest
+
+from pipeline.label_encoding import decode_rle, encode_rle, label_dtype, write_labels
+
+
+def test_rle_round_trip_starts_with_zeros():
+    mask = np.array([[1, 0, 0], [1, 1, 0]], dtype=bool)
+    rle = encode_rle(mask)
+    # Ordre colonne par colonne, le premier compte est celui des zéros
+    assert rle == {"size": [2, 3], "counts": [0, 2, 1, 1, 2]}
+    assert np.array_equal(decode_rle(rle), mask)
+
+
+def test_write_labels(tmp_path):
+    labels = np.array([[0, 3, 3], [7, 0, 3]], dtype=label_dtype(16))
+    write_labels(str(tmp_path / "labels.npz"), labels, "npz")
+    with np.load(tmp_path / "labels.npz") as data:
+        assert np.array_equal(data["labels"], labels)
+
+    write_labels(str(tmp_path / "labels.json"), labels, "rle")
+    encoded = json.loads((tmp_path / "labels.json").read_text())
+    assert sorted(encoded["classes"]) == ["3", "7"]
+    assert np.array_equal(decode_rle(encoded["classes"]["3"]), labels == 3)
+
+    with pytest.raises(ValueError):
+        label_dtype(12)
@@ -0,0 +1,19 @@
+import pytest
+
+from launch_workers import parse_args, render_worker_args
+
+REQUIRED = ["--dataset-root", "data", "--output-base", "out"]
+
+
+def test_formats_are_forwarded_to_car_part_generation():
+    args = parse_args(REQUIRED + ["--workers", "2", "--threads", "4", "--formats", "landscape", "portrait"])
+    worker_args = render_worker_args(args, 1)
+    assert worker_args[worker_args.index("--shard") + 1] == "1/2"
+    assert worker_args[-3:] == ["--formats", "landscape", "portrait"]
+
+
+def test_formats_are_rejected_for_scripts_without_them():
+    with pytest.raises(SystemExit):
+        parse_args(REQUIRED + ["--script", "shadow_reflection/render_variants.py", "--formats", "portrait"])
+    args = parse_args(REQUIRED + ["--script", "shadow_reflection/render_variants.py"])
+    assert "--formats" not in render_worker_args(args, 0)
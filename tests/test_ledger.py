@@ -0,0 +1,46 @@
+import threading
+
+from pipeline.ledger import JobLedger, commit_frame_files, pending_frames
+
+
+def test_completed_frames_are_kept_per_variant_and_loop(tmp_path):
+    with JobLedger(str(tmp_path / "ledger.sqlite")) as ledger:
+        ledger.mark_done("car", 0, image="car_000.png", variant="shadow", loop=0)
+        ledger.mark_done("car", 1, image="car_001.png", variant="shadow", loop=0)
+        ledger.mark_done("car", 0, mask="car_000.png", variant="mask", loop=1)
+
+        assert ledger.completed_frames("shadow", 0) == {"car": {0, 1}}
+        assert ledger.completed_frames("shadow", 1) == {}
+        assert ledger.completed_frames("mask", 1) == {"car": {0}}
+
+
+def test_ledger_survives_reopening(tmp_path):
+    path = str(tmp_path / "ledger.sqlite")
+    with JobLedger(path) as ledger:
+        ledger.mark_done("car", 3, checksum="abc")
+        ledger.mark_done("car", 3, checksum="def")
+    with JobLedger(path) as ledger:
+        assert ledger.completed_frames() == {"car": {3}}
+
+
+def test_mark_done_from_threads(tmp_path):
+    with JobLedger(str(tmp_path / "ledger.sqlite")) as ledger:
+        threads = [threading.Thread(target=ledger.mark_done, args=("car", frame)) for frame in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert ledger.completed_frames() == {"car": set(range(20))}
+
+
+def test_pending_frames():
+    assert pending_frames({"car": {0, 2}}, "car", 4) == [1, 3]
+    assert pending_frames({}, "truck", 2) == [0, 1]
+
+
+def test_commit_frame_files(tmp_path):
+    partial = tmp_path / "car.partial_0000.png"
+    partial.write_bytes(b"png")
+    commit_frame_files([(str(partial), str(tmp_path / "car_000.png"))])
+    assert not partial.exists()
+    assert (tmp_path / "car_000.png").read_bytes() == b"png"
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from pipeline.randomization import (CAR_COLORS, RANDOMIZATION_COLUMNS, RandomizationPlan, plan_frame, plan_model,
+                                    planned_color, planned_light, write_randomization_plan)
+
+pytest.importorskip("pyarrow")
+
+CONFIG = {
+    'light_energy_scale': [0.75, 1.25],
+    'light_offset': {'x': [-2.0, 2.0], 'y': [-2.0, 2.0], 'z': [-1.0, 1.0]},
+    'ground_variants': ["shadow", "reflection", "plain"],
+}
+
+
+def test_plan_frame_matches_plan_model():
+    rows = plan_model("suv/car", 6, loop=1, seed=7, config=CONFIG)
+    for frame in range(6):
+        row = plan_frame("suv/car", frame, loop=1, seed=7, config=CONFIG)
+        for name in RANDOMIZATION_COLUMNS:
+            assert row[name] == rows[name][frame]
+
+
+def test_plan_depends_on_seed_and_model_only():
+    first = plan_model("suv/car", 4, seed=1, config=CONFIG)
+    assert np.array_equal(first['light_energy_scale'], plan_model("suv/car", 4, seed=1, config=CONFIG)['light_energy_scale'])
+    assert not np.array_equal(first['light_energy_scale'],
+                              plan_model("suv/car", 4, seed=2, config=CONFIG)['light_energy_scale'])
+    assert not np.array_equal(first['light_energy_scale'],
+                              plan_model("suv/van", 4, seed=1, config=CONFIG)['light_energy_scale'])
+    assert np.all((first['light_energy_scale'] >= 0.75) & (first['light_energy_scale'] <= 1.25))
+
+
+def test_written_plan_round_trips(tmp_path):
+    path = str(tmp_path / "randomization.parquet")
+    models = ["b/car", "a/car", "a/truck"]
+    assert write_randomization_plan(path, models, num_frames=5, loops=2, seed=3, config=CONFIG,
+                                    models_per_row_group=2) == 3 * 2 * 5
+
+    plan = RandomizationPlan(path)
+    assert (plan.seed, plan.num_frames, plan.loops) == (3, 5, 2)
+    for model_id in models:
+        for loop in range(2):
+            rows = plan.model(model_id, loop)
+            expected = plan_model(model_id, 5, loop, seed=3, config=CONFIG)
+            for name in RANDOMIZATION_COLUMNS:
+                assert list(rows[name]) == list(expected[name])
+    assert plan.model("missing", 0) is None
+    assert plan.model("a/car", 2) is None
+
+
+def test_planned_color_and_light():
+    rows = plan_model("suv/car", 3, seed=0, config=CONFIG)
+    assert planned_color(rows) == CAR_COLORS[rows['color_index'][0]]
+    energies, locations = planned_light(rows, 400, (0.0, 0.0, 10.0))
+    assert np.allclose(energies, 400 * rows['light_energy_scale'])
+    assert locations.shape == (3, 3)
+    assert np.allclose(locations[:, 2], 10.0 + rows['light_offset_z'])
@@ -0,0 +1,46 @@
+import csv
+import os
+import tarfile
+
+from pipeline.sample_sink import TarShardWriter, layout_path, sample_key
+
+
+def test_sample_key_has_no_dots():
+    assert sample_key("suv/car.v2", 0, "007") == "suv_car_v2_0_007"
+
+
+def test_fanout_layout_spreads_files(tmp_path):
+    path = layout_path(str(tmp_path), "car_000.png", "fanout")
+    assert os.path.isdir(os.path.dirname(path))
+    assert len(os.path.relpath(path, tmp_path).split(os.sep)) == 3
+    assert layout_path(str(tmp_path), "car_000.png") == str(tmp_path / "car_000.png")
+
+
+def test_index_offsets_point_at_member_data(tmp_path):
+    staging = tmp_path / "staging"
+    with TarShardWriter(str(tmp_path), "samples", str(staging)) as writer:
+        (staging / "car_000.png").write_bytes(b"image")
+        (staging / "car_000.mask.png").write_bytes(b"mask bytes")
+        (staging / "car_001.png.partial").write_bytes(b"still rendering")
+        assert writer.pack_staging() == 1
+
+    assert sorted(os.listdir(staging)) == ["car_001.png.partial"]
+    with open(tmp_path / "samples.index.csv", newline="") as file:
+        rows = list(csv.DictReader(file))
+    data = (tmp_path / "samples-000000.tar").read_bytes()
+    for row in rows:
+        offset, size = int(row['offset']), int(row['size'])
+        assert data[offset:offset + size] == (b"image" if row['member'] == "car_000.png" else b"mask bytes")
+    with tarfile.open(tmp_path / "samples-000000.tar") as tar:
+        assert sorted(tar.getnames()) == ["car_000.mask.png", "car_000.png"]
+
+
+def test_partial_shard_is_discarded_on_restart(tmp_path):
+    staging = tmp_path / "staging"
+    staging.mkdir()
+    (tmp_path / "samples-000000.tar.partial").write_bytes(b"truncated")
+    (staging / "car_000.png").write_bytes(b"image")
+    with TarShardWriter(str(tmp_path), "samples", str(staging)) as writer:
+        assert not (tmp_path / "samples-000000.tar.partial").exists()
+        writer.pack_staging()
+    assert (tmp_path / "samples-000000.tar").exists()
@@ -0,0 +1,90 @@
+import pytest
+
+from pipeline.scheduler import CostModel, WorkQueue, plan_longest_first
+
+
+@pytest.fixture
+def queue(tmp_path):
+    with WorkQueue(str(tmp_path / "work_queue.sqlite")) as work_queue:
+        yield work_queue
+
+
+def test_plan_longest_first_balances_loads():
+    costs = {"a": 5.0, "b": 4.0, "c": 3.0, "d": 2.0}
+    assignments = plan_longest_first(costs, 2)
+    loads = [sum(cost for model, cost in costs.items() if assignments[model] == worker) for worker in range(2)]
+    assert sorted(loads) == [7.0, 7.0]
+
+
+def test_cost_model_fit_recovers_linear_costs():
+    features = [{'triangles': t, 'texture_bytes': b, 'parts': p}
+                for t, b, p in [(1e5, 1e6, 10), (2e5, 5e6, 20), (5e5, 2e6, 15), (1e6, 8e6, 40), (3e5, 1e7, 5)]]
+    truth = CostModel((0.5, 2e-6, 1e-8, 1e-2))
+    fitted = CostModel.fit(features, [truth.predict(stats) for stats in features])
+    for stats in features:
+        assert fitted.predict(stats) == pytest.approx(truth.predict(stats), rel=1e-6)
+
+
+def test_cost_model_needs_enough_samples():
+    fitted = CostModel.fit([{'triangles': 1, 'texture_bytes': 1, 'parts': 1}], [1.0])
+    assert tuple(fitted.coefficients) == tuple(CostModel().coefficients)
+
+
+def test_claim_takes_own_models_then_steals(queue):
+    queue.plan({"a": 3.0, "b": 2.0, "c": 1.0}, 2)
+    # Worker 0 owns a, worker 1 owns b and c
+    assert queue.claim(1) == "b"
+    assert queue.claim(1) == "c"
+    assert queue.claim(1) == "a"
+    assert queue.claim(0) is None
+
+
+def test_running_model_is_not_claimed_by_next_round(queue):
+    queue.plan({"a": 2.0, "b": 1.0}, 2)
+    assert queue.claim(0, round=0) == "a"
+    assert queue.claim(1, round=0) == "b"
+    assert queue.finish("a", worker=0)
+    # Worker 0 moves on to round 1 while worker 1 still renders b in round 0
+    assert queue.claim(0, round=1) == "a"
+    assert queue.claim(0, round=1) is None
+    assert queue.next_retry_in(1) is None
+    assert {(model, worker) for model, worker, _, _ in queue.running_jobs()} == {("a", 0), ("b", 1)}
+    assert queue.finish("b", seconds=1.0, worker=1)
+    assert queue.claim(0, round=1) == "b"
+
+
+def test_finish_only_updates_the_holding_worker(queue):
+    queue.plan({"a": 1.0}, 2)
+    assert queue.claim(1) == "a"
+    assert not queue.finish("a", worker=0)
+    assert queue.running_jobs()[0][1] == 1
+    assert queue.finish("a", seconds=2.0, worker=1)
+    assert queue.timings() == {"a": 2.0}
+
+
+def test_jobs_records_done_with_seconds(queue):
+    queue.plan({"a": 2.0, "b": 1.0}, 1)
+    assert list(queue.jobs(0)) == ["a", "b"]
+    assert set(queue.timings()) == {"a", "b"}
+    assert queue.running_jobs() == []
+
+
+def test_fail_retries_with_backoff_then_quarantines(queue):
+    queue.plan({"a": 1.0}, 1)
+    assert queue.claim(0) == "a"
+    assert queue.fail(0, "timeout", max_attempts=2, backoff_seconds=3600) == ("a", "retry")
+    # Disponible à nouveau pour le même tour, mais seulement après le délai
+    assert queue.claim(0) is None
+    assert queue.next_retry_in(0) > 3500
+
+    queue.plan({"a": 1.0}, 1)
+    assert queue.claim(0) == "a"
+    assert queue.fail(0, "crash", max_attempts=1) == ("a", "quarantined")
+    assert queue.quarantined() == {"a": "crash"}
+    assert queue.claim(0) is None
+    assert queue.fail(0, "nothing held") == (None, None)
+
+    # Les modèles en quarantaine sont exclus des plans suivants jusqu'à leur libération
+    queue.plan({"a": 1.0, "b": 1.0}, 1)
+    assert list(queue.jobs(0)) == ["b"]
+    assert queue.release_quarantine() == 1
@@ -0,0 +1,47 @@
+import csv
+
+import pytest
+
+from pipeline.sharding import (find_shard_metadata_dirs, merge_shard_metadata, parse_shard, select_shard,
+                               shard_metadata_name)
+
+
+def write_csv(path, rows):
+    with open(path, "w", newline="") as file:
+        csv.writer(file).writerows(rows)
+
+
+def test_parse_shard():
+    assert parse_shard("3/8") == (3, 8)
+    with pytest.raises(ValueError):
+        parse_shard("8/8")
+    with pytest.raises(ValueError):
+        parse_shard("x")
+
+
+def test_shards_are_disjoint_and_complete():
+    models = [f"m{index}" for index in range(10)]
+    shards = [select_shard(models, index, 3) for index in range(3)]
+    assert sorted(sum(shards, [])) == sorted(models)
+
+
+def test_merge_concatenates_shards(tmp_path):
+    write_csv(tmp_path / shard_metadata_name(0, 2), [["file_name"], ["/a.png"]])
+    write_csv(tmp_path / shard_metadata_name(1, 2), [["file_name"], ["/b.png"]])
+    with open(merge_shard_metadata(str(tmp_path), 2), newline="") as file:
+        assert list(csv.reader(file)) == [["file_name"], ["/a.png"], ["/b.png"]]
+
+
+def test_find_shard_metadata_dirs_checks_variant_folders(tmp_path):
+    for variant in ("shadow", "reflection"):
+        (tmp_path / variant / "img").mkdir(parents=True)
+        write_csv(tmp_path / variant / shard_metadata_name(0, 2), [["file_name"]])
+    write_csv(tmp_path / "shadow" / "img" / shard_metadata_name(0, 2), [["file_name"]])
+    assert find_shard_metadata_dirs(str(tmp_path), 2) == [str(tmp_path / "reflection"), str(tmp_path / "shadow")]
+    assert find_shard_metadata_dirs(str(tmp_path), 3) == []
+
+
+def test_merge_of_a_single_shard_keeps_its_metadata(tmp_path):
+    write_csv(tmp_path / "metadata.csv", [["file_name"], ["/a.png"]])
+    with open(merge_shard_metadata(str(tmp_path), 1), newline="") as file:
+        assert list(csv.reader(file)) == [["file_name"], ["/a.png"]]
@@ -0,0 +1,57 @@
+import json
+
+from pipeline.telemetry import Telemetry, profile_file_name
+
+
+def read_log(path):
+    with open(path) as file:
+        return [json.loads(line) for line in file]
+
+
+def test_spans_nest_and_carry_annotations(tmp_path):
+    log_path = tmp_path / "telemetry.jsonl"
+    telemetry = Telemetry(str(log_path), labels={'shard': "0"})
+    for item in telemetry.each("model", ["a.obj", "b.obj"]):
+        with telemetry.span("render"):
+            pass
+        telemetry.annotate(outcome="done" if item == "a.obj" else "skipped")
+    telemetry.annotate(ignored=True)
+    telemetry.close()
+
+    records = read_log(log_path)
+    assert [(record['name'], record['parent']) for record in records] == [
+        ("render", "model"), ("model", None), ("render", "model"), ("model", None)]
+    models = [record for record in records if record['name'] == "model"]
+    assert [(record['item'], record['outcome']) for record in models] == [("a.obj", "done"), ("b.obj", "skipped")]
+    assert all(record['shard'] == "0" for record in records)
+
+
+def test_failed_span_is_recorded_as_error(tmp_path):
+    log_path = tmp_path / "telemetry.jsonl"
+    telemetry = Telemetry(str(log_path))
+    try:
+        with telemetry.span("import"):
+            raise RuntimeError("broken file")
+    except RuntimeError:
+        pass
+    telemetry.close()
+    assert read_log(log_path)[0]['status'] == "error"
+
+
+def test_prometheus_text_exposes_counters_and_gauges(tmp_path):
+    prometheus_path = tmp_path / "telemetry.prom"
+    telemetry = Telemetry(prometheus_path=str(prometheus_path), labels={'shard': "1"})
+    telemetry.count("frames", 3, kind="image")
+    telemetry.count("frames", 2, kind="mask")
+    telemetry.gauge("rss_bytes", 1024)
+    telemetry.flush()
+
+    assert telemetry.counter_value("frames") == 5
+    text = prometheus_path.read_text()
+    assert "# TYPE render_frames_total counter" in text
+    assert 'render_frames_total{shard="1",kind="image"} 3' in text
+    assert 'render_rss_bytes{shard="1"} 1024' in text
+
+
+def test_profile_file_names_differ_for_same_basename():
+    assert profile_file_name("model", "brand_a/car.obj") != profile_file_name("model", "brand_b/car.obj")
@@ -0,0 +1,29 @@
+import os
+import stat
+import sys
+
+from pipeline.workers import RECYCLE_EXIT_CODE, run_blender_workers
+
+# Remplace Blender : le premier lancement de chaque shard demande à être recyclé, le suivant réussit
+FAKE_BLENDER = f"""#!{sys.executable}
+import os, sys
+marker = sys.argv[-1]
+print("run", marker)
+if not os.path.exists(marker):
+    open(marker, "w").close()
+    sys.exit({RECYCLE_EXIT_CODE})
+"""
+
+
+def test_recycled_workers_are_restarted(tmp_path):
+    blender = tmp_path / "blender"
+    blender.write_text(FAKE_BLENDER)
+    blender.chmod(blender.stat().st_mode | stat.S_IEXEC)
+
+    exit_codes = run_blender_workers(str(blender), "script.py", lambda index: [str(tmp_path / f"marker-{index}")],
+                                     2, str(tmp_path / "logs"), poll_seconds=0.01)
+
+    assert exit_codes == [0, 0]
+    # Le log du worker relancé est complété, pas écrasé
+    with open(os.path.join(tmp_path, "logs", "worker-000.log")) as file:
+        assert file.read().count("run") == 2